@@ -0,0 +1,246 @@
+import numpy as np
+
+
+def region_centers(regions, grid=None):
+    """
+    (num_regions, 2) array of region centers as (row, col). Without a grid
+    regions are 1-D slices and the column is 0.
+    """
+    centers = np.zeros((len(regions), 2))
+    for k, region in enumerate(regions):
+        if grid is not None:
+            r0, r1, c0, c1 = grid.bounds_of(region)
+            centers[k] = ((r0 + r1 - 1) / 2, (c0 + c1 - 1) / 2)
+        elif isinstance(region, slice):
+            centers[k, 0] = (region.start + region.stop - 1) / 2
+        else:
+            centers[k, 0] = np.mean(region)
+    return centers
+
+
+def quotas(demand, total, minimum=0):
+    """
+    Fractional fair share of `total` slots per region: `minimum` each (as far
+    as total allows), the rest in proportion to demand. Uniform when all
+    demand is zero.
+    :return: (num_regions,) float quotas summing to total
+    """
+    demand = np.maximum(np.asarray(demand, dtype=np.float64), 0.0)
+    num_regions = len(demand)
+    base = min(minimum, total // num_regions) if num_regions else 0
+    rest = total - base * num_regions
+    share = demand / demand.sum() if demand.sum() > 0 else np.full(num_regions, 1.0 / max(num_regions, 1))
+    return base + share * max(rest, 0)
+
+
+def apportion(demand, total, minimum=0):
+    """
+    Splits `total` slots over regions: `minimum` each (as far as total allows),
+    the rest in proportion to demand by largest remainder. Uniform when all
+    demand is zero.
+    :return: (num_regions,) integer capacities summing to total
+    """
+    demand = np.maximum(np.asarray(demand, dtype=np.float64), 0.0)
+    num_regions = len(demand)
+    base = min(minimum, total // num_regions) if num_regions else 0
+    capacity = np.full(num_regions, base, dtype=np.intp)
+    rest = total - base * num_regions
+    if rest <= 0:
+        return capacity
+    quota = quotas(demand, total, minimum) - base
+    whole = np.floor(quota).astype(np.intp)
+    capacity += whole
+    # Stable sort so ties go to the lower region index
+    leftover = rest - int(whole.sum())
+    capacity[np.argsort(-(quota - whole), kind="stable")[:leftover]] += 1
+    return capacity
+
+
+def min_cost_transport(cost, supply, capacity):
+    """
+    Min-cost transportation by successive shortest paths. Row class g holds
+    supply[g] interchangeable units and column k takes at most capacity[k];
+    each augmentation sends as many units as fit along the cheapest residual
+    path from a class with units left to a column with room left. Shortest
+    paths are found by a Bellman-Ford sweep vectorized over the dense
+    (classes, columns) residual graph, so a pass costs a few array operations.
+    :param cost: (num_classes, num_cols) cost of one unit of class g in column k
+    :param supply: (num_classes,) integer units per class
+    :param capacity: (num_cols,) integer capacities, summing to at least supply.sum()
+    :return: (num_classes, num_cols) integer flow of an optimal plan
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    left = np.array(supply, dtype=np.intp)
+    room = np.array(capacity, dtype=np.intp)
+    num_classes, num_cols = cost.shape
+    if room.sum() < left.sum():
+        raise ValueError("Total capacity is smaller than the total supply")
+    flow = np.zeros((num_classes, num_cols), dtype=np.intp)
+    cols = np.arange(num_cols)
+    classes = np.arange(num_classes)
+    tol = 1e-12 * (1.0 + np.max(np.abs(cost))) if cost.size else 0.0
+
+    while left.sum() > 0:
+        dist_cls = np.where(left > 0, 0.0, np.inf)
+        dist_col = np.full(num_cols, np.inf)
+        pred_col = np.full(num_cols, -1)      # class a column was reached from
+        pred_cls = np.full(num_classes, -1)   # column a class was reached from (reverse edge)
+        while True:
+            reach = dist_cls[:, None] + cost
+            src = np.argmin(reach, axis=0)
+            best = reach[src, cols]
+            better = best < dist_col - tol
+            dist_col[better], pred_col[better] = best[better], src[better]
+            back = np.where(flow > 0, dist_col[None, :] - cost, np.inf)
+            via = np.argmin(back, axis=1)
+            best = back[classes, via]
+            better_cls = best < dist_cls - tol
+            dist_cls[better_cls], pred_cls[better_cls] = best[better_cls], via[better_cls]
+            if not better.any() and not better_cls.any():
+                break
+
+        sink = np.argmin(np.where(room > 0, dist_col, np.inf))
+        path, k = [], sink
+        while True:
+            g = pred_col[k]
+            path.append((g, k, 1))
+            if pred_cls[g] < 0:
+                break
+            k = pred_cls[g]
+            path.append((g, k, -1))
+        units = min(left[g], room[sink], *(flow[a, b] for a, b, d in path if d < 0))
+        for a, b, d in path:
+            flow[a, b] += d * units
+        left[g] -= units
+        room[sink] -= units
+    return flow
+
+
+class AssignmentSolver:
+    def __init__(self, regions, grid=None, travel_weight=1.0, switch_cost=0.1, demand_smoothing=0.5,
+                 min_per_region=1, belief_weight=0.0, capacity_deadband=0.25):
+        """
+        Robot-to-region assignment that can run every step.
+
+        Region capacities follow the (smoothed) demand of each region, with a
+        deadband so that demand noise does not move robots back and forth.
+        Robots are then placed by a min-cost assignment of the whole fleet on
+        travel distance, where staying in the current region costs switch_cost
+        less than moving.
+
+        :param regions: list of region index slices/arrays
+        :param grid: optional TiledGrid, for 2-D distances between regions
+        :param travel_weight: cost of crossing the whole grid
+        :param switch_cost: extra cost of moving a robot out of its current region
+        :param demand_smoothing: weight of the newest demand in its moving average (1 = no smoothing)
+        :param min_per_region: robots every region gets before demand is considered
+        :param belief_weight: weight of the fused belief mass in a region's demand, next to its
+                              victim mass. Robots raise the belief wherever they observe, so a
+                              large weight makes the allocation reinforce itself.
+        :param capacity_deadband: capacities are kept while every region's fractional fair share
+                                  stays within 0.5 + capacity_deadband robots of its capacity
+        """
+        self.regions = list(regions)
+        self.grid = grid
+        self.centers = region_centers(self.regions, grid)
+        extent = np.ptp(self.centers, axis=0)
+        self.diameter = max(float(np.hypot(*extent)), 1.0)
+        self.travel_weight = travel_weight
+        self.switch_cost = switch_cost
+        self.demand_smoothing = demand_smoothing
+        self.min_per_region = min_per_region
+        self.belief_weight = belief_weight
+        self.capacity_deadband = capacity_deadband
+        self.demand = None     # smoothed demand per region
+        self.capacity = None   # robots per region from the last solve
+        self.last_moves = 0    # robots that changed region in the last solve
+        self._position_cache = {}
+        self._region_by_slice = {(r.start, r.stop): k for k, r in enumerate(self.regions) if isinstance(r, slice)}
+
+    def region_of(self, indices):
+        """
+        Region index of a region's cell slice, -1 for anything else.
+        """
+        if not isinstance(indices, slice):
+            return -1
+        return self._region_by_slice.get((indices.start, indices.stop), -1)
+
+    def position_of(self, indices):
+        """
+        (row, col) center of a robot's current cells.
+        """
+        key = (indices.start, indices.stop) if isinstance(indices, slice) else None
+        if key is not None and key in self._position_cache:
+            return self._position_cache[key]
+        position = region_centers([indices], self.grid)[0]
+        if key is not None:
+            self._position_cache[key] = position
+        return position
+
+    def cost_matrix(self, positions, current):
+        """
+        (num_robots, num_regions) cost: normalized travel distance plus the
+        switch cost for every region other than the robot's current one.
+        """
+        diff = positions[:, None, :] - self.centers[None, :, :]
+        cost = self.travel_weight * np.sqrt(np.sum(diff * diff, axis=2)) / self.diameter
+        cost += self.switch_cost
+        placed = current >= 0
+        cost[np.flatnonzero(placed), current[placed]] -= self.switch_cost
+        return cost
+
+    def region_demand(self, victim_grid, belief=None):
+        """
+        Victim mass of each region (from the VictimGrid prefix-sum index) plus
+        belief_weight times its belief mass.
+        """
+        demand = victim_grid.region_masses(self.regions)
+        if belief is not None and self.belief_weight:
+            demand += self.belief_weight * np.array([np.sum(belief[r]) for r in self.regions])
+        return demand
+
+    def update_demand(self, demand):
+        demand = np.asarray(demand, dtype=np.float64)
+        if self.demand is None:
+            self.demand = demand.copy()
+        else:
+            self.demand += self.demand_smoothing * (demand - self.demand)
+        return self.demand
+
+    def update_capacity(self, demand, total):
+        """
+        Region capacities for total robots. The previous capacities are kept
+        while every region's fair share is within the deadband of them.
+        """
+        quota = quotas(demand, total, self.min_per_region)
+        if (self.capacity is not None and len(self.capacity) == len(quota) and self.capacity.sum() == total
+                and np.all(np.abs(quota - self.capacity) <= 0.5 + self.capacity_deadband)):
+            return self.capacity
+        self.capacity = apportion(demand, total, self.min_per_region)
+        return self.capacity
+
+    def solve(self, positions, current, demand):
+        """
+        :param positions: (num_robots, 2) robot positions (row, col)
+        :param current: (num_robots,) current region of each robot, -1 if none
+        :param demand: (num_regions,) demand of each region (e.g. belief or victim mass)
+        :return: (num_robots,) new region of each robot
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        current = np.asarray(current, dtype=np.intp)
+        capacity = self.update_capacity(self.update_demand(demand), len(positions))
+        owner = current.copy()
+        if len(positions):
+            # Robots in the same region at the same spot are interchangeable
+            keys = np.column_stack([current, positions])
+            _, first, group = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+            group = group.ravel()
+            flow = min_cost_transport(self.cost_matrix(positions[first], current[first]),
+                                      np.bincount(group), capacity)
+            # Hand each class's units to its robots in list order, staying ones first
+            for g, home in enumerate(current[first]):
+                members = np.flatnonzero(group == g)
+                cols = np.argsort(np.arange(len(capacity)) != home, kind="stable")
+                owner[members] = np.repeat(cols, flow[g, cols])
+        self.last_moves = int(np.sum(owner != current))
+        return owner
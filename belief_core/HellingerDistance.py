@@ -0,0 +1,187 @@
+import numpy as np
+
+FORMS = ("pmf", "bernoulli")
+
+
+class HellingerDistance:
+    def __init__(self):
+        # Root beliefs reused across calls: (id(store), row) -> (store, belief version, form, root row)
+        # for a belief in a store (the belief itself, row None, otherwise), and
+        # id(reference) -> (reference, form, root row)
+        self._robot_roots = {}
+        self._reference_roots = {}
+
+    def compute(self, p, q):
+        """
+        Compute the Hellinger distance between two PMFs p and q
+        :param p: np.array (PMF 1)
+        :param q: np.array (PMF 2)
+        :return: float distance ∈ [0, 1]
+        """
+        p = np.asarray(p)
+        q = np.asarray(q)
+
+        bc = np.sum(np.sqrt(p * q))  # Bhattacharyya coefficient
+        return np.sqrt(1 - bc)
+
+    def compute_bernoulli(self, p, q):
+        """
+        Hellinger distance between two beliefs of independent per-cell
+        probabilities, averaged over cells (each cell is a Bernoulli variable).
+        :param p: np.array of per-cell probabilities, or (N, grid_size) array
+        :param q: np.array of per-cell probabilities (broadcast against p)
+        :return: float distance ∈ [0, 1], or (N,) array of distances
+        """
+        p = np.clip(np.asarray(p), 0.0, 1.0)
+        q = np.clip(np.asarray(q), 0.0, 1.0)
+
+        bc = np.mean(np.sqrt(p * q) + np.sqrt((1 - p) * (1 - q)), axis=-1)
+        return np.sqrt(np.clip(1 - bc, 0.0, 1.0))
+
+    def compute_sparse(self, p, q=None):
+        """
+        Hellinger distance (PMF form) between SparseBeliefs sharing the same default.
+        Unstored cells contribute sqrt(nominal * nominal) = nominal each.
+        :param p: SparseBelief (PMF 1)
+        :param q: SparseBelief (PMF 2); if None, p's default (the nominal) is used
+        :return: float distance ∈ [0, 1]
+        """
+        q_indices = np.empty(0, dtype=np.intp) if q is None else q.indices
+        union = np.union1d(p.indices, q_indices)
+        p_u = p.get_cells(union)
+        q_u = p.default_at(union) if q is None else q.get_cells(union)
+
+        rest = p.default_sum() - np.sum(p.default_at(union))
+        bc = np.sum(np.sqrt(p_u * q_u)) + rest  # Bhattacharyya coefficient
+        return np.sqrt(np.clip(1 - bc, 0.0, 1.0))
+
+    def compute_bernoulli_sparse(self, p, q=None):
+        """
+        Per-cell Bernoulli Hellinger distance (see compute_bernoulli) between
+        SparseBeliefs; unstored cells are identical and contribute 1 to the sum.
+        :param p: SparseBelief
+        :param q: SparseBelief; if None, p's default (the nominal) is used
+        :return: float distance ∈ [0, 1]
+        """
+        q_indices = np.empty(0, dtype=np.intp) if q is None else q.indices
+        union = np.union1d(p.indices, q_indices)
+        p_u = np.clip(p.get_cells(union), 0.0, 1.0)
+        q_u = np.clip(p.default_at(union) if q is None else q.get_cells(union), 0.0, 1.0)
+
+        bc_sum = np.sum(np.sqrt(p_u * q_u) + np.sqrt((1 - p_u) * (1 - q_u))) + (p.size - len(union))
+        return np.sqrt(np.clip(1 - bc_sum / p.size, 0.0, 1.0))
+
+    @staticmethod
+    def roots(beliefs, form="pmf"):
+        """
+        Square-root beliefs whose inner products are Bhattacharyya coefficients.
+        PMF form: sqrt(p) with each belief normalized to sum to 1 first (no-op
+        for PMFs). Bernoulli form: [sqrt(p), sqrt(1 - p)] per cell, so the inner
+        product summed over cells is grid_size times the per-cell mean.
+        :param beliefs: (grid_size,) or (N, grid_size) array
+        :return: (..., grid_size) or (..., 2 * grid_size) array
+        """
+        if form not in FORMS:
+            raise ValueError(f"form must be one of {FORMS}, got {form!r}")
+        beliefs = np.clip(np.asarray(beliefs, dtype=np.float64), 0.0, 1.0)
+        if form == "pmf":
+            return np.sqrt(beliefs / (np.sum(beliefs, axis=-1, keepdims=True) + 1e-300))
+        return np.concatenate([np.sqrt(beliefs), np.sqrt(1 - beliefs)], axis=-1)
+
+    @staticmethod
+    def from_bhattacharyya(bc, grid_size, form="pmf"):
+        """
+        Hellinger distance from a Bhattacharyya coefficient (summed over cells).
+        """
+        if form == "bernoulli":
+            bc = bc / grid_size
+        return np.sqrt(np.clip(1 - bc, 0.0, 1.0))
+
+    def matrix(self, a, b=None, form="pmf", roots_a=None, roots_b=None):
+        """
+        Hellinger distances between every belief of a and every belief of b
+        (a itself if b is None), as one matrix product of root beliefs.
+        :param a: (N, grid_size) beliefs (PMFs in the PMF form)
+        :param b: optional (M, grid_size) beliefs
+        :param roots_a, roots_b: precomputed roots(a, form) / roots(b, form), to skip the sqrt
+        :return: (N, M) array of distances in [0, 1]
+        """
+        if roots_a is None:
+            roots_a = self.roots(a, form)
+        if roots_b is None:
+            roots_b = roots_a if b is None else self.roots(b, form)
+        grid_size = roots_a.shape[-1] // (2 if form == "bernoulli" else 1)
+        distances = self.from_bhattacharyya(roots_a @ roots_b.T, grid_size, form)
+        if b is None and roots_b is roots_a:
+            np.fill_diagonal(distances, 0.0)  # exact zero despite rounding
+        return distances
+
+    def to_reference(self, beliefs, reference, form="pmf", roots=None):
+        """
+        Distance of every belief to one reference (e.g. the nominal), whose
+        root is computed once and cached.
+        :param beliefs: (N, grid_size) beliefs
+        :param reference: (grid_size,) reference belief
+        :param roots: optional precomputed roots(beliefs, form)
+        :return: (N,) array of distances
+        """
+        if roots is None:
+            roots = self.roots(beliefs, form)
+        reference_root = self.reference_root(reference, form)
+        return self.from_bhattacharyya(roots @ reference_root, len(reference), form)
+
+    def reference_root(self, reference, form="pmf"):
+        cached = self._reference_roots.get(id(reference))
+        if cached is None or cached[0] is not reference or cached[1] != form:
+            cached = (reference, form, self.roots(reference, form))
+            self._reference_roots[id(reference)] = cached
+        return cached[2]
+
+    @staticmethod
+    def _belief_key(robot):
+        """
+        Where a robot's belief lives: its store and row, or the belief itself.
+        Robot ids are not used, as robots of different fleets may share them.
+        """
+        store = getattr(robot, "belief_store", None)
+        if store is None:
+            return robot.belief, None
+        return store, robot.store_index
+
+    def robot_roots(self, robots, form="pmf"):
+        """
+        Stacked root beliefs of robots. A robot's root row is recomputed only
+        when its belief version changed since the last call.
+        :return: (len(robots), grid_size) or (len(robots), 2 * grid_size) array
+        """
+        keys, stale = [], []
+        for i, r in enumerate(robots):
+            owner, row = self._belief_key(r)
+            key = (id(owner), row)
+            keys.append(key)
+            cached = self._robot_roots.get(key)
+            if cached is None or cached[0] is not owner or cached[1] != r.belief.version or cached[2] != form:
+                stale.append(i)
+        if stale:
+            beliefs = np.stack([robots[i].belief.get() for i in stale])
+            for i, root in zip(stale, self.roots(beliefs, form)):
+                owner, _ = self._belief_key(robots[i])
+                self._robot_roots[keys[i]] = (owner, robots[i].belief.version, form, root)
+        return np.stack([self._robot_roots[key][3] for key in keys])
+
+    def robot_matrix(self, robots, form="pmf"):
+        """
+        (N, N) distances between the beliefs of robots, from cached roots.
+        """
+        return self.matrix(None, form=form, roots_a=self.robot_roots(robots, form))
+
+    def robots_to_reference(self, robots, form="pmf"):
+        """
+        (N,) distance of every robot's belief to its nominal belief.
+        """
+        roots = self.robot_roots(robots, form)
+        nominal = robots[0].nominal_belief
+        if all(r.nominal_belief is nominal for r in robots[1:]):
+            return self.to_reference(None, nominal, form, roots)
+        nominal_roots = np.stack([self.reference_root(r.nominal_belief, form) for r in robots])
+        return self.from_bhattacharyya(np.sum(roots * nominal_roots, axis=1), len(nominal), form)
@@ -0,0 +1,130 @@
+import numpy as np
+from .fenwick import FenwickTree, FenwickTree2D
+from .precision import get_precision
+
+class VictimGrid:
+    def __init__(self, size, layout=None, precision=None):
+        """
+        Initializes a grid representing the belief over victim locations.
+
+        :param size: Number of regions or states in the workspace.
+        :param layout: Optional TiledGrid mapping 2-D cells to storage indices.
+        :param precision: Precision whose float dtype the grid is stored in;
+                          the prefix-sum indexes always accumulate in float64.
+        """
+        self.precision = get_precision(precision)
+        self.grid = np.zeros(size, dtype=self.precision.float_dtype)
+        self.layout = layout
+        # Global version counter and the version at which each cell last changed
+        self.version = 0
+        self.cell_version = np.zeros(size, dtype=np.int64)
+        # Prefix-sum indexes: storage ranges (regions) and, with a layout, 2-D rectangles
+        self.index = FenwickTree(size)
+        self.index_2d = FenwickTree2D(layout.height, layout.width) if layout is not None else None
+
+    def add_victim(self, index, intensity=1.0):
+        """
+        Simulates the detection of a victim at a specific location.
+
+        :param index: Index of the grid (region) where a victim is added.
+        :param intensity: Strength of belief update.
+        """
+        self.add_victims([index], [intensity])
+
+    def add_victims(self, indices, intensities=1.0):
+        """
+        Adds many victims as one event (one version bump). Intensities at a
+        repeated index accumulate.
+
+        :param indices: grid indices of the victims
+        :param intensities: intensity per victim, or one value for all
+        """
+        indices = np.asarray(indices, dtype=np.intp).ravel()
+        intensities = np.broadcast_to(np.asarray(intensities, dtype=np.float64), indices.shape)
+        np.add.at(self.grid, indices, intensities)
+        self.version += 1
+        self.cell_version[indices] = self.version
+        self.index.add(indices, intensities)
+        if self.index_2d is not None:
+            self.index_2d.add(self.layout.row_of[indices], self.layout.col_of[indices], intensities)
+
+    def rebuild_index(self):
+        """
+        Rebuilds the prefix-sum indexes after self.grid was written directly.
+        """
+        self.index.rebuild(self.grid)
+        if self.index_2d is not None:
+            self.index_2d.rebuild(self.layout.to_image(self.grid))
+
+    def mass(self, region_indices=None):
+        """
+        Total victim intensity of the grid, or of region_indices. Slices are
+        answered from the prefix-sum index in O(log size).
+        """
+        if region_indices is None:
+            return float(self.index.prefix(len(self.grid)))
+        if isinstance(region_indices, slice):
+            start, stop, _ = region_indices.indices(len(self.grid))
+            return float(self.index.range_sum(start, stop))
+        return float(np.sum(self.grid[region_indices]))
+
+    def region_masses(self, regions):
+        """
+        Victim mass of every region, slices answered in one batched index query.
+        """
+        masses = np.empty(len(regions))
+        bounds = [(k, r.indices(len(self.grid))) for k, r in enumerate(regions) if isinstance(r, slice)]
+        if bounds:
+            ks = np.array([k for k, _ in bounds])
+            masses[ks] = self.index.range_sum([b[0] for _, b in bounds], [b[1] for _, b in bounds])
+        for k, r in enumerate(regions):
+            if not isinstance(r, slice):
+                masses[k] = np.sum(self.grid[r])
+        return masses
+
+    def window_mass(self, row_start, row_stop, col_start, col_stop):
+        """
+        Victim mass of the 2-D rectangle [row_start, row_stop) x [col_start, col_stop),
+        clipped to the grid; requires a TiledGrid layout. Bounds may be arrays.
+        """
+        if self.index_2d is None:
+            raise ValueError("window_mass requires a TiledGrid layout")
+        return self.index_2d.rect_sum(row_start, row_stop, col_start, col_stop)
+
+    def add_victim_at(self, row, col, intensity=1.0):
+        """
+        Adds a victim at 2-D cell (row, col); requires a TiledGrid layout.
+        """
+        self.add_victim(self.layout.storage_index(row, col), intensity)
+
+    def changed_since(self, version, region_indices=None):
+        """
+        True if any cell (of region_indices, if given) changed after `version`.
+        """
+        if version >= self.version:
+            return False
+        if region_indices is None:
+            return True
+        return bool(np.max(self.cell_version[region_indices], initial=0) > version)
+
+    def get_region(self, region_indices):
+        """
+        Returns the belief over the specified region indices without normalization,
+        read-only. A slice gives a zero-copy view of the grid; an index array
+        (e.g. a 2-D observation window) can only be gathered; a single index
+        gives a 0-d array.
+        """
+        region = np.asarray(self.grid[region_indices])
+        region.flags.writeable = False
+        return region
+
+    def get_global_grid(self):
+        """
+        Returns the full victim grid (unnormalized) as a read-only view.
+        """
+        grid = self.grid[:]
+        grid.flags.writeable = False
+        return grid
+
+    def __str__(self):
+        return str(np.round(self.grid, 3))
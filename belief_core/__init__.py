@@ -0,0 +1,18 @@
+"""
+Fusion and belief core of the simulation: beliefs and their storage precision,
+Bayes updates, Chernoff fusion, occupancy, Hellinger distances, the grid and
+victim layouts, and robots. It depends on numpy only; plotting, networkx, the
+process pools and the simulation loop live in the top-level modules and are
+never imported from here.
+"""
+from .precision import PRECISIONS, Precision, get_precision
+from .belief import Belief, FleetBeliefStore, SparseBelief, logodds_to_prob, prob_to_logodds, stack_beliefs, stack_logodds
+from .bayes import BayesUpdate
+from .fusion import FusionRule
+from .fusion_engine import FusionEngine
+from .occupancy import OccupancyVector
+from .HellingerDistance import HellingerDistance
+from .fenwick import FenwickTree, FenwickTree2D
+from .grid import TiledGrid
+from .VictimGrid import VictimGrid
+from .robot import FleetComponents, Robot
@@ -0,0 +1,153 @@
+import numpy as np
+from .belief import window_bounds
+
+class BayesUpdate:
+    def __init__(self, p_z_given_H=0.8, p_z_given_not_H=0.1):
+        """
+        Vectorized Bayes update kernel for per-cell victim beliefs.
+
+        :param p_z_given_H: sensor likelihood of a detection if a victim is present
+        :param p_z_given_not_H: sensor likelihood of a detection if no victim is present
+        """
+        self.p_z_given_H = p_z_given_H
+        self.p_z_given_not_H = p_z_given_not_H
+        # In log-odds form the update is a single addition of this constant
+        self.log_likelihood_ratio = np.log(p_z_given_H) - np.log(p_z_given_not_H)
+
+    def likelihoods(self, z=None):
+        """
+        Sensor likelihoods (p(z | H), p(z | not H)) of the observations z.
+        :param z: observations (1 = detection, 0 = none), or None for a detection
+        """
+        if z is None:
+            return self.p_z_given_H, self.p_z_given_not_H
+        z = np.asarray(z, dtype=bool)
+        return (np.where(z, self.p_z_given_H, 1 - self.p_z_given_H),
+                np.where(z, self.p_z_given_not_H, 1 - self.p_z_given_not_H))
+
+    def posterior(self, prior, z=None):
+        """
+        Applies the sensor model to an array of priors at once.
+        :param prior: np.array of prior probabilities
+        :param z: optional observations, broadcast against prior (1 = detection,
+                  0 = none); a detection at every cell if None, which is what
+                  the robots' window updates apply
+        :return: np.array of posterior probabilities
+        """
+        p_z_given_H, p_z_given_not_H = self.likelihoods(z)
+        numerator = p_z_given_H * prior
+        denominator = numerator + p_z_given_not_H * (1 - prior)
+        return numerator / (denominator + 1e-10)  # epsilon to avoid zero division
+
+    def update_window(self, belief_vector, indices):
+        """
+        Updates belief_vector in place, touching only the cells in indices.
+        :param belief_vector: np.array of one robot's belief
+        :param indices: slice or index array of the observation window
+        """
+        belief_vector[indices] = self.posterior(belief_vector[indices])
+
+    def update_window_logodds(self, logodds_vector, indices):
+        """
+        Log-odds version of update_window: adds the log-likelihood ratio in place.
+        """
+        logodds_vector[indices] += self.log_likelihood_ratio
+
+    def update_window_quantized(self, stored, indices, precision):
+        """
+        update_window_logodds for quantized log-odds: decode, add, re-encode
+        (saturating at the precision's log-odds limit).
+        """
+        stored[indices] = precision.encode(precision.decode(stored[indices]) + self.log_likelihood_ratio)
+
+    def update_belief(self, belief, indices):
+        """
+        Updates a Belief's window in place in whichever representation it stores.
+        """
+        if belief.representation == "logodds":
+            if belief.precision.quantized:
+                self.update_window_quantized(belief.vector, indices, belief.precision)
+            else:
+                self.update_window_logodds(belief.vector, indices)
+            belief.mark_dirty(indices)
+        elif belief.representation == "sparse":
+            belief.update_window(indices, self.posterior(belief.get_cells(indices)))
+        else:
+            self.update_window(belief.vector, indices)
+            belief.mark_dirty(indices)
+
+    def update_fleet(self, beliefs, rows, windows, representation="prob", precision=None):
+        """
+        Updates the observation windows of many robots in one call.
+        :param beliefs: (num_robots, grid_size) array, updated in place
+        :param rows: row index of each robot in beliefs
+        :param windows: observation window (slice or index array) of each robot
+        :param representation: "prob" or "logodds", how beliefs are stored
+        :param precision: Precision of beliefs, when quantized
+        :return: number of cells updated
+        """
+        if len(rows) == 0:
+            return 0
+        row_idx, col_idx = self.window_indices(rows, windows)
+        if precision is not None and precision.quantized:
+            self.update_window_quantized(beliefs, (row_idx, col_idx), precision)
+        elif representation == "logodds":
+            beliefs[row_idx, col_idx] += self.log_likelihood_ratio
+        else:
+            beliefs[row_idx, col_idx] = self.posterior(beliefs[row_idx, col_idx])
+        return len(row_idx)
+
+    def update_robots(self, robots, current_time=None):
+        """
+        Bayes update for a list of robots sharing one FleetBeliefStore, in one
+        batch; every robot's derived quantities are told which window changed.
+        :return: number of cells updated
+        """
+        if not robots:
+            return 0
+        store = robots[0].belief_store
+        if store is None or any(r.belief_store is not store for r in robots[1:]):
+            return sum(r.observe_and_bayes_update(current_time) for r in robots)
+
+        windows = [r.get_observation_indices() for r in robots]
+        active = [r.needs_observation(w) for r, w in zip(robots, windows)]
+        if not all(active):
+            robots = [r for r, a in zip(robots, active) if a]
+            windows = [w for w, a in zip(windows, active) if a]
+            if not robots:
+                return 0
+        for r in robots:
+            r.observed_victim_version = r.victim_grid.version
+        rows = np.array([r.store_index for r in robots])
+        before = store.versions[rows]
+        num_cells = self.update_fleet(store.data, rows, windows, store.representation, store.precision)
+        bounds = np.array([window_bounds(w, store.grid_size) for w in windows], dtype=np.intp).reshape(-1, 2)
+        store.mark_dirty(rows, bounds[:, 0], bounds[:, 1])
+
+        # Derived quantities (occupancy, ...) are recomputed for the windows when next read
+        for r, window, version in zip(robots, windows, before):
+            r.belief_written(window, version)
+            if current_time is not None:
+                r.last_update_time = current_time
+        return num_cells
+
+    @staticmethod
+    def window_indices(rows, windows):
+        """
+        Flattens per-robot windows into (row, column) index arrays.
+        Contiguous slices are expanded without a Python loop over cells.
+        """
+        rows = np.asarray(rows)
+        if all(isinstance(w, slice) for w in windows):
+            starts = np.array([w.start for w in windows], dtype=np.intp)
+            lengths = np.array([w.stop - w.start for w in windows], dtype=np.intp)
+            offsets = np.cumsum(lengths) - lengths
+            total = int(lengths.sum())
+            col_idx = np.arange(total, dtype=np.intp) - np.repeat(offsets - starts, lengths)
+        else:
+            cols = [np.arange(w.start, w.stop) if isinstance(w, slice) else np.asarray(w, dtype=np.intp)
+                    for w in windows]
+            lengths = np.array([len(c) for c in cols], dtype=np.intp)
+            col_idx = np.concatenate(cols) if cols else np.empty(0, dtype=np.intp)
+        row_idx = np.repeat(rows, lengths)
+        return row_idx, col_idx
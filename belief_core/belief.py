@@ -0,0 +1,615 @@
+import numpy as np
+from .precision import get_precision
+
+REPRESENTATIONS = ("prob", "logodds")
+
+
+def _as_float(x):
+    """
+    x as a float array; float32 input stays float32, anything else becomes float64.
+    """
+    x = np.asarray(x)
+    return x if x.dtype == np.float32 else x.astype(np.float64, copy=False)
+
+
+def prob_to_logodds(p):
+    """
+    Converts probabilities to log-odds log(p / (1 - p)), clipping away from 0 and 1.
+    """
+    p = _as_float(p)
+    eps = max(1e-10, float(np.finfo(p.dtype).eps))  # 1 - 1e-10 rounds to 1 in float32
+    p = np.clip(p, eps, 1 - eps)
+    return np.log(p) - np.log1p(-p)
+
+
+def logodds_to_prob(logodds):
+    """
+    Converts log-odds back to probabilities (numerically stable sigmoid).
+    """
+    logodds = _as_float(logodds)
+    return np.exp(-np.logaddexp(logodds.dtype.type(0), -logodds))
+
+
+def window_bounds(indices, size):
+    """
+    Returns the [lo, hi) cell range covering indices (slice, index array or None = all).
+    """
+    if indices is None:
+        return 0, size
+    if isinstance(indices, slice):
+        start, stop, _ = indices.indices(size)
+        return start, stop
+    indices = np.asarray(indices)
+    if indices.size == 0:
+        return size, 0
+    return int(indices.min()), int(indices.max()) + 1
+
+
+def merge_ranges(ranges, limit=None):
+    """
+    Sorts [lo, hi) ranges and merges the overlapping and touching ones.
+    :param ranges: (k, 2) array-like of ranges; empty ones (lo >= hi) are dropped
+    :param limit: optional maximum number of ranges returned; beyond it the
+                  ranges separated by the smallest gaps are merged
+    :return: list of disjoint (lo, hi) ranges in increasing order
+    """
+    ranges = np.asarray(ranges, dtype=np.intp).reshape(-1, 2)
+    ranges = ranges[ranges[:, 0] < ranges[:, 1]]
+    if len(ranges) > 64:
+        # Long lists: coalesce in numpy before going back to Python
+        ranges = ranges[np.argsort(ranges[:, 0], kind="stable")]
+        reach = np.maximum.accumulate(ranges[:, 1])
+        starts = np.concatenate([[0], np.flatnonzero(ranges[1:, 0] > reach[:-1]) + 1])
+        ranges = np.stack([ranges[starts, 0], np.maximum.reduceat(ranges[:, 1], starts)], axis=1)
+    merged = []
+    for lo, hi in sorted(ranges.tolist()):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    if limit is not None and len(merged) > limit:
+        # Split only at the limit - 1 widest gaps
+        gaps = sorted(range(1, len(merged)), key=lambda i: merged[i][0] - merged[i - 1][1])
+        splits = sorted(gaps[len(gaps) - (limit - 1):]) if limit > 1 else []
+        bounds = [0] + splits + [len(merged)]
+        merged = [(merged[a][0], merged[b - 1][1]) for a, b in zip(bounds[:-1], bounds[1:])]
+    return merged
+
+
+class DirtyRanges:
+    # Ranges kept per row before a new write is merged into the nearest one
+    LIMIT = 8
+
+    def __init__(self, num_rows, size):
+        """
+        Per-row list of the [lo, hi) cell ranges written since the last clear.
+
+        A write that overlaps or touches a stored range extends it; any other
+        write gets its own slot, and once a row's LIMIT slots are used it is
+        merged into the range with the smallest gap to it. So writes far apart
+        (a robot that moved, windows of different robots in one store) stay
+        separate ranges instead of one bounding range spanning everything
+        between them.
+        :param num_rows: number of rows tracked
+        :param size: number of cells per row
+        """
+        self.size = size
+        self.ranges = np.zeros((num_rows, self.LIMIT, 2), dtype=np.intp)
+        self.counts = np.zeros(num_rows, dtype=np.intp)
+
+    def add(self, rows, lo, hi):
+        """
+        Records writes to [lo, hi) of the given (unique) rows; lo and hi may be per-row arrays.
+        """
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.intp))
+        lo = np.zeros(rows.shape, dtype=np.intp) + lo
+        hi = np.zeros(rows.shape, dtype=np.intp) + hi
+        written = lo < hi
+        if not written.all():
+            rows, lo, hi = rows[written], lo[written], hi[written]
+
+        slots = self.ranges[rows]
+        counts = self.counts[rows]
+        gaps = np.maximum(slots[:, :, 0], lo[:, None]) - np.minimum(slots[:, :, 1], hi[:, None])
+        gaps[np.arange(self.LIMIT) >= counts[:, None]] = self.size + 1
+        nearest = np.argmin(gaps, axis=1)
+        merge = (gaps[np.arange(len(rows)), nearest] <= 0) | (counts == self.LIMIT)
+
+        k = nearest[merge]
+        slots = self.ranges[rows[merge], k]
+        slots[:, 0] = np.minimum(slots[:, 0], lo[merge])
+        slots[:, 1] = np.maximum(slots[:, 1], hi[merge])
+        self.ranges[rows[merge], k] = slots
+        if not merge.all():
+            r, k = rows[~merge], counts[~merge]
+            self.ranges[r, k, 0] = lo[~merge]
+            self.ranges[r, k, 1] = hi[~merge]
+            self.counts[r] += 1
+
+    def get(self, row):
+        """
+        Returns the disjoint ranges written to row since the last clear, as a list of (lo, hi).
+        """
+        return merge_ranges(self.ranges[row, :self.counts[row]])
+
+    def union(self, rows, limit=None):
+        """
+        Returns the disjoint ranges written to any of the given rows since their last clear.
+        :param limit: optional maximum number of ranges (see merge_ranges)
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        return merge_ranges(self.ranges[rows][np.arange(self.LIMIT) < self.counts[rows][:, None]], limit)
+
+    def bounds(self, row):
+        """
+        Returns the [lo, hi) range covering every write to row (lo >= hi if none).
+        """
+        count = self.counts[row]
+        if count == 0:
+            return self.size, 0
+        ranges = self.ranges[row, :count]
+        return int(ranges[:, 0].min()), int(ranges[:, 1].max())
+
+    def clear(self, rows):
+        self.counts[rows] = 0
+
+
+class Belief:
+    def __init__(self, belief_vector, copy=True, representation="prob", store=None, row=None, precision=None):
+        """
+        Initialize a belief vector (scalar probabilities per cell).
+
+        Args:
+            belief_vector (array-like): List or numpy array of probabilities (0 to 1).
+            copy (bool): If False and belief_vector already has the stored dtype, the
+                belief wraps it directly (used for views into a FleetBeliefStore).
+            representation (str): "prob" stores probabilities, "logodds" stores
+                log(p / (1 - p)) so Bayes updates and Chernoff fusion are additions.
+                belief_vector is always given in probabilities unless copy is False,
+                in which case it is wrapped as-is in the chosen representation.
+            store (FleetBeliefStore): store this belief is a row view of, if any;
+                its version counter and dirty ranges then live in the store.
+            row (int): row of this belief in store.
+            precision (Precision or str): storage precision (float64 if None);
+                the quantized formats require the "logodds" representation.
+        """
+        if representation not in REPRESENTATIONS:
+            raise ValueError(f"Unknown belief representation: {representation}")
+        self.representation = representation
+        self.precision = get_precision(precision)
+        if self.precision.quantized and representation != "logodds":
+            raise ValueError(f"{self.precision.name} beliefs require the logodds representation")
+        if copy:
+            vector = np.array(belief_vector, dtype=np.float64)
+            if representation == "logodds":
+                vector = prob_to_logodds(vector)
+            self.vector = self.precision.encode(vector)
+        else:
+            self.vector = np.asarray(belief_vector, dtype=self.precision.dtype)
+        # No normalization needed here
+
+        # Change tracking: a version counter plus the [lo, hi) ranges written since clear_dirty()
+        self._store = store
+        self._row = row
+        self._version = 0
+        self._dirty = DirtyRanges(1, len(self.vector)) if store is None else None
+
+    def mark_dirty(self, indices=None):
+        """
+        Records a write to the given cells (all cells if None).
+        Call this after modifying self.vector directly.
+        """
+        lo, hi = window_bounds(indices, len(self.vector))
+        if self._store is not None:
+            self._store.mark_dirty(self._row, lo, hi)
+            return
+        self._version += 1
+        self._dirty.add(0, lo, hi)
+
+    @property
+    def version(self):
+        if self._store is not None:
+            return int(self._store.versions[self._row])
+        return self._version
+
+    def dirty_range(self):
+        """
+        Returns the [lo, hi) cell range covering every write since the last clear_dirty() (lo >= hi if none).
+        """
+        if self._store is not None:
+            return self._store.dirty.bounds(self._row)
+        return self._dirty.bounds(0)
+
+    def dirty_ranges(self):
+        """
+        Returns the disjoint [lo, hi) cell ranges written since the last clear_dirty(), as a list of (lo, hi).
+        """
+        if self._store is not None:
+            return self._store.dirty.get(self._row)
+        return self._dirty.get(0)
+
+    def clear_dirty(self):
+        if self._store is not None:
+            self._store.clear_dirty(self._row)
+        else:
+            self._dirty.clear(0)
+
+    def decoded(self, indices=None):
+        """
+        Returns the stored values (all cells, or indices) as floats in the
+        stored representation. Without quantization this is the stored array.
+        """
+        return self.precision.decode(self.vector if indices is None else self.vector[indices])
+
+    def log(self):
+        """
+        Returns the log of the belief vector, with clipping to avoid log(0).
+        """
+        if self.representation == "logodds":
+            return -np.logaddexp(0.0, -self.decoded())
+        return np.log(np.clip(self.vector, 1e-10, 1.0))
+
+    def exp(self):
+        """
+        Returns exponentiated belief vector (useful after log-sum ops).
+        """
+        return np.exp(self.decoded())
+
+    def update(self, new_vector):
+        """
+        Update the belief vector in place without normalization.
+        new_vector is given in probabilities.
+        """
+        if self.representation == "logodds":
+            self.vector[...] = self.precision.encode(prob_to_logodds(new_vector))
+        else:
+            self.vector[...] = new_vector
+        self.mark_dirty()
+
+    def update_window(self, indices, new_values):
+        """
+        Overwrite only the cells selected by indices (slice or index array).
+        new_values are given in probabilities.
+        """
+        if self.representation == "logodds":
+            self.vector[indices] = self.precision.encode(prob_to_logodds(new_values))
+        else:
+            self.vector[indices] = new_values
+        self.mark_dirty(indices)
+
+    def get(self):
+        """
+        Returns the belief vector as probabilities.
+        In log-odds mode this converts on read and returns a new array.
+        """
+        if self.representation == "logodds":
+            return logodds_to_prob(self.decoded())
+        return self.vector
+
+    def get_logodds(self):
+        """
+        Returns the belief vector as log-odds (the stored array in unquantized log-odds mode).
+        """
+        if self.representation == "logodds":
+            return self.decoded()
+        return prob_to_logodds(self.vector)
+
+    def update_logodds(self, new_logodds):
+        """
+        Update the belief from a log-odds vector, in place.
+        """
+        if self.representation == "logodds":
+            self.vector[...] = self.precision.encode(new_logodds)
+        else:
+            self.vector[...] = logodds_to_prob(new_logodds)
+        self.mark_dirty()
+
+    def __len__(self):
+        return len(self.vector)
+
+    def __getitem__(self, idx):
+        if self.representation == "logodds":
+            return logodds_to_prob(self.decoded(idx))
+        return self.vector[idx]
+
+    def __str__(self):
+        return str(self.get())
+
+    def as_numpy(self):
+        return np.array(self.get(), copy=True)
+
+
+class FleetBeliefStore:
+    def __init__(self, num_robots, grid_size, initial_value=0.5, representation="prob", buffer=None,
+                 precision=None):
+        """
+        Preallocated (num_robots, grid_size) block holding every robot's belief.
+
+        Each robot's Belief is a row view into this array, so per-step updates
+        write in place and fleet-wide reads are a single slice of one array.
+
+        :param num_robots: number of rows (robots) in the store
+        :param grid_size: number of cells per belief vector
+        :param initial_value: scalar or (grid_size,) array of probabilities used to fill every row
+        :param representation: "prob" or "logodds", shared by every row
+        :param buffer: optional existing buffer (e.g. shared memory) to hold the block
+        :param precision: storage precision of the block (float64 if None); a float32
+                          block takes half the memory, int16 a quarter and int8 an eighth
+        """
+        if representation not in REPRESENTATIONS:
+            raise ValueError(f"Unknown belief representation: {representation}")
+        self.num_robots = num_robots
+        self.grid_size = grid_size
+        self.representation = representation
+        self.precision = get_precision(precision)
+        if self.precision.quantized and representation != "logodds":
+            raise ValueError(f"{self.precision.name} beliefs require the logodds representation")
+        if buffer is None:
+            self.data = np.empty((num_robots, grid_size), dtype=self.precision.dtype)
+        else:
+            self.data = np.ndarray((num_robots, grid_size), dtype=self.precision.dtype, buffer=buffer)
+        self.data[:] = self.encode(initial_value)
+
+        # Per-row version counters and [lo, hi) ranges written since the last clear
+        self.versions = np.zeros(num_robots, dtype=np.int64)
+        self.dirty = DirtyRanges(num_robots, grid_size)
+
+    @classmethod
+    def from_beliefs(cls, belief_vectors, representation="prob", precision=None):
+        """
+        Build a store from a list of per-robot belief vectors (probabilities).
+        """
+        belief_vectors = np.asarray(belief_vectors, dtype=np.float64)
+        store = cls(belief_vectors.shape[0], belief_vectors.shape[1], representation=representation,
+                    precision=precision)
+        store.data[:] = store.encode(belief_vectors)
+        return store
+
+    def encode(self, probabilities):
+        """
+        Converts probabilities to stored values (representation and precision).
+        """
+        if self.representation == "logodds":
+            return self.precision.encode(prob_to_logodds(probabilities))
+        return self.precision.encode(probabilities)
+
+    def view(self, row):
+        """
+        Returns a Belief that reads and writes row `row` of the store in place.
+        """
+        return Belief(self.data[row], copy=False, representation=self.representation, store=self, row=row,
+                      precision=self.precision)
+
+    def mark_dirty(self, rows, lo, hi):
+        """
+        Records writes to [lo, hi) of the given (unique) rows; lo and hi may be per-row arrays.
+        """
+        self.versions[rows] += 1
+        self.dirty.add(rows, lo, hi)
+
+    def clear_dirty(self, rows):
+        self.dirty.clear(rows)
+
+    def rows(self, row_indices):
+        """
+        Returns the stacked beliefs of the given rows as a (k, grid_size) array of probabilities.
+        """
+        if self.representation == "logodds":
+            return logodds_to_prob(self.decoded_rows(row_indices))
+        return self.data[row_indices]
+
+    def logodds_rows(self, row_indices):
+        """
+        Returns the stacked beliefs of the given rows as log-odds.
+        """
+        if self.representation == "logodds":
+            return self.decoded_rows(row_indices)
+        return prob_to_logodds(self.data[row_indices])
+
+    def decoded_rows(self, row_indices, lo=0, hi=None):
+        """
+        Returns columns [lo, hi) of the given rows as floats in the stored representation.
+        """
+        return self.precision.decode(self.data[row_indices, lo:hi])
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    def __len__(self):
+        return self.num_robots
+
+
+def _shared_store(robots):
+    store = getattr(robots[0], "belief_store", None) if robots else None
+    if store is not None and all(getattr(r, "belief_store", None) is store for r in robots[1:]):
+        return store
+    return None
+
+
+def stack_beliefs(robots):
+    """
+    Returns the beliefs of `robots` as one (len(robots), grid_size) array of probabilities.
+
+    When all robots are views into the same FleetBeliefStore this is a single
+    fancy-index read of the shared block instead of one get() per robot.
+    """
+    store = _shared_store(robots)
+    if store is not None:
+        return store.rows([r.store_index for r in robots])
+    return np.stack([r.belief.get() for r in robots])
+
+
+def stack_logodds(robots):
+    """
+    Same as stack_beliefs, but returns log-odds.
+    """
+    store = _shared_store(robots)
+    if store is not None:
+        return store.logodds_rows([r.store_index for r in robots])
+    return np.stack([r.belief.get_logodds() for r in robots])
+
+
+class SparseBelief:
+    def __init__(self, size, default, indices=None, values=None):
+        """
+        Belief that stores only the cells deviating from a default (nominal) belief.
+
+        :param size: number of cells in the full belief vector
+        :param default: scalar or (size,) array holding the value of every unstored cell
+        :param indices: sorted unique cell indices that are stored explicitly
+        :param values: values of the stored cells
+        """
+        self.representation = "sparse"
+        self.size = size
+        self.default = default if np.isscalar(default) else np.asarray(default, dtype=np.float64)
+        self.indices = np.empty(0, dtype=np.intp) if indices is None else np.asarray(indices, dtype=np.intp)
+        self.values = np.empty(0, dtype=np.float64) if values is None else np.asarray(values, dtype=np.float64)
+        self._default_sum = None
+        self._version = 0
+        self._dirty = DirtyRanges(1, size)
+
+    def mark_dirty(self, indices=None):
+        lo, hi = window_bounds(indices, self.size)
+        self._version += 1
+        self._dirty.add(0, lo, hi)
+
+    @property
+    def version(self):
+        return self._version
+
+    def dirty_range(self):
+        return self._dirty.bounds(0)
+
+    def dirty_ranges(self):
+        return self._dirty.get(0)
+
+    def clear_dirty(self):
+        self._dirty.clear(0)
+
+    @classmethod
+    def from_dense(cls, vector, default):
+        """
+        Build a sparse belief from a dense vector, keeping cells that differ from default.
+        """
+        vector = np.asarray(vector, dtype=np.float64)
+        indices = np.flatnonzero(vector != default)
+        return cls(len(vector), default, indices, vector[indices])
+
+    def default_at(self, indices):
+        """
+        Default (nominal) value at the given cells.
+        """
+        if np.isscalar(self.default):
+            return np.full(len(indices), self.default, dtype=np.float64)
+        return self.default[indices]
+
+    def default_sum(self):
+        if self._default_sum is None:
+            self._default_sum = self.default * self.size if np.isscalar(self.default) else float(np.sum(self.default))
+        return self._default_sum
+
+    def get_cells(self, indices):
+        """
+        Values of the given cells (slice or index array), stored or default.
+        """
+        if isinstance(indices, slice):
+            indices = np.arange(*indices.indices(self.size))
+        indices = np.asarray(indices, dtype=np.intp)
+        out = self.default_at(indices)
+        pos = np.searchsorted(self.indices, indices)
+        pos = np.minimum(pos, max(len(self.indices) - 1, 0))
+        hit = (self.indices[pos] == indices) if len(self.indices) else np.zeros(len(indices), dtype=bool)
+        out[hit] = self.values[pos[hit]]
+        return out
+
+    def update_window(self, indices, new_values):
+        """
+        Overwrite the given cells; cells that return to the default are dropped.
+        """
+        if isinstance(indices, slice):
+            indices = np.arange(*indices.indices(self.size))
+        indices = np.asarray(indices, dtype=np.intp)
+        new_values = np.broadcast_to(np.asarray(new_values, dtype=np.float64), indices.shape)
+
+        keep_old = ~np.isin(self.indices, indices, assume_unique=True)
+        changed = new_values != self.default_at(indices)
+        merged_idx = np.concatenate([self.indices[keep_old], indices[changed]])
+        merged_val = np.concatenate([self.values[keep_old], new_values[changed]])
+        order = np.argsort(merged_idx, kind="stable")
+        self.indices, self.values = merged_idx[order], merged_val[order]
+        self.mark_dirty(indices)
+
+    def update(self, new_vector):
+        """
+        Replace the whole belief from a dense vector.
+        """
+        dense = SparseBelief.from_dense(new_vector, self.default)
+        self.indices, self.values = dense.indices, dense.values
+        self.mark_dirty()
+
+    def to_dense(self, out=None):
+        """
+        Dense probability vector, written into out (e.g. a history row) if given.
+        """
+        dense = np.empty(self.size, dtype=np.float64) if out is None else out
+        dense[:] = self.default
+        dense[self.indices] = self.values
+        return dense
+
+    def __array__(self, dtype=None, copy=None):
+        # np.asarray(sparse) densifies, for consumers that need every cell
+        dense = self.to_dense()
+        return dense if dtype is None else dense.astype(dtype, copy=False)
+
+    def histogram(self, bins, cache=None):
+        """
+        Counts of the cell values in bins, as np.histogram(self.to_dense(), bins)[0]
+        without densifying.
+        :param cache: optional dict owned by the caller; the histogram of the
+                      default over all cells is kept in it for the last
+                      (default, bins) seen, which fused beliefs share. A
+                      writable default array is never cached, as it may change.
+        """
+        key = (self.size, tuple(np.asarray(bins, dtype=np.float64).tolist()))
+        frozen = np.isscalar(self.default) or not self.default.flags.writeable
+        if cache is not None and frozen and cache.get("default") is self.default and cache.get("key") == key:
+            counts = cache["counts"]
+        else:
+            counts = np.histogram(np.broadcast_to(self.default, (self.size,)), bins)[0]
+            if cache is not None and frozen:
+                cache.update(default=self.default, key=key, counts=counts)
+        counts = counts + np.histogram(self.values, bins)[0]
+        return counts - np.histogram(self.default_at(self.indices), bins)[0]
+
+    def get(self):
+        """
+        Returns the belief as a dense probability vector (allocates; O(size)).
+        """
+        return self.to_dense()
+
+    def get_logodds(self):
+        return prob_to_logodds(self.to_dense())
+
+    def mean(self):
+        """
+        Mean over all cells without densifying.
+        """
+        stored_default = np.sum(self.default_at(self.indices))
+        return (np.sum(self.values) + self.default_sum() - stored_default) / self.size
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, idx):
+        return self.get_cells(idx)
+
+    def __str__(self):
+        return f"SparseBelief(size={self.size}, nnz={self.nnz})"
+
+    def as_numpy(self):
+        return self.to_dense()
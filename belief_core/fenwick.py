@@ -0,0 +1,117 @@
+import numpy as np
+
+
+def _lowbit(i):
+    return i & -i
+
+
+class FenwickTree:
+    def __init__(self, size, values=None):
+        """
+        Binary indexed tree over `size` cells: point additions and prefix sums
+        in O(log size), both vectorized over arrays of cells.
+        :param values: optional initial cell values
+        """
+        self.size = size
+        self.tree = np.zeros(size + 1, dtype=np.float64)  # 1-based
+        if values is not None:
+            self.rebuild(values)
+
+    def rebuild(self, values):
+        """
+        Rebuilds the tree from cell values in O(size): node i covers the
+        cells (i - lowbit(i), i], so it is a difference of two prefix sums.
+        """
+        prefix = np.concatenate(([0.0], np.cumsum(np.asarray(values, dtype=np.float64))))
+        i = np.arange(1, self.size + 1)
+        self.tree[1:] = prefix[i] - prefix[i - _lowbit(i)]
+
+    def add(self, indices, values):
+        """
+        Adds values[j] to cell indices[j]; repeated indices accumulate.
+        """
+        i = np.asarray(indices, dtype=np.intp).ravel() + 1
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), i.shape).ravel()
+        while len(i):
+            np.add.at(self.tree, i, values)
+            i = i + _lowbit(i)
+            keep = i <= self.size
+            i, values = i[keep], values[keep]
+
+    def prefix(self, ends):
+        """
+        Sum of cells [0, end) for every end in ends.
+        """
+        i = np.array(ends, dtype=np.intp)
+        total = np.zeros(i.shape)
+        while np.any(i > 0):
+            total += self.tree[i]  # tree[0] is always 0
+            i -= _lowbit(i)
+        return total
+
+    def range_sum(self, lo, hi):
+        """
+        Sum of cells [lo, hi), vectorized over arrays of bounds.
+        """
+        return self.prefix(hi) - self.prefix(lo)
+
+
+class FenwickTree2D:
+    def __init__(self, height, width, values=None):
+        """
+        2-D binary indexed tree: point additions and rectangle sums in
+        O(log height * log width), vectorized over arrays of points.
+        :param values: optional initial (height, width) cell values
+        """
+        self.height, self.width = height, width
+        self.tree = np.zeros((height + 1, width + 1), dtype=np.float64)
+        if values is not None:
+            self.rebuild(values)
+
+    def rebuild(self, values):
+        prefix = np.zeros((self.height + 1, self.width + 1))
+        prefix[1:, 1:] = np.cumsum(np.cumsum(np.asarray(values, dtype=np.float64), axis=0), axis=1)
+        r = np.arange(1, self.height + 1)[:, None]
+        c = np.arange(1, self.width + 1)[None, :]
+        r0, c0 = r - _lowbit(r), c - _lowbit(c)
+        self.tree[1:, 1:] = prefix[r, c] - prefix[r0, c] - prefix[r, c0] + prefix[r0, c0]
+
+    def add(self, rows, cols, values):
+        r = np.asarray(rows, dtype=np.intp).ravel() + 1
+        c0 = np.asarray(cols, dtype=np.intp).ravel() + 1
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), r.shape).ravel()
+        while len(r):
+            c, v, rr = c0, values, r
+            while len(c):
+                np.add.at(self.tree, (rr, c), v)
+                c = c + _lowbit(c)
+                keep = c <= self.width
+                c, v, rr = c[keep], v[keep], rr[keep]
+            r = r + _lowbit(r)
+            keep = r <= self.height
+            r, c0, values = r[keep], c0[keep], values[keep]
+
+    def prefix(self, rows, cols):
+        """
+        Sum of the rectangle [0, row) x [0, col) for every (row, col).
+        """
+        r = np.array(rows, dtype=np.intp)
+        c0 = np.array(cols, dtype=np.intp)
+        total = np.zeros(np.broadcast(r, c0).shape)
+        r = np.broadcast_to(r, total.shape).copy()
+        c0 = np.broadcast_to(c0, total.shape)
+        while np.any(r > 0):
+            c = c0.copy()
+            while np.any(c > 0):
+                total += self.tree[r, c]
+                c -= _lowbit(c)
+            r -= _lowbit(r)
+        return total
+
+    def rect_sum(self, r0, r1, c0, c1):
+        """
+        Sum of the rectangle [r0, r1) x [c0, c1), bounds clipped to the grid.
+        """
+        r0, r1 = np.clip(r0, 0, self.height), np.clip(r1, 0, self.height)
+        c0, c1 = np.clip(c0, 0, self.width), np.clip(c1, 0, self.width)
+        return self.prefix(r1, c1) - self.prefix(r0, c1) - self.prefix(r1, c0) + self.prefix(r0, c0)
@@ -0,0 +1,341 @@
+import numpy as np
+from .belief import SparseBelief, logodds_to_prob, prob_to_logodds, stack_beliefs
+from .HellingerDistance import HellingerDistance
+from .precision import get_precision
+
+# "geometric": weighted geometric mean of the cell probabilities, prod p_i^w_i (unnormalized)
+# "bernoulli": per-cell Bernoulli Chernoff fusion, normalized against prod (1 - p_i)^w_i
+FUSION_RULES = ("geometric", "bernoulli")
+
+
+class FusionRule:
+    def __init__(self, reference=None, precision=None, rule="geometric"):
+        """
+        Chernoff fusion of per-cell victim beliefs.
+
+        Which rule is applied does not depend on how beliefs are stored: both
+        rules are a weighted sum in their own log domain (log p for
+        "geometric", log-odds for "bernoulli"), and beliefs are converted to
+        and from that domain with to_log / from_log. With "bernoulli" and
+        log-odds storage the conversions are free.
+        :param reference: optional reference PMF for comparisons
+        :param precision: float precision of the fused beliefs
+        :param rule: one of FUSION_RULES
+        """
+        if rule not in FUSION_RULES:
+            raise ValueError(f"rule must be one of {FUSION_RULES}, got {rule!r}")
+        self.reference = reference  # Optional reference PMF for comparisons
+        self.hellinger = HellingerDistance()
+        # Fused beliefs are computed in precision.float_dtype (dense rules; sparse stays float64)
+        self.precision = get_precision(precision)
+        self.rule = rule
+
+    @property
+    def log_domain(self):
+        """
+        "logodds" if the rule sums log-odds, "prob" if it sums log-probabilities.
+        """
+        return "logodds" if self.rule == "bernoulli" else "prob"
+
+    def to_log(self, beliefs, representation="prob", out=None):
+        """
+        Stored beliefs (probabilities or log-odds) to the rule's log domain.
+        :param out: optional output array (may be beliefs itself)
+        """
+        if self.rule == "bernoulli":
+            logs = beliefs if representation == "logodds" else prob_to_logodds(beliefs)
+        elif representation == "logodds":
+            # log p = -log(1 + exp(-l))
+            logs = np.negative(np.logaddexp(np.zeros((), dtype=np.asarray(beliefs).dtype), np.negative(beliefs)), out=out)
+        else:
+            logs = np.log(np.add(beliefs, 1e-10, out=out), out=out)
+        if out is not None and logs is not out:
+            out[...] = logs
+            return out
+        return logs
+
+    def from_log(self, logs, representation="prob", out=None):
+        """
+        Fused values in the rule's log domain back to a stored representation.
+        :param out: optional output array
+        """
+        if self.rule == "bernoulli":
+            fused = logs if representation == "logodds" else logodds_to_prob(logs)
+        elif representation == "logodds":
+            fused = prob_to_logodds(np.exp(logs))
+        else:
+            fused = np.exp(logs, out=out)
+            # No normalization across cells (independent probabilities); clamp rounding errors
+            return np.clip(fused, 0.0, 1.0, out=fused)
+        if out is not None:
+            out[...] = fused
+            return out
+        return fused
+
+    def to_prob(self, logs):
+        """
+        Fused values in the rule's log domain to probabilities.
+        """
+        return self.from_log(logs, "prob")
+
+    def compute_metropolis_weight(self, id_a, id_b, neighbors):
+        """
+        Metropolis-Hastings consensus weight of robot b's belief in robot a's
+        update: 1 / (1 + max(deg_a, deg_b)) for neighbors, 0 for non-neighbors
+        and 1 minus the neighbors' weights for a itself. gossip.metropolis_weights
+        builds the same weights for a whole graph at once.
+        :param neighbors: mapping robot id -> ids of its neighbors in the communication graph
+        """
+        if id_a == id_b:
+            return 1.0 - sum(self.compute_metropolis_weight(id_a, other, neighbors) for other in neighbors[id_a])
+        if id_b not in neighbors[id_a]:
+            return 0.0
+        return 1.0 / (1 + max(len(neighbors[id_a]), len(neighbors[id_b])))
+    
+    def chernoff_fusion(self, belief_a, belief_b, omega=None):
+        """
+        Perform Chernoff fusion between two belief vectors (element-wise).
+        :param belief_a: np.array of robot a's belief (probabilities per cell)
+        :param belief_b: np.array of robot b's belief (probabilities per cell)
+        :param omega: weight for robot a; if None, default to 0.5
+        :return: np.array of fused belief (probabilities per cell)
+        """
+        belief_a = np.asarray(belief_a, dtype=self.precision.float_dtype)
+        belief_b = np.asarray(belief_b, dtype=self.precision.float_dtype)
+
+        if omega is None:
+            omega = 0.5
+
+        # Element-wise fusion in the rule's log domain
+        log_fused = omega * self.to_log(belief_a) + (1 - omega) * self.to_log(belief_b)
+        return self.from_log(log_fused)
+    
+    def chernoff_fusion_n(self, belief_list, omega_list, out=None):
+        """
+        Generalized Chernoff fusion for N robots using weighted log averaging.
+        :param belief_list: List of belief vectors, or an (N, grid_size) array, from N robots
+        :param omega_list: Corresponding weights for each robot (sum should be 1)
+        :param out: optional preallocated (grid_size,) output array
+        :return: fused belief vector
+        """
+        beliefs = np.asarray(belief_list, dtype=self.precision.float_dtype)
+        omega_list = np.asarray(omega_list, dtype=self.precision.float_dtype)
+
+        # Weighted sum of logs as one matrix-vector product over the stacked beliefs
+        log_fused = omega_list @ self.to_log(beliefs)
+        return self.from_log(log_fused, out=out)
+
+    def chernoff_fusion_logodds(self, logodds_a, logodds_b, omega=None):
+        """
+        Chernoff fusion of two log-odds belief vectors. With the "bernoulli"
+        rule this is a weighted sum, no log/exp: the per-cell fusion
+        p_a^w p_b^(1-w) / (p_a^w p_b^(1-w) + (1-p_a)^w (1-p_b)^(1-w)).
+        :param logodds_a: np.array of robot a's belief as log-odds
+        :param logodds_b: np.array of robot b's belief as log-odds
+        :param omega: weight for robot a; if None, default to 0.5
+        :return: np.array of fused belief as log-odds
+        """
+        if omega is None:
+            omega = 0.5
+        dtype = self.precision.float_dtype
+        log_a = self.to_log(np.asarray(logodds_a, dtype=dtype), "logodds")
+        log_b = self.to_log(np.asarray(logodds_b, dtype=dtype), "logodds")
+        return self.from_log(omega * log_a + (1 - omega) * log_b, "logodds")
+
+    def chernoff_fusion_n_logodds(self, logodds_list, omega_list):
+        """
+        Generalized Chernoff fusion for N log-odds beliefs (a weighted sum with "bernoulli").
+        :param logodds_list: List or (N, grid_size) array of log-odds beliefs
+        :param omega_list: Corresponding weights for each robot (sum should be 1)
+        :return: fused belief vector as log-odds
+        """
+        dtype = self.precision.float_dtype
+        logs = self.to_log(np.asarray(logodds_list, dtype=dtype), "logodds")
+        return self.from_log(np.asarray(omega_list, dtype=dtype) @ logs, "logodds")
+
+    def chernoff_fusion_sparse(self, belief_a, belief_b, omega=None):
+        """
+        Chernoff fusion of two SparseBeliefs sharing the same default (nominal).
+        Only the union of their stored cells is touched; every other cell fuses
+        the nominal with itself and stays at the nominal.
+        :param belief_a: SparseBelief of robot a
+        :param belief_b: SparseBelief of robot b
+        :param omega: weight for robot a; if None, default to 0.5
+        :return: SparseBelief of the fused belief
+        """
+        if omega is None:
+            omega = 0.5
+        return self.chernoff_fusion_n_sparse([belief_a, belief_b], [omega, 1 - omega])
+
+    def chernoff_fusion_n_sparse(self, belief_list, omega_list):
+        """
+        Generalized Chernoff fusion for N SparseBeliefs sharing the same default.
+        Cost is proportional to the total number of stored cells, not grid size.
+        :param belief_list: List of SparseBelief from N robots
+        :param omega_list: Corresponding weights for each robot (sum should be 1)
+        :return: SparseBelief of the fused belief
+        """
+        omega_list = np.asarray(omega_list, dtype=np.float64)
+        first = belief_list[0]
+        union = np.unique(np.concatenate([b.indices for b in belief_list]))
+        if len(union) == 0:
+            return SparseBelief(first.size, first.default)
+
+        # Start from every robot holding the nominal, then add each robot's deviation
+        log_nominal = self.to_log(first.default_at(union))
+        log_fused = np.sum(omega_list) * log_nominal
+        positions = np.concatenate([np.searchsorted(union, b.indices) for b in belief_list])
+        deltas = np.concatenate([w * (self.to_log(b.values) - log_nominal[np.searchsorted(union, b.indices)])
+                                 for b, w in zip(belief_list, omega_list)])
+        log_fused += np.bincount(positions, weights=deltas, minlength=len(union))
+
+        return SparseBelief(first.size, first.default, union, self.from_log(log_fused))
+
+    def compute_omega_weights(self, robots, current_time,
+                              alpha_time=0.25, alpha_conf=0.25, alpha_degrade=0.25, alpha_sensor=0.25):
+        """
+        Compute omega for each robot using:
+        - Time since last update (smaller gap = higher score)
+        - Confidence = 1 - occupancy
+        - Belief degradation (1 - Hellinger distance)
+        - Sensor quality (static attribute per robot)
+        Gathers fleet arrays from the robots and delegates to omega_weights_from_arrays.
+        """
+        if not robots:
+            return []
+        last_update_times = np.array([getattr(r, "last_update_time", 0) for r in robots], dtype=np.float64)
+        sensor_qualities = np.array([getattr(r, "sensor_quality", 0.7) for r in robots], dtype=np.float64)
+
+        if robots[0].belief.representation == "sparse":
+            # Sparse beliefs: per-robot cost scales with stored cells, not grid size
+            distances = np.array([self.hellinger.compute_bernoulli_sparse(r.belief) for r in robots])
+            occupancy_means = np.array([r.current_occupancy.mean() for r in robots])
+            omega = self.omega_weights_from_scores(distances, occupancy_means, last_update_times,
+                                                   sensor_qualities, current_time,
+                                                   alpha_time, alpha_conf, alpha_degrade, alpha_sensor)
+            return omega.tolist()
+
+        beliefs = stack_beliefs(robots)
+        nominal = robots[0].nominal_belief
+        if any(r.nominal_belief is not nominal for r in robots[1:]):
+            nominal = np.stack([r.nominal_belief for r in robots])
+        occupancies = np.stack([getattr(r, "current_occupancy", np.zeros(beliefs.shape[1])) for r in robots])
+
+        omega = self.omega_weights_from_arrays(beliefs, nominal, occupancies, last_update_times,
+                                               sensor_qualities, current_time,
+                                               alpha_time, alpha_conf, alpha_degrade, alpha_sensor)
+        return omega.tolist()
+
+    def omega_weights_from_arrays(self, beliefs, nominal, occupancies, last_update_times, sensor_qualities,
+                                  current_time, alpha_time=0.25, alpha_conf=0.25, alpha_degrade=0.25,
+                                  alpha_sensor=0.25):
+        """
+        Vectorized omega computation over the whole fleet.
+        :param beliefs: (N, grid_size) array of robot beliefs (probabilities)
+        :param nominal: (grid_size,) nominal belief, or (N, grid_size) per robot
+        :param occupancies: (N, grid_size) array of current occupancy vectors
+        :param last_update_times: (N,) time of each robot's last belief update
+        :param sensor_qualities: (N,) static sensor quality of each robot
+        :param current_time: current simulation time
+        :return: np.array of N weights summing to 1
+        """
+        # Beliefs are independent cell probabilities rather than one PMF, so the
+        # degradation term uses the per-cell Bernoulli Hellinger distance
+        distances = self.hellinger.compute_bernoulli(beliefs, nominal)
+        occupancy_means = np.mean(occupancies, axis=1)
+        return self.omega_weights_from_scores(distances, occupancy_means, last_update_times, sensor_qualities,
+                                              current_time, alpha_time, alpha_conf, alpha_degrade, alpha_sensor)
+
+    def omega_weights_from_scores(self, hellinger_distances, occupancy_means, last_update_times,
+                                  sensor_qualities, current_time, alpha_time=0.25, alpha_conf=0.25,
+                                  alpha_degrade=0.25, alpha_sensor=0.25):
+        """
+        Combine per-robot raw scores into normalized omega weights.
+        :param hellinger_distances: (N,) distance of each belief to its nominal
+        :param occupancy_means: (N,) mean occupancy of each robot
+        :return: np.array of N weights summing to 1
+        """
+        # Time score (more recent = higher)
+        gap = np.maximum(1, current_time - np.asarray(last_update_times, dtype=np.float64))
+        time_scores = 1.0 / (1 + gap)
+
+        # Confidence score: 1 - avg occupancy
+        conf_scores = 1.0 - np.asarray(occupancy_means, dtype=np.float64)
+
+        # Degradation: 1 - Hellinger distance
+        degrade_scores = 1.0 - np.asarray(hellinger_distances, dtype=np.float64)
+
+        # Sensor quality
+        sensor_scores = np.asarray(sensor_qualities, dtype=np.float64)
+
+        # Normalize individual components
+        def normalize(arr):
+            return arr / (np.sum(arr) + 1e-10)
+
+        # Weighted sum of all factors
+        omega = (
+            alpha_time * normalize(time_scores) +
+            alpha_conf * normalize(conf_scores) +
+            alpha_degrade * normalize(degrade_scores) +
+            alpha_sensor * normalize(sensor_scores)
+        )
+
+        return normalize(omega)
+
+    @staticmethod
+    def fused_entropy(log_fused, representation="prob"):
+        """
+        Total Bernoulli entropy of fused beliefs given in the log domain.
+        :param log_fused: (..., grid_size) log-probabilities, or log-odds
+        :return: (...) array of entropies summed over cells
+        """
+        if representation == "logodds":
+            log_p = -np.logaddexp(0.0, -log_fused)
+            log_q = -np.logaddexp(0.0, log_fused)
+        else:
+            log_p = np.minimum(log_fused, 0.0)
+            log_q = np.log(np.clip(-np.expm1(log_p), 1e-10, 1.0))
+        p = np.exp(log_p)
+        return -np.sum(p * log_p + (1 - p) * log_q, axis=-1)
+
+    def optimal_omega_batch(self, log_a, log_b, representation="prob", tol=1e-4, max_iter=60):
+        """
+        Information-optimal Chernoff weight for K belief pairs at once.
+        For each pair k it finds omega in [0, 1] minimizing the entropy of
+        omega * log_a[k] + (1 - omega) * log_b[k], using a bounded golden-section
+        search that runs on all pairs simultaneously.
+        :param log_a: (K, grid_size) log-domain beliefs (log-probabilities, or log-odds)
+        :param log_b: (K, grid_size) log-domain beliefs
+        :return: (K,) array of optimal omegas
+        """
+        log_a = np.atleast_2d(log_a)
+        log_b = np.atleast_2d(log_b)
+        diff = log_a - log_b
+
+        def entropy(omega):
+            return self.fused_entropy(log_b + omega[:, None] * diff, representation)
+
+        ratio = (np.sqrt(5) - 1) / 2
+        lo = np.zeros(len(log_a))
+        hi = np.ones(len(log_a))
+        x1 = hi - ratio * (hi - lo)
+        x2 = lo + ratio * (hi - lo)
+        f1, f2 = entropy(x1), entropy(x2)
+        for _ in range(max_iter):
+            if np.max(hi - lo) < tol:
+                break
+            left = f1 < f2  # minimum lies in [lo, x2]
+            hi = np.where(left, x2, hi)
+            lo = np.where(left, lo, x1)
+            x1_new = np.where(left, hi - ratio * (hi - lo), x2)
+            x2_new = np.where(left, x1, lo + ratio * (hi - lo))
+            # Only one new point per pair needs an evaluation
+            f_probe = entropy(np.where(left, x1_new, x2_new))
+            f1, f2 = np.where(left, f_probe, f2), np.where(left, f1, f_probe)
+            x1, x2 = x1_new, x2_new
+        omega = (lo + hi) / 2
+
+        # The bounds themselves are valid candidates
+        candidates = np.stack([omega, np.zeros_like(omega), np.ones_like(omega)])
+        scores = np.stack([entropy(c) for c in candidates])
+        return candidates[np.argmin(scores, axis=0), np.arange(len(omega))]
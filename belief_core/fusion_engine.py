@@ -0,0 +1,161 @@
+import numpy as np
+from .fusion import FusionRule
+
+class FusionEngine:
+    def __init__(self, fusion=None):
+        """
+        Single-pass N-ary Chernoff fusion for regional and global merges.
+
+        Beliefs are stacked into one matrix, converted to the log domain once,
+        and reduced with a weighted sum (one pass per level) instead of being
+        folded pairwise. Regional merges are segmented sums over the rows
+        grouped by region, taken a block of columns at a time, so no full
+        (N, grid_size) copy of the logs is ever made.
+
+        :param fusion: FusionRule instance (a default one is created if None)
+        """
+        self.fusion = fusion if fusion is not None else FusionRule()
+        self.last_region_omegas = None
+
+    @property
+    def dtype(self):
+        # Every array the engine computes is in the fusion rule's float precision
+        return self.fusion.precision.float_dtype
+
+    # Largest (rows, columns) block of logs materialized at once by region_logs
+    BLOCK_ELEMENTS = 1 << 20
+
+    def _from_logs(self, log_fused, representation, out=None):
+        # Fusion-rule log domain back to the stored representation
+        return self.fusion.from_log(log_fused, representation, out=out)
+
+    @staticmethod
+    def uniform_weights(n):
+        return np.full(n, 1.0 / n)
+
+    def fuse(self, beliefs, weights=None, representation="prob", out=None):
+        """
+        Fuse N beliefs in one weighted log-sum.
+        :param beliefs: (N, grid_size) array of beliefs
+        :param weights: N weights (sum should be 1); uniform if None
+        :param representation: "prob" or "logodds" (log-odds in, log-odds out)
+        :param out: optional preallocated (grid_size,) output array
+        :return: fused belief vector
+        """
+        beliefs = np.asarray(beliefs, dtype=self.dtype)
+        if weights is None:
+            weights = self.uniform_weights(len(beliefs))
+        if representation == "logodds":
+            fused = self.fusion.chernoff_fusion_n_logodds(beliefs, weights)
+            if out is None:
+                return fused
+            out[...] = fused
+            return out
+        return self.fusion.chernoff_fusion_n(beliefs, weights, out=out)
+
+    @staticmethod
+    def membership_matrix(region_members, num_rows, weights=None):
+        """
+        Builds the (num_regions, num_rows) matrix whose row r holds the fusion
+        weights of the robots in region r (normalized per region), zero elsewhere.
+        :param region_members: list of row-index arrays, one per region
+        :param num_rows: number of stacked robot beliefs
+        :param weights: optional per-row weights; uniform within each region if None
+        """
+        W = np.zeros((len(region_members), num_rows), dtype=np.float64)
+        for r, members in enumerate(region_members):
+            members = np.asarray(members, dtype=np.intp)
+            if len(members) == 0:
+                continue
+            w = np.ones(len(members)) if weights is None else np.asarray(weights, dtype=np.float64)[members]
+            W[r, members] = w / (np.sum(w) + 1e-10)
+        return W
+
+    def fuse_regions(self, beliefs, region_members, weights=None, representation="prob", out=None,
+                     optimize_omega=False):
+        """
+        Fuse every region in one batched call.
+        :param beliefs: (N, grid_size) array of all robots' beliefs
+        :param region_members: list of row-index arrays into beliefs, one per region
+        :param weights: optional per-robot weights, normalized within each region
+        :param representation: "prob" or "logodds"
+        :param out: optional preallocated (num_regions, grid_size) output array
+        :param optimize_omega: see fuse_hierarchical
+        :return: (num_regions, grid_size) array of fused regional beliefs
+        """
+        region_logs = self.region_logs(beliefs, region_members, weights, representation, optimize_omega)
+        return self._from_logs(region_logs, representation, out)
+
+    def fuse_hierarchical(self, beliefs, region_members, weights=None, region_weights=None,
+                          representation="prob", optimize_omega=False):
+        """
+        Two-level reduction robots -> regions -> global, one pass per level.
+        The global merge works directly on the regional log-beliefs, so there is
+        no exp/log round trip between the levels.
+
+        With optimize_omega, each region is the Chernoff fusion of its
+        weight-fused and uniformly-fused beliefs, with the mixing omega chosen
+        per region to minimize fused entropy (all regions searched in one batch).
+        The chosen omegas are kept in self.last_region_omegas.
+        :return: ((num_regions, grid_size) regional beliefs, global belief vector)
+        """
+        region_logs = self.region_logs(beliefs, region_members, weights, representation, optimize_omega)
+        global_logs = self.global_logs(region_logs, region_weights)
+        return (self._from_logs(region_logs, representation),
+                self._from_logs(global_logs, representation))
+
+    def global_logs(self, region_logs, region_weights=None):
+        """
+        Global merge of regional log-beliefs (the second level of fuse_hierarchical).
+        :param region_logs: (num_regions, grid_size) array from region_logs
+        :param region_weights: optional weights of the regions; uniform if None
+        :return: global log-belief vector
+        """
+        if region_weights is None:
+            region_weights = self.uniform_weights(len(region_logs))
+        return np.asarray(region_weights, dtype=self.dtype) @ region_logs
+
+    def region_logs(self, beliefs, region_members, weights=None, representation="prob", optimize_omega=False):
+        """
+        Weighted mean log-belief of every region (the first level of
+        fuse_hierarchical): the rows are grouped by region and summed per
+        segment with np.add.reduceat, one block of columns at a time (the
+        gathered block is converted to the fusion rule's log domain in place).
+        Empty regions get zeros.
+        :return: (num_regions, grid_size) array of regional log-beliefs
+        """
+        beliefs = np.asarray(beliefs)
+        dtype = self.dtype
+        members = [np.asarray(m, dtype=np.intp) for m in region_members]
+        sizes = np.array([len(m) for m in members], dtype=np.intp)
+        filled = np.flatnonzero(sizes > 0)
+        order = np.concatenate([members[r] for r in filled]) if len(filled) else np.empty(0, dtype=np.intp)
+        starts = (np.cumsum(sizes[filled]) - sizes[filled]).astype(np.intp)
+
+        # Per-row weights normalized within each region (uniform if None)
+        row_weights = np.ones(len(order)) if weights is None else np.asarray(weights, dtype=np.float64)[order]
+        totals = np.add.reduceat(row_weights, starts) if len(order) else np.empty(0)
+        row_weights = (row_weights / (np.repeat(totals, sizes[filled]) + 1e-10)).astype(dtype)[:, None]
+        uniform_weights = (1.0 / np.repeat(sizes[filled], sizes[filled])).astype(dtype)[:, None]
+
+        grid_size = beliefs.shape[1]
+        weighted = np.zeros((len(members), grid_size), dtype=dtype)
+        uniform = np.zeros((len(members), grid_size), dtype=dtype) if optimize_omega else None
+        step = max(1, self.BLOCK_ELEMENTS // max(len(order), 1))
+        for lo in range(0, grid_size if len(order) else 0, step):
+            cols = slice(lo, min(lo + step, grid_size))
+            block = np.asarray(beliefs[order, cols], dtype=dtype)
+            self.fusion.to_log(block, representation, out=block)
+            if optimize_omega:
+                uniform[filled, cols] = np.add.reduceat(block * uniform_weights, starts, axis=0)
+            np.multiply(block, row_weights, out=block)
+            weighted[filled, cols] = np.add.reduceat(block, starts, axis=0)
+
+        if not optimize_omega:
+            self.last_region_omegas = None
+            return weighted
+
+        # Chernoff fusion of each region's weighted and uniform fusions, with a batched omega search
+        omegas = self.fusion.optimal_omega_batch(weighted, uniform, self.fusion.log_domain)
+        self.last_region_omegas = omegas
+        return uniform + omegas[:, None].astype(dtype) * (weighted - uniform)
@@ -0,0 +1,123 @@
+import numpy as np
+
+class TiledGrid:
+    def __init__(self, height, width, tile_height, tile_width):
+        """
+        2-D grid whose cells are stored tile by tile, so every rectangular tile
+        is one contiguous slice of the flat belief / victim vectors.
+
+        Tiles are ordered row-major over the tile grid and cells are row-major
+        inside each tile. Tiles on the bottom/right border are smaller when the
+        grid is not a multiple of the tile shape, so no cell is ever dropped.
+
+        :param height: number of grid rows
+        :param width: number of grid columns
+        :param tile_height: rows per tile (region)
+        :param tile_width: columns per tile (region)
+        """
+        self.height = height
+        self.width = width
+        self.tile_height = tile_height
+        self.tile_width = tile_width
+        self.size = height * width
+        self.tile_rows = -(-height // tile_height)
+        self.tile_cols = -(-width // tile_width)
+        self.num_tiles = self.tile_rows * self.tile_cols
+
+        self.tile_bounds = []  # (row_start, row_stop, col_start, col_stop) per tile
+        self.tile_slices = []  # storage slice per tile
+        self.index_of = np.empty((height, width), dtype=np.intp)  # (row, col) -> storage index
+        offset = 0
+        for tr in range(self.tile_rows):
+            for tc in range(self.tile_cols):
+                r0, c0 = tr * tile_height, tc * tile_width
+                r1, c1 = min(r0 + tile_height, height), min(c0 + tile_width, width)
+                n = (r1 - r0) * (c1 - c0)
+                self.index_of[r0:r1, c0:c1] = np.arange(offset, offset + n).reshape(r1 - r0, c1 - c0)
+                self.tile_bounds.append((r0, r1, c0, c1))
+                self.tile_slices.append(slice(offset, offset + n))
+                offset += n
+
+        # storage index -> (row, col)
+        self.row_of = np.empty(self.size, dtype=np.intp)
+        self.col_of = np.empty(self.size, dtype=np.intp)
+        rows, cols = np.indices((height, width))
+        self.row_of[self.index_of] = rows
+        self.col_of[self.index_of] = cols
+
+        self._tile_by_start = {ts.start: t for t, ts in enumerate(self.tile_slices)}
+        self._window_cache = {}
+
+    def storage_index(self, row, col):
+        """
+        Storage index (or array of indices) of the cell(s) at (row, col).
+        """
+        return self.index_of[row, col]
+
+    def tile_of(self, row, col):
+        """
+        Tile (region) index containing the cell at (row, col).
+        """
+        return (np.asarray(row) // self.tile_height) * self.tile_cols + np.asarray(col) // self.tile_width
+
+    def to_image(self, vector):
+        """
+        Returns a (height, width) view-ordered copy of a flat storage-order vector.
+        """
+        return np.asarray(vector)[self.index_of]
+
+    def from_image(self, image):
+        """
+        Converts a (height, width) image to a flat storage-order vector.
+        """
+        vector = np.empty(self.size, dtype=np.asarray(image).dtype)
+        vector[self.index_of] = image
+        return vector
+
+    def bounds_of(self, indices):
+        """
+        Bounding rectangle (row_start, row_stop, col_start, col_stop) of a set of
+        cells given as a storage slice or index array.
+        """
+        if isinstance(indices, slice):
+            tile = self._tile_of_slice(indices)
+            if tile is not None:
+                return self.tile_bounds[tile]
+            indices = np.arange(indices.start, indices.stop)
+        indices = np.asarray(indices)
+        rows, cols = self.row_of[indices], self.col_of[indices]
+        return rows.min(), rows.max() + 1, cols.min(), cols.max() + 1
+
+    def window_indices(self, r0, r1, c0, c1):
+        """
+        Storage indices of the rectangle [r0, r1) x [c0, c1), clipped to the grid
+        and sorted so reads walk memory tile by tile.
+        """
+        r0, r1 = max(0, r0), min(self.height, r1)
+        c0, c1 = max(0, c0), min(self.width, c1)
+        return np.sort(self.index_of[r0:r1, c0:c1], axis=None)
+
+    def observation_window(self, indices, observation_range):
+        """
+        Storage indices of the 2-D window covering `indices` expanded by
+        observation_range cells in every direction (cached per region).
+        """
+        key = (indices.start, indices.stop, observation_range) if isinstance(indices, slice) else None
+        if key is not None and key in self._window_cache:
+            return self._window_cache[key]
+        r0, r1, c0, c1 = self.bounds_of(indices)
+        window = self.window_indices(r0 - observation_range, r1 + observation_range,
+                                     c0 - observation_range, c1 + observation_range)
+        window.setflags(write=False)
+        if key is not None:
+            self._window_cache[key] = window
+        return window
+
+    def _tile_of_slice(self, sl):
+        tile = self._tile_by_start.get(sl.start)
+        if tile is not None and self.tile_slices[tile].stop == sl.stop:
+            return tile
+        return None
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,85 @@
+import numpy as np
+from .belief import SparseBelief
+from .precision import get_precision
+
+class OccupancyVector:
+    def __init__(self, l_bar=0.95, precision=None):
+        """
+        :param l_bar: confidence threshold (typically 0.95)
+        :param precision: Precision whose float dtype dense occupancies are computed in
+        """
+        self.l_bar = l_bar
+        self.precision = get_precision(precision)
+
+    def compute(self, fused_belief, nominal_pmf):
+        """
+        :param fused_belief: np.array of fused PMF
+        :param nominal_pmf: np.array of nominal/reference PMF
+        :return: np.array of binary occupancy vector θ_cher
+        """
+        fused_belief = np.asarray(fused_belief)
+        nominal_pmf = np.asarray(nominal_pmf)
+
+        occupancy = np.where(fused_belief > nominal_pmf, self.l_bar, 1 - self.l_bar)
+        return occupancy
+    
+    def compute(self, fused_belief, nominal_pmf):
+        """
+        Soft occupancy vector using logistic function on log-likelihood ratio.
+        :param fused_belief: np.array of fused PMF
+        :param nominal_pmf: np.array of nominal/reference PMF
+        :return: np.array of soft occupancy values in [0, 1]
+        """
+        dtype = self.precision.float_dtype
+        fused_belief = np.asarray(fused_belief, dtype=dtype)
+        nominal_pmf = np.asarray(nominal_pmf, dtype=dtype)
+
+        # Avoid log(0) by adding a small constant
+        log_likelihood_ratio = np.log(fused_belief + 1e-10) - np.log(nominal_pmf + 1e-10)
+
+        # Threshold as log-odds
+        threshold = dtype.type(np.log(self.l_bar / (1 - self.l_bar)))
+
+        # Soft occupancy: use sigmoid on (LLR - threshold)
+        occupancy = 1 / (1 + np.exp(-(log_likelihood_ratio - threshold)))
+
+        return occupancy
+
+
+    def compute_from_logodds(self, fused_logodds, nominal_pmf):
+        """
+        Soft occupancy vector for a belief stored as log-odds.
+        :param fused_logodds: np.array of fused belief as log-odds
+        :param nominal_pmf: np.array of nominal/reference PMF
+        :return: np.array of soft occupancy values in [0, 1]
+        """
+        dtype = self.precision.float_dtype
+        fused_logodds = np.asarray(fused_logodds, dtype=dtype)
+        nominal_pmf = np.asarray(nominal_pmf, dtype=dtype)
+
+        # log p = -log(1 + exp(-L)), exact without the 1e-10 epsilon
+        log_belief = -np.logaddexp(0.0, -fused_logodds)
+        log_likelihood_ratio = log_belief - np.log(nominal_pmf + 1e-10)
+
+        threshold = dtype.type(np.log(self.l_bar / (1 - self.l_bar)))
+        occupancy = 1 / (1 + np.exp(-(log_likelihood_ratio - threshold)))
+
+        return occupancy
+
+    def compute_sparse(self, fused_belief, nominal_pmf=None):
+        """
+        Soft occupancy vector for a SparseBelief. Unstored cells equal the nominal,
+        so their occupancy is the constant 1 - l_bar and only stored cells are computed.
+        :param fused_belief: SparseBelief whose default is the nominal PMF
+        :param nominal_pmf: np.array of nominal/reference PMF (defaults to fused_belief.default)
+        :return: SparseBelief of soft occupancy values in [0, 1]
+        """
+        if nominal_pmf is None:
+            nominal_pmf = fused_belief.default
+        nominal = nominal_pmf if np.isscalar(nominal_pmf) else np.asarray(nominal_pmf)[fused_belief.indices]
+
+        log_likelihood_ratio = np.log(fused_belief.values + 1e-10) - np.log(nominal + 1e-10)
+        threshold = np.log(self.l_bar / (1 - self.l_bar))
+        occupancy = 1 / (1 + np.exp(-(log_likelihood_ratio - threshold)))
+
+        return SparseBelief(fused_belief.size, 1 - self.l_bar, fused_belief.indices.copy(), occupancy)
@@ -0,0 +1,83 @@
+import numpy as np
+
+PRECISIONS = ("float64", "float32", "int16", "int8")
+
+# Default saturation of the quantized formats, in log-odds. Repeated detections
+# push a robot's log-odds far past the point where p rounds to 1, and regional
+# fusion averages them with robots that saw nothing, so a low limit biases the
+# fused belief; 64 costs a step of 0.002 (int16) or 0.5 (int8).
+DEFAULT_LOGODDS_LIMITS = {"int16": 64.0, "int8": 64.0}
+
+
+class Precision:
+    def __init__(self, name="float64", logodds_limit=None):
+        """
+        Storage precision of beliefs and of the arrays derived from them.
+
+        float64 and float32 store values as they are. int16 and int8 store
+        log-odds quantized to a fixed step, saturating at +-logodds_limit;
+        arithmetic on them runs in float32 and is re-quantized on write.
+
+        :param name: one of PRECISIONS
+        :param logodds_limit: saturation of the quantized formats (see DEFAULT_LOGODDS_LIMITS)
+        """
+        if name not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got {name!r}")
+        self.name = name
+        self.dtype = np.dtype(name)
+        self.quantized = self.dtype.kind == "i"
+        # dtype of every float array computed from the stored beliefs
+        self.float_dtype = np.dtype(np.float64 if name == "float64" else np.float32)
+        self.logodds_limit = None
+        self.scale = None
+        if self.quantized:
+            self.logodds_limit = float(logodds_limit if logodds_limit is not None else DEFAULT_LOGODDS_LIMITS[name])
+            self.qmax = np.iinfo(self.dtype).max
+            self.scale = self.logodds_limit / self.qmax  # log-odds per quantization step
+
+    def encode(self, values):
+        """
+        Converts float values (log-odds when quantized) to the stored dtype.
+        """
+        if not self.quantized:
+            return np.asarray(values, dtype=self.dtype)
+        steps = np.rint(np.asarray(values, dtype=np.float64) / self.scale)
+        return np.clip(steps, -self.qmax, self.qmax).astype(self.dtype)
+
+    def decode(self, stored):
+        """
+        Converts stored values back to floats. Float formats are returned as-is (no copy).
+        """
+        if not self.quantized:
+            return stored
+        return stored.astype(self.float_dtype) * self.float_dtype.type(self.scale)
+
+    @property
+    def bytes_per_cell(self):
+        return self.dtype.itemsize
+
+    def __eq__(self, other):
+        return (isinstance(other, Precision) and self.name == other.name
+                and self.logodds_limit == other.logodds_limit)
+
+    def __hash__(self):
+        return hash((self.name, self.logodds_limit))
+
+    def __repr__(self):
+        if self.quantized:
+            return f"Precision({self.name!r}, logodds_limit={self.logodds_limit})"
+        return f"Precision({self.name!r})"
+
+
+FLOAT64 = Precision("float64")
+
+
+def get_precision(precision=None):
+    """
+    Precision for a name, a Precision, or None (float64).
+    """
+    if precision is None:
+        return FLOAT64
+    if isinstance(precision, Precision):
+        return precision
+    return Precision(precision)
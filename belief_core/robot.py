@@ -0,0 +1,365 @@
+import numpy as np
+from .belief import Belief, SparseBelief, logodds_to_prob, stack_beliefs, stack_logodds, window_bounds
+from .bayes import BayesUpdate
+from .fusion import FusionRule
+from .occupancy import OccupancyVector
+from .HellingerDistance import HellingerDistance
+from .precision import get_precision
+
+class FleetComponents:
+    def __init__(self):
+        """
+        Components shared by the robots of one fleet. Fusion rules, occupancy
+        vectors, Hellinger distances and sensor models hold only their
+        configuration (and caches keyed by belief), so a whole fleet can use
+        one instance per argument tuple. The fleet's owner (e.g. the
+        Simulation) creates this and passes it to every robot, so the
+        instances and their caches go away with the fleet.
+        """
+        self.components = {}
+        self._prior = (None, None)  # (source array, read-only copy)
+
+    def component(self, cls, *args):
+        """
+        The fleet's instance of cls for these arguments.
+        """
+        key = (cls,) + args
+        component = self.components.get(key)
+        if component is None:
+            component = self.components[key] = cls(*args)
+        return component
+
+    def prior(self, prior):
+        """
+        Read-only float64 version of a prior. Arrays that are already read-only
+        float64 are used as they are; a writable array is copied, and robots
+        built from it share that copy for as long as its content is unchanged.
+        """
+        array = np.asarray(prior, dtype=np.float64)
+        if not array.flags.writeable:
+            return array
+        source, frozen = self._prior
+        if source is not prior or not np.array_equal(frozen, array):
+            frozen = array.copy()
+            frozen.setflags(write=False)
+            self._prior = (prior, frozen)
+        return frozen
+
+    def clear(self):
+        self.components.clear()
+        self._prior = (None, None)
+
+
+class WindowedCache:
+    __slots__ = ("belief", "compute", "cells", "total", "version", "_pending", "_pending_to")
+
+    # Pending windows kept separately before they are merged into one bounding range
+    MAX_PENDING = 8
+
+    def __init__(self, belief, compute):
+        """
+        Per-cell quantity derived from a dense belief, computed on first read
+        and memoized against the belief's version. Writes reported through
+        written() since the last read are recomputed window by window; any
+        other change to the belief recomputes every cell.
+
+        :param belief: Belief the quantity is derived from
+        :param compute: function(indices) -> values of the quantity at the cells indices (slice or array)
+        """
+        self.belief = belief
+        self.compute = compute
+        self.cells = None      # per-cell values as of self.version
+        self.total = 0.0       # their sum
+        self.version = None
+        self._pending = []     # windows written since self.version ...
+        self._pending_to = None  # ... bringing the belief to this version
+
+    def written(self, indices, before, after):
+        """
+        Records that the cells indices were written, taking the belief from version before to after.
+        """
+        if self._pending and self._pending_to == before:
+            self._pending.append(indices)
+            if len(self._pending) > self.MAX_PENDING:
+                lo = min(window_bounds(w, len(self.belief))[0] for w in self._pending)
+                hi = max(window_bounds(w, len(self.belief))[1] for w in self._pending)
+                self._pending = [slice(lo, hi)]
+        elif self.version == before:
+            self._pending = [indices]
+        else:
+            self._pending = []
+        self._pending_to = after
+
+    def get(self):
+        version = self.belief.version
+        if version == self.version:
+            return self.cells
+        if self.cells is not None and self._pending and self._pending_to == version:
+            for window in self._pending:
+                new = self.compute(window)
+                self.total += float(np.sum(new, dtype=np.float64) - np.sum(self.cells[window], dtype=np.float64))
+                self.cells[window] = new
+        else:
+            self.cells = self.compute(slice(None))
+            self.total = float(np.sum(self.cells, dtype=np.float64))
+        self.version = version
+        self._pending = []
+        return self.cells
+
+    def sum(self):
+        self.get()
+        return self.total
+
+
+def bernoulli_entropy(p):
+    """
+    Per-cell entropy (nats) of independent cell probabilities.
+    """
+    p = np.clip(np.asarray(p, dtype=np.float64), 1e-12, 1.0 - 1e-12)
+    return -(p * np.log(p) + (1 - p) * np.log1p(-p))
+
+
+class Robot:
+    __slots__ = ("id", "region_indices", "observation_range", "grid", "nominal_belief", "belief_store",
+                 "store_index", "belief", "occupancy", "hellinger", "fusion", "sensor_model", "victim_grid",
+                 "sensor_quality", "last_update_time", "update_on_change_only", "observed_victim_version",
+                 "_derived", "_sparse_occupancy", "_nominal_mass")
+
+    def __init__(self, robot_id, region_indices, initial_belief, nominal_belief, victim_grid, l_bar=0.95, observation_range=0,
+                 belief_store=None, store_index=None, sensor_model=None, representation="prob", sensor_quality=0.7,
+                 grid=None, update_on_change_only=False, precision=None, fusion_rule="geometric", components=None):
+        self.id = robot_id
+        self.region_indices = region_indices
+        self.observation_range = observation_range
+        self.grid = grid  # optional TiledGrid for 2-D observation windows
+
+        # Components and the read-only prior are shared with the robots built from
+        # the same FleetComponents; a robot without one gets its own
+        components = components if components is not None else FleetComponents()
+        self.nominal_belief = components.prior(nominal_belief)
+
+        # Storage precision of the belief; a store's own precision takes precedence
+        precision = belief_store.precision if belief_store is not None else get_precision(precision)
+
+        # Optional FleetBeliefStore: the belief becomes a row view into the shared block
+        self.belief_store = belief_store
+        self.store_index = store_index
+        if belief_store is not None:
+            self.belief = belief_store.view(store_index)
+            if initial_belief is not None:
+                self.belief.update(initial_belief)
+        elif representation == "sparse":
+            # Only cells deviating from the nominal prior are stored
+            self.belief = SparseBelief(len(self.nominal_belief), self.nominal_belief)
+            if initial_belief is not None:
+                self.belief.update(initial_belief)
+        else:
+            self.belief = Belief(initial_belief, representation=representation, precision=precision)
+        self.occupancy = components.component(OccupancyVector, l_bar, precision)
+        self.hellinger = components.component(HellingerDistance)
+        self.fusion = components.component(FusionRule, None, precision, fusion_rule)
+        self.sensor_model = sensor_model if sensor_model is not None else components.component(BayesUpdate)
+        self.victim_grid = victim_grid
+        self.sensor_quality = sensor_quality
+        self.last_update_time = 0
+        # Skip observation updates while the victim cells in the window are unchanged
+        self.update_on_change_only = update_on_change_only
+        self.observed_victim_version = -1
+
+        # Quantities derived from the belief, computed when first read (see WindowedCache)
+        self._derived = {}
+        self._sparse_occupancy = (None, None)  # (belief version, occupancy) for sparse beliefs
+        self._nominal_mass = None
+
+    def _cache(self, name, compute):
+        cache = self._derived.get(name)
+        if cache is None:
+            cache = self._derived[name] = WindowedCache(self.belief, compute)
+        return cache
+
+    def belief_written(self, indices, before):
+        """
+        Tells the derived-quantity caches that only the cells indices changed
+        since belief version before, so they recompute just that window.
+        """
+        after = self.belief.version
+        for cache in self._derived.values():
+            cache.written(indices, before, after)
+
+    def _probabilities(self, indices):
+        if self.belief.representation == "logodds":
+            return logodds_to_prob(self.belief.decoded(indices))
+        return self.belief.vector[indices]
+
+    def _occupancy_cells(self, indices):
+        if self.belief.representation == "logodds":
+            return self.occupancy.compute_from_logodds(self.belief.decoded(indices), self.nominal_belief[indices])
+        return self.occupancy.compute(self.belief.vector[indices], self.nominal_belief[indices])
+
+    @property
+    def current_occupancy(self):
+        """
+        Soft occupancy of every cell, recomputed lazily (only the written windows when possible).
+        """
+        if self.belief.representation == "sparse":
+            version, occupancy = self._sparse_occupancy
+            if version != self.belief.version:
+                occupancy = self.occupancy.compute_sparse(self.belief, self.nominal_belief)
+                self._sparse_occupancy = (self.belief.version, occupancy)
+            return occupancy
+        return self._cache("occupancy", self._occupancy_cells).get()
+
+    def occupancy_mean(self):
+        if self.belief.representation == "sparse":
+            return self.current_occupancy.mean()
+        return self._cache("occupancy", self._occupancy_cells).sum() / len(self.belief)
+
+    def entropy(self):
+        """
+        Total Bernoulli entropy (nats) of the belief over all cells.
+        """
+        if self.belief.representation == "sparse":
+            b = self.belief
+            default = (np.sum(bernoulli_entropy(b.default)) if not np.isscalar(b.default)
+                       else b.size * float(bernoulli_entropy(b.default)))
+            return float(default - np.sum(bernoulli_entropy(b.default_at(b.indices)))
+                         + np.sum(bernoulli_entropy(b.values)))
+        if self.belief.representation == "logodds":
+            def compute(indices):
+                logodds = np.asarray(self.belief.decoded(indices), dtype=np.float64)
+                p = logodds_to_prob(logodds)
+                # -p log p - (1 - p) log(1 - p) with both logs taken from the log-odds
+                return p * np.logaddexp(0.0, -logodds) + (1 - p) * np.logaddexp(0.0, logodds)
+        else:
+            def compute(indices):
+                return bernoulli_entropy(self.belief.vector[indices])
+        return self._cache("entropy", compute).sum()
+
+    def get_observation_indices(self):
+        if self.grid is not None:
+            return self.grid.observation_window(self.region_indices, self.observation_range)
+
+        grid_size = len(self.belief)
+        if isinstance(self.region_indices, slice):
+            start, stop = self.region_indices.start, self.region_indices.stop
+        else:
+            start, stop = min(self.region_indices), max(self.region_indices) + 1
+
+        obs_start = max(0, start - self.observation_range)
+        obs_stop = min(grid_size, stop + self.observation_range)
+        return slice(obs_start, obs_stop)
+
+    def communicate_and_fuse(self, other_robot, omega=0.5):
+        if self.belief.representation == "logodds":
+            new_fused = self.fusion.chernoff_fusion_logodds(self.belief.decoded(), other_robot.belief.get_logodds(),
+                                                            omega)
+            self.belief.update_logodds(new_fused)
+        elif self.belief.representation == "sparse":
+            new_fused = self.fusion.chernoff_fusion_sparse(self.belief, other_robot.belief, omega)
+            self.belief.indices, self.belief.values = new_fused.indices, new_fused.values
+            self.belief.mark_dirty()
+        else:
+            other_belief = other_robot.belief.get()
+            new_fused = self.fusion.chernoff_fusion(self.belief.get(), other_belief, omega)
+            self.belief.update(new_fused)
+
+    def fuse_region_beliefs(self, region_robots, omega_list=None):
+        """
+        Fuse this robot's belief with the rest of its region in one pass.
+        :param region_robots: robots of the region (this robot may be included)
+        :param omega_list: optional weights for [self] + other robots; uniform if None
+        :return: fused regional belief (probabilities)
+        """
+        robots = [self] + [r for r in region_robots if r.id != self.id]
+        if omega_list is None:
+            omega_list = np.full(len(robots), 1.0 / len(robots))
+
+        if self.belief.representation == "logodds":
+            fused_logodds = self.fusion.chernoff_fusion_n_logodds(stack_logodds(robots), omega_list)
+            return logodds_to_prob(fused_logodds)
+        if self.belief.representation == "sparse":
+            return self.fusion.chernoff_fusion_n_sparse([r.belief for r in robots], omega_list)
+        return self.fusion.chernoff_fusion_n(stack_beliefs(robots), omega_list)
+
+    def observe_and_chernoff_update(self):
+        """
+        Intra-robot belief update using Chernoff fusion (log-domain method).
+        """
+        obs_indices = self.get_observation_indices()
+        region_obs = self.victim_grid.get_region(obs_indices)
+
+        belief_region = self.belief[obs_indices]
+
+        fused_region = self.fusion.chernoff_fusion(belief_region, region_obs, omega=0.5)
+        before = self.belief.version
+        self.belief.update_window(obs_indices, fused_region)
+        self.belief_written(obs_indices, before)
+
+    def needs_observation(self, obs_indices=None):
+        """
+        False only in update_on_change_only mode when no victim cell in the
+        observation window changed since this robot last observed it.
+        """
+        if not self.update_on_change_only or self.observed_victim_version < 0:
+            return True
+        if obs_indices is None:
+            obs_indices = self.get_observation_indices()
+        return self.victim_grid.changed_since(self.observed_victim_version, obs_indices)
+
+    def observe_and_bayes_update(self, current_time=None):
+        """
+        Intra-robot belief update using Bayes' Theorem (probabilistic inference).
+        :return: number of cells updated (0 when the window was skipped)
+        """
+        obs_indices = self.get_observation_indices()
+        if not self.needs_observation(obs_indices):
+            return 0
+        self.observed_victim_version = self.victim_grid.version
+        if current_time is not None:
+            self.last_update_time = current_time
+        # Only the observation window is written, in place
+        before = self.belief.version
+        self.sensor_model.update_belief(self.belief, obs_indices)
+        self.belief_written(obs_indices, before)
+        if isinstance(obs_indices, slice):
+            return obs_indices.stop - obs_indices.start
+        return len(obs_indices)
+
+    @staticmethod
+    def gaussian(x, mu, sigma):
+        coeff = 1.0 / (sigma * np.sqrt(2 * np.pi))
+        exponent = -((x - mu) ** 2) / (2 * sigma ** 2)
+        return coeff * np.exp(exponent)
+
+    def distance_to_reference(self, form="pmf"):
+        """
+        Hellinger distance of the belief to the nominal belief, from cached
+        per-cell Bhattacharyya terms that are recomputed only where the belief changed.
+        :param form: "pmf" (beliefs normalized to sum to 1) or "bernoulli" (per-cell)
+        """
+        if self.belief.representation == "sparse":
+            if form == "bernoulli":
+                return self.hellinger.compute_bernoulli_sparse(self.belief)
+            return self.hellinger.compute_sparse(self.belief)
+        nominal = self.nominal_belief
+        if form == "bernoulli":
+            def compute(indices):
+                p = np.clip(self._probabilities(indices), 0.0, 1.0)
+                q = nominal[indices]
+                return np.sqrt(p * q) + np.sqrt((1 - p) * (1 - q))
+            return float(self.hellinger.from_bhattacharyya(self._cache("bc_bernoulli", compute).sum(),
+                                                           len(nominal), form))
+        if form != "pmf":
+            raise ValueError(f"form must be 'pmf' or 'bernoulli', got {form!r}")
+        if self._nominal_mass is None:
+            self._nominal_mass = float(np.sum(nominal))
+        overlap = self._cache("bc_pmf", lambda indices: np.sqrt(np.clip(self._probabilities(indices), 0.0, 1.0)
+                                                                * nominal[indices])).sum()
+        mass = self._cache("mass", lambda indices: np.clip(self._probabilities(indices), 0.0, 1.0)).sum()
+        bc = overlap / (np.sqrt(mass * self._nominal_mass) + 1e-300)
+        return float(self.hellinger.from_bhattacharyya(bc, len(nominal), form))
+
+    def __repr__(self):
+        if self.belief.representation == "sparse":
+            return f"Robot {self.id} | Belief: {self.belief}"
+        return f"Robot {self.id} | Belief: {np.round(self.belief.get(), 3)}"
@@ -0,0 +1,234 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from belief_core.belief import FleetBeliefStore
+from centralizer import MainCentralizer
+from belief_core.fusion import FusionRule
+from belief_core.HellingerDistance import HellingerDistance
+from belief_core.occupancy import OccupancyVector
+from belief_core.robot import FleetComponents, Robot
+from belief_core.VictimGrid import VictimGrid
+
+GRID_SIZES = [10**2, 10**3, 10**4, 10**5, 10**6]
+FLEET_SIZES = [10, 100, 1000, 10000]
+QUICK_GRID_SIZES = [10**2, 10**4]
+QUICK_FLEET_SIZES = [10, 100]
+
+
+def make_fleet(grid_size, num_robots, observation_range=2):
+    """
+    Robots on one FleetBeliefStore with victims scattered over the grid,
+    assigned to regions by a MainCentralizer.
+    """
+    rng = np.random.default_rng(0)
+    victim_grid = VictimGrid(grid_size)
+    victim_grid.add_victims(rng.choice(grid_size, max(1, grid_size // 10), replace=False), rng.uniform(0.2, 0.9))
+    nominal = np.full(grid_size, 0.5)
+    store = FleetBeliefStore(num_robots, grid_size)
+    components = FleetComponents()
+    robots = [Robot(i, slice(0, 1), None, nominal, victim_grid, observation_range=observation_range,
+                    belief_store=store, store_index=i, components=components) for i in range(num_robots)]
+    num_regions = max(1, min(num_robots // 2, grid_size // 10))
+    centralizer = MainCentralizer(grid_size, num_regions, num_robots, FusionRule())
+    centralizer.assign_robots_to_regions(robots, victim_grid)
+    return robots, victim_grid, centralizer
+
+
+def bench_chernoff_fusion(grid_size, num_robots):
+    rng = np.random.default_rng(0)
+    a, b = rng.uniform(size=grid_size), rng.uniform(size=grid_size)
+    fusion = FusionRule()
+    return (lambda: fusion.chernoff_fusion(a, b, 0.5)), grid_size
+
+
+def bench_chernoff_fusion_n(grid_size, num_robots):
+    beliefs = np.random.default_rng(0).uniform(size=(num_robots, grid_size))
+    omegas = np.full(num_robots, 1.0 / num_robots)
+    fusion = FusionRule()
+    return (lambda: fusion.chernoff_fusion_n(beliefs, omegas)), num_robots * grid_size
+
+
+def bench_observe_and_bayes_update(grid_size, num_robots):
+    robots, _, _ = make_fleet(grid_size, num_robots)
+    cells = sum(np.size(np.arange(grid_size)[r.get_observation_indices()]) for r in robots)
+
+    def run():
+        for r in robots:
+            r.observe_and_bayes_update()
+    return run, cells
+
+
+def bench_occupancy_compute(grid_size, num_robots):
+    belief = np.random.default_rng(0).uniform(size=grid_size)
+    nominal = np.full(grid_size, 0.5)
+    occupancy = OccupancyVector()
+    return (lambda: occupancy.compute(belief, nominal)), grid_size
+
+
+def bench_hellinger_compute(grid_size, num_robots):
+    rng = np.random.default_rng(0)
+    p, q = rng.dirichlet(np.ones(grid_size)), rng.dirichlet(np.ones(grid_size))
+    hellinger = HellingerDistance()
+    return (lambda: hellinger.compute(p, q)), grid_size
+
+
+def bench_hellinger_matrix(grid_size, num_robots):
+    beliefs = np.random.default_rng(0).uniform(size=(num_robots, grid_size))
+    hellinger = HellingerDistance()
+    return (lambda: hellinger.matrix(beliefs, form="bernoulli")), num_robots * num_robots * grid_size
+
+
+def bench_assign_robots_to_regions(grid_size, num_robots):
+    robots, victim_grid, centralizer = make_fleet(grid_size, num_robots)
+
+    def run():
+        centralizer.assign_robots_to_regions(robots, victim_grid)
+    return run, num_robots
+
+
+def bench_centralizer_step(grid_size, num_robots):
+    robots, victim_grid, centralizer = make_fleet(grid_size, num_robots)
+    return (lambda: centralizer.step(victim_grid)), num_robots * grid_size
+
+
+# name -> (setup function, whether it depends on the fleet size, throughput unit)
+BENCHMARKS = {
+    "FusionRule.chernoff_fusion": (bench_chernoff_fusion, False, "cells/s"),
+    "FusionRule.chernoff_fusion_n": (bench_chernoff_fusion_n, True, "cells/s"),
+    "Robot.observe_and_bayes_update": (bench_observe_and_bayes_update, True, "cells/s"),
+    "OccupancyVector.compute": (bench_occupancy_compute, False, "cells/s"),
+    "HellingerDistance.compute": (bench_hellinger_compute, False, "cells/s"),
+    "HellingerDistance.matrix": (bench_hellinger_matrix, True, "cell-pairs/s"),
+    "MainCentralizer.assign_robots_to_regions": (bench_assign_robots_to_regions, True, "robots/s"),
+    "MainCentralizer.step": (bench_centralizer_step, True, "cells/s"),
+}
+
+
+def time_call(fn, min_time=0.2, repeats=3):
+    """
+    Best per-call time over `repeats` rounds of enough calls to last min_time.
+    """
+    fn()  # warm-up
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= max(2, int(min_time / max(elapsed, 1e-9)))
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def peak_memory(fn):
+    """
+    Peak bytes allocated (numpy buffers included) during one call.
+    """
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmarks(grid_sizes, fleet_sizes, names=None, max_cells=5 * 10**7, min_time=0.2, log=print):
+    results = []
+    for name, (setup, uses_fleet, unit) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        for grid_size in grid_sizes:
+            for num_robots in (fleet_sizes if uses_fleet else [None]):
+                if uses_fleet and grid_size * num_robots > max_cells:
+                    log(f"  skip {name} grid={grid_size} robots={num_robots} (> max cells)")
+                    continue
+                fn, work = setup(grid_size, num_robots or 1)
+                seconds = time_call(fn, min_time=min_time)
+                entry = {
+                    "name": name,
+                    "grid_size": grid_size,
+                    "num_robots": num_robots,
+                    "seconds": seconds,
+                    "throughput": work / seconds,
+                    "unit": unit,
+                    "peak_bytes": peak_memory(fn),
+                }
+                results.append(entry)
+                log(f"  {name:42s} grid={grid_size:>8} robots={str(num_robots):>6} "
+                    f"{seconds * 1e3:10.3f} ms  {entry['throughput']:.3e} {unit}  peak {entry['peak_bytes'] / 2**20:.1f} MiB")
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Returns the results slower than their baseline entry by more than threshold.
+    """
+    key = lambda r: (r["name"], r["grid_size"], r["num_robots"])
+    base = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        b = base.get(key(r))
+        if b is not None and r["seconds"] > b["seconds"] * (1 + threshold):
+            regressions.append(dict(r, baseline_seconds=b["seconds"], slowdown=r["seconds"] / b["seconds"]))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark fusion, Bayes update and centralizer step")
+    parser.add_argument("--grid-sizes", type=int, nargs="+")
+    parser.add_argument("--fleet-sizes", type=int, nargs="+")
+    parser.add_argument("--quick", action="store_true", help="small sizes for a fast smoke run")
+    parser.add_argument("--only", nargs="+", help="benchmark names to run")
+    parser.add_argument("--max-cells", type=float, default=5e7, help="skip grid x fleet combinations above this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    grid_sizes = args.grid_sizes or (QUICK_GRID_SIZES if args.quick else GRID_SIZES)
+    fleet_sizes = args.fleet_sizes or (QUICK_FLEET_SIZES if args.quick else FLEET_SIZES)
+
+    results = run_benchmarks(grid_sizes, fleet_sizes, args.only, int(args.max_cells), args.min_time)
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['name']} grid={r['grid_size']} robots={r['num_robots']}: "
+                  f"{r['slowdown']:.2f}x slower than baseline")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,70 +1,363 @@
 import numpy as np
 from collections import defaultdict
+from belief_core.belief import DirtyRanges, merge_ranges, stack_beliefs, stack_logodds, logodds_to_prob
+from belief_core.fusion_engine import FusionEngine
+from assignment import AssignmentSolver
+from instrumentation import NullInstrumentation
 
 class MainCentralizer:
-    def __init__(self, grid_size, num_regions, num_robots, fusion):
+    def __init__(self, grid_size, num_regions, num_robots, fusion, batched_regions=True, weighting="uniform",
+                 grid=None, incremental=False, parallel=None, history=None, instrumentation=None,
+                 assignment=None, reassign_interval=0, uplink=None):
         self.grid_size = grid_size
+        self.grid = grid  # optional TiledGrid: regions are its rectangular tiles
+        if grid is not None:
+            num_regions = grid.num_tiles
         self.num_regions = num_regions
         self.num_robots = num_robots
         self.region_assignments = defaultdict(list)
         self.region_centralizers = {}
+        # AssignmentSolver placing robots (built on first use); reassigned every reassign_interval steps
+        self.assignment = assignment
+        self.reassign_interval = reassign_interval
+        self.robots = []
         self.fusion = fusion  # FusionRule instance
-        self.global_belief = np.full(grid_size, 0)
-        self.global_belief_history = []
+        self.engine = FusionEngine(fusion)
+        self.batched_regions = batched_regions  # fuse all regions in one call
+        self.weighting = weighting  # "uniform", "dynamic" (omega weights) or "optimal" (omega search)
+        self.time = 0
+        # Incremental mode: cache regional log-beliefs and refuse only dirty cell ranges
+        self.incremental = incremental
+        self._fusion_cache = None
+        self.last_fused_cells = 0  # cells (region rows x columns) recomputed by the last fuse_all
+        self.last_region_beliefs = {}  # {region_idx: fused regional belief} of the last fuse_all
+        # Optional ParallelRegionFusion: regions fused in worker processes over shared memory
+        self.parallel = parallel
+        self.global_belief = np.zeros(grid_size, dtype=fusion.precision.float_dtype)
+        # Any object with append(); a history.HistoryWriter keeps it on disk instead of in RAM
+        self.global_belief_history = history if history is not None else []
+        self.global_sparse = None  # SparseBelief global belief when robots are sparse
+        # Per-phase timers and counters (instrumentation.Instrumentation); no-op by default
+        self.instrumentation = instrumentation if instrumentation is not None else NullInstrumentation()
+        # Optional delta.DeltaUplink: robots upload changed cells and fusion reads the mirrors
+        self.uplink = uplink
 
     def divide_grid(self):
-        region_size = self.grid_size // self.num_regions
-        return [slice(i * region_size, (i + 1) * region_size) for i in range(self.num_regions)]
+        if self.grid is not None:
+            return list(self.grid.tile_slices)
+        # Spread the remainder over the first regions instead of dropping it
+        region_size, extra = divmod(self.grid_size, self.num_regions)
+        bounds = np.cumsum([0] + [region_size + (1 if i < extra else 0) for i in range(self.num_regions)])
+        return [slice(int(bounds[i]), int(bounds[i + 1])) for i in range(self.num_regions)]
 
     def assign_robots_to_regions(self, robots, victim_grid):
-        regions = self.divide_grid()
-        region_scores = [np.sum(victim_grid.grid[r]) for r in regions]
-        ranked_regions = np.argsort(region_scores)[::-1]
-
-        robots_per_region = len(robots) // self.num_regions
-        extra = len(robots) % self.num_regions
-        robot_idx = 0
+        with self.instrumentation.phase("assignment"):
+            self._assign_robots_to_regions(robots, victim_grid)
 
-        for count, region_idx in enumerate(ranked_regions):
-            num_assigned = robots_per_region + (1 if count < extra else 0)
-            assigned_robots = robots[robot_idx:robot_idx + num_assigned]
+    def _assign_robots_to_regions(self, robots, victim_grid):
+        """
+        Places every robot with the assignment solver and rebuilds the region
+        assignments from scratch. A regional centralizer stays in office while
+        it remains in its region.
+        """
+        regions = self.divide_grid()
+        if self.assignment is None:
+            self.assignment = AssignmentSolver(regions, self.grid)
+        solver = self.assignment
+        self.robots = list(robots)
 
-            for r in assigned_robots:
-                r.region_indices = regions[region_idx]
-                self.region_assignments[region_idx].append(r)
+        positions = np.array([solver.position_of(r.region_indices) for r in robots]).reshape(-1, 2)
+        current = np.array([solver.region_of(r.region_indices) for r in robots], dtype=np.intp)
+        demand = solver.region_demand(victim_grid, self.global_belief)
+        owner = solver.solve(positions, current, demand)
 
-            if assigned_robots:
-                self.region_centralizers[region_idx] = assigned_robots[0]
+        leaders = dict(self.region_centralizers)
+        self.region_assignments.clear()
+        self.region_centralizers.clear()
+        for r, region_idx, previous in zip(robots, owner, current):
+            r.region_indices = regions[region_idx]
+            if region_idx != previous:
+                r.observed_victim_version = -1  # new window: observe it at least once
+            self.region_assignments[int(region_idx)].append(r)
+        for region_idx in sorted(self.region_assignments):
+            members = self.region_assignments[region_idx]
+            leader = leaders.get(region_idx)
+            self.region_centralizers[region_idx] = leader if any(r is leader for r in members) else members[0]
 
-            robot_idx += num_assigned
+    def reassign_if_due(self, victim_grid):
+        """
+        Reassigns the robots when reassign_interval divides the current time.
+        """
+        if self.reassign_interval and self.robots and self.time % self.reassign_interval == 0:
+            self.assign_robots_to_regions(self.robots, victim_grid)
 
     def step(self, victim_grid):
+        self.time += 1
+        self.reassign_if_due(victim_grid)
+
         # Step 1: Each robot observes and updates its belief
-        for region_robots in self.region_assignments.values():
-            for robot in region_robots:
-                robot.observe_and_update()
+        cells_updated = 0
+        with self.instrumentation.phase("observe"):
+            for region_robots in self.region_assignments.values():
+                for robot in region_robots:
+                    cells_updated += robot.observe_and_bayes_update(current_time=self.time)
+        self.instrumentation.count("cells_updated", cells_updated)
 
-        # Step 2: Region centralizers collect and merge regional beliefs
-        region_beliefs = {}
-        for region_idx, centralizer in self.region_centralizers.items():
-            region_robots = self.region_assignments[region_idx]
-            beliefs = [r.belief.get() for r in region_robots]
+        # Steps 2 and 3: regional merges, then the global merge
+        self.fuse_all()
 
-            fused = beliefs[0].copy()
-            for b in beliefs[1:]:
-                fused = self.fusion.chernoff_fusion(fused, b, omega=0.5)
+    def members(self, region_idx):
+        """
+        Robots of a region as the fusion sees them: with a delta uplink, the
+        centralizer's mirrors of them.
+        """
+        robots = self.region_assignments[region_idx]
+        return robots if self.uplink is None else self.uplink.mirrored(robots)
 
-            region_beliefs[region_idx] = fused
+    def upload(self):
+        """
+        Sends the belief changes of every assigned robot over the delta uplink.
+        """
+        robots = [r for region_robots in self.region_assignments.values() for r in region_robots]
+        with self.instrumentation.phase("uplink"):
+            sent = self.uplink.sync(robots, self.time)
+        self.instrumentation.count("uplink_bytes", sent)
+        self.instrumentation.count("uplink_full_bytes", sum(r.belief.vector.nbytes for r in robots))
+
+    def fuse_all(self):
+        """
+        Fuse every region and then the global belief, one pass per level.
+        With incremental fusion the returned beliefs are updated in place by
+        the next call (see fuse_all_incremental).
+        :return: (dict {region_idx: fused regional belief}, global belief vector)
+        """
+        if self.uplink is not None:
+            self.upload()
+        with self.instrumentation.phase("fusion"):
+            region_beliefs, fused_global = self._fuse_all()
+        self.last_region_beliefs = region_beliefs
+        self.instrumentation.count("fusions", len(region_beliefs) + 1 if region_beliefs else 0)
+        self.instrumentation.count("fused_cells", self.last_fused_cells)
+        return region_beliefs, fused_global
+
+    def _fuse_all(self):
+        region_ids = [r for r in self.region_centralizers if self.region_assignments[r]]
+        if not region_ids:
+            return {}, self.global_belief
+
+        representation = self.members(region_ids[0])[0].belief.representation
+        if representation == "sparse":
+            return self.fuse_all_sparse(region_ids)
+        self.last_fused_cells = len(region_ids) * self.grid_size
+        if self.parallel is not None:
+            return self.fuse_all_parallel(region_ids)
+        if self.incremental and self.weighting == "uniform":
+            return self.fuse_all_incremental(region_ids, representation)
+
+        if self.batched_regions:
+            # Two-level reduction: all regions in one batched call
+            all_robots, members = [], []
+            for region_idx in region_ids:
+                region_robots = self.members(region_idx)
+                members.append(np.arange(len(all_robots), len(all_robots) + len(region_robots)))
+                all_robots.extend(region_robots)
+
+            representation = all_robots[0].belief.representation
+            stacked = stack_logodds(all_robots) if representation == "logodds" else stack_beliefs(all_robots)
+            self.instrumentation.count("belief_bytes", stacked.nbytes)
+            weights = self.robot_weights(all_robots)
+            region_weights = None
+            if weights is not None:
+                region_weights = np.array([np.sum(weights[m]) for m in members])
+                region_weights /= np.sum(region_weights) + 1e-10
+            with self.instrumentation.phase("regional_fusion"):
+                region_logs = self.engine.region_logs(
+                    stacked, members, weights=weights, representation=representation,
+                    optimize_omega=self.weighting == "optimal")
+                region_beliefs = dict(zip(region_ids, self.fusion.to_prob(region_logs)))
+            with self.instrumentation.phase("global_fusion"):
+                fused_global = self.fusion.to_prob(self.engine.global_logs(region_logs, region_weights))
+            self.global_belief = fused_global
+            return region_beliefs, fused_global
+
+        with self.instrumentation.phase("regional_fusion"):
+            region_beliefs = {r: self.fuse_region(self.members(r)) for r in region_ids}
+        with self.instrumentation.phase("global_fusion"):
+            return region_beliefs, self.global_fuse(region_beliefs)
+
+    def fuse_all_parallel(self, region_ids):
+        """
+        fuse_all with each regional centralizer in a worker process. All robots
+        must be views into self.parallel.store. Regional beliefs are copied
+        out of shared memory, so they stay valid after the next call.
+        """
+        store = self.parallel.store
+        all_robots = [r for region_idx in region_ids for r in self.members(region_idx)]
+        if any(r.belief_store is not store for r in all_robots):
+            raise ValueError("Parallel fusion requires every robot to use the parallel shared store")
 
-        # Step 3: Main centralizer merges regional beliefs
-        fused_global = list(region_beliefs.values())[0].copy()
-        for rb in list(region_beliefs.values())[1:]:
-            fused_global = self.fusion.chernoff_fusion(fused_global, rb, omega=0.5)
+        region_rows = [np.array([r.store_index for r in self.members(region_idx)])
+                       for region_idx in region_ids]
+        weights = self.robot_weights(all_robots)
+        store_weights, region_weights = None, None
+        if weights is not None:
+            store_weights = np.zeros(len(store))
+            store_weights[np.concatenate(region_rows)] = weights
+            region_weights = np.array([np.sum(store_weights[rows]) for rows in region_rows])
+            region_weights /= np.sum(region_weights) + 1e-10
 
+        self.instrumentation.count("belief_bytes", sum(len(rows) for rows in region_rows) * store.data[0].nbytes)
+        with self.instrumentation.phase("regional_fusion"):
+            regional = self.parallel.fuse_regions(region_rows, store_weights)
+        with self.instrumentation.phase("global_fusion"):
+            fused_global = self.parallel.fuse_global(len(region_rows), region_weights)
         self.global_belief = fused_global
+        return dict(zip(region_ids, regional)), fused_global
+
+    def fuse_all_incremental(self, region_ids, representation):
+        """
+        fuse_all that reuses cached regional results. A region is refused only
+        over the [lo, hi) cell ranges its robots wrote since the previous call
+        (all cells if its membership changed), and the global belief is updated
+        only over the union of those ranges. Robots' dirty ranges are consumed.
+
+        The regional and global beliefs returned are buffers that the next call
+        updates in place: they are valid until then, and callers that keep them
+        across steps must copy them.
+        """
+        cache = self._fusion_cache
+        if cache is None or cache["region_ids"] != region_ids:
+            num_regions = len(region_ids)
+            dtype = self.fusion.precision.float_dtype
+            cache = self._fusion_cache = {
+                "region_ids": list(region_ids),
+                "members": {},
+                "region_logs": np.zeros((num_regions, self.grid_size), dtype=dtype),
+                "region_probs": np.zeros((num_regions, self.grid_size), dtype=dtype),
+                "global_probs": np.zeros(self.grid_size, dtype=dtype),
+            }
+
+        changed = []
+        self.last_fused_cells = 0
+        with self.instrumentation.phase("regional_fusion"):
+            for k, region_idx in enumerate(region_ids):
+                region_robots = self.members(region_idx)
+                key = tuple(id(r) for r in region_robots)
+                if cache["members"].get(region_idx) != key:
+                    cache["members"][region_idx] = key
+                    ranges = [(0, self.grid_size)]
+                else:
+                    ranges = self._dirty_ranges(region_robots)
+                for r in region_robots:
+                    r.belief.clear_dirty()
+
+                rows = [np.arange(len(region_robots))]
+                for lo, hi in ranges:
+                    native = self._native_columns(region_robots, lo, hi)
+                    self.instrumentation.count("belief_bytes", native.nbytes)
+                    cache["region_logs"][k, lo:hi] = self.engine.region_logs(native, rows, representation=representation)[0]
+                    self.fusion.from_log(cache["region_logs"][k, lo:hi], out=cache["region_probs"][k, lo:hi])
+                    self.last_fused_cells += hi - lo
+                changed.extend(ranges)
+
+        with self.instrumentation.phase("global_fusion"):
+            for lo, hi in merge_ranges(changed, limit=DirtyRanges.LIMIT):
+                cols = slice(lo, hi)
+                self.fusion.from_log(self.engine.global_logs(cache["region_logs"][:, cols]),
+                                     out=cache["global_probs"][cols])
+            self.global_belief = cache["global_probs"]
+        region_beliefs = {r: cache["region_probs"][k] for k, r in enumerate(region_ids)}
+        return region_beliefs, self.global_belief
+
+    @staticmethod
+    def _native_columns(robots, lo, hi):
+        store = robots[0].belief_store
+        if store is not None and all(r.belief_store is store for r in robots[1:]):
+            return store.decoded_rows([r.store_index for r in robots], lo, hi)
+        return np.stack([r.belief.decoded(slice(lo, hi)) for r in robots])
+
+    @staticmethod
+    def _dirty_ranges(robots):
+        store = robots[0].belief_store
+        if store is not None and all(r.belief_store is store for r in robots[1:]):
+            return store.dirty.union([r.store_index for r in robots], limit=DirtyRanges.LIMIT)
+        return merge_ranges([x for r in robots for x in r.belief.dirty_ranges()], limit=DirtyRanges.LIMIT)
+
+    def fuse_all_sparse(self, region_ids):
+        """
+        fuse_all for SparseBelief robots: fusion cost follows the number of
+        observed cells. The global belief stays a SparseBelief (also kept in
+        self.global_sparse); it is densified only where a consumer needs every
+        cell, such as the renderer. The "optimal" weighting falls back to the
+        dynamic omega weights here.
+        """
+        all_robots = [r for region_idx in region_ids for r in self.members(region_idx)]
+        weights = self.robot_weights(all_robots)
+        if weights is None:
+            weights = np.ones(len(all_robots))
+
+        self.instrumentation.count("belief_bytes", sum(r.belief.indices.nbytes + r.belief.values.nbytes for r in all_robots))
+        region_beliefs, region_weights, start = {}, [], 0
+        with self.instrumentation.phase("regional_fusion"):
+            for region_idx in region_ids:
+                region_robots = self.members(region_idx)
+                w = weights[start:start + len(region_robots)]
+                start += len(region_robots)
+                region_beliefs[region_idx] = self.fusion.chernoff_fusion_n_sparse(
+                    [r.belief for r in region_robots], w / (np.sum(w) + 1e-10))
+                region_weights.append(np.sum(w))
+
+        region_weights = np.asarray(region_weights) / (np.sum(region_weights) + 1e-10)
+        with self.instrumentation.phase("global_fusion"):
+            self.global_sparse = self.fusion.chernoff_fusion_n_sparse(list(region_beliefs.values()), region_weights)
+            self.global_belief = self.global_sparse
+        return region_beliefs, self.global_belief
+
+    def fuse_region(self, region_robots):
+        """
+        Fuse the beliefs of one region's robots in a single weighted log-sum.
+        """
+        representation = region_robots[0].belief.representation
+        if representation == "sparse":
+            weights = self.robot_weights(region_robots)
+            if weights is None:
+                weights = np.full(len(region_robots), 1.0 / len(region_robots))
+            return self.fusion.chernoff_fusion_n_sparse([r.belief for r in region_robots], weights)
+        stacked = stack_logodds(region_robots) if representation == "logodds" else stack_beliefs(region_robots)
+        self.instrumentation.count("belief_bytes", stacked.nbytes)
+        fused = self.engine.fuse_regions(stacked, [np.arange(len(region_robots))],
+                                         weights=self.robot_weights(region_robots),
+                                         representation=representation,
+                                         optimize_omega=self.weighting == "optimal")[0]
+        return logodds_to_prob(fused) if representation == "logodds" else fused
+
+    def robot_weights(self, robots):
+        """
+        Per-robot fusion weights for the current weighting mode (None = uniform).
+        """
+        if self.weighting == "uniform":
+            return None
+        return np.asarray(self.fusion.compute_omega_weights(robots, self.time))
 
     def get_global_belief(self):
         return self.global_belief
+
+    def distance_matrix(self, level="regions", form="bernoulli"):
+        """
+        Pairwise Hellinger distances, as one matrix product of root beliefs.
+        :param level: "regions" (regional beliefs of the last fuse_all, in region order) or
+                      "robots" (self.robots, roots cached per belief version)
+        :param form: "bernoulli" (per-cell) or "pmf" (each belief normalized to a PMF)
+        :return: (N, N) array of distances
+        """
+        hellinger = self.fusion.hellinger
+        if level == "robots":
+            return hellinger.robot_matrix(self.robots, form)
+        beliefs = [self.last_region_beliefs[r] for r in sorted(self.last_region_beliefs)]
+        if not beliefs:
+            return np.zeros((0, 0))
+        beliefs = [b.to_dense() if hasattr(b, "to_dense") else b for b in beliefs]
+        return hellinger.matrix(np.stack(beliefs), form=form)
     
     def global_fuse(self, region_beliefs_dict):
         """
@@ -75,11 +368,9 @@ class MainCentralizer:
         """
         region_beliefs = list(region_beliefs_dict.values())
         if not region_beliefs:
-            return np.full(self.grid_size, 0.0)
+            return np.zeros(self.grid_size, dtype=self.fusion.precision.float_dtype)
 
-        fused_global = region_beliefs[0].copy()
-        for rb in region_beliefs[1:]:
-            fused_global = self.fusion.chernoff_fusion(fused_global, rb, omega=0.5)
+        fused_global = self.engine.fuse(np.stack(region_beliefs))
 
         self.global_belief = fused_global
         return fused_global
@@ -0,0 +1,96 @@
+import numpy as np
+from belief_core.HellingerDistance import HellingerDistance
+
+CONVERGENCE_ACTIONS = ("stop", "stretch")
+
+
+class ConvergenceMonitor:
+    def __init__(self, tol=1e-4, patience=3, form="bernoulli", action="stop", max_interval=8, growth=2):
+        """
+        Tracks the Hellinger distance between consecutive global beliefs.
+
+        The beliefs have settled once the distance stayed below tol for
+        `patience` fusions in a row. Then, with action "stop", `stop` becomes
+        True and the run can end; with action "stretch", the fusion interval
+        is multiplied by `growth` (up to max_interval) after every settled
+        fusion and drops back to 1 as soon as a fusion moves the belief by
+        more than tol, or reset() is called (e.g. on new victim events).
+
+        :param tol: distance below which consecutive global beliefs count as equal
+        :param patience: settled fusions required before acting
+        :param form: "bernoulli" (per-cell) or "pmf" (beliefs normalized to sum to 1)
+        :param action: "stop" or "stretch"
+        :param max_interval: largest fusion interval, in steps, for "stretch"
+        :param growth: factor the interval grows by per settled fusion
+        """
+        if action not in CONVERGENCE_ACTIONS:
+            raise ValueError(f"action must be one of {CONVERGENCE_ACTIONS}, got {action!r}")
+        self.tol = tol
+        self.patience = patience
+        self.form = form
+        self.action = action
+        self.max_interval = max_interval
+        self.growth = growth
+        self.hellinger = HellingerDistance()
+        self.distances = []       # distance at every fusion after the first
+        self.fusion_steps = []    # step of every fusion
+        self.settled = 0          # consecutive fusions below tol
+        self.interval = 1         # current fusion interval in steps
+        self.converged_at = None  # step at which the beliefs first settled
+        self._previous_root = None
+
+    def update(self, step, global_belief):
+        """
+        Records the global belief of a fusion at `step`.
+        :return: Hellinger distance to the previous fused belief (None on the first)
+        """
+        root = self.hellinger.roots(global_belief, self.form)
+        distance = None
+        if self._previous_root is not None:
+            bc = float(root @ self._previous_root)
+            distance = float(self.hellinger.from_bhattacharyya(bc, len(global_belief), self.form))
+            self.distances.append(distance)
+            if distance <= self.tol:
+                self.settled += 1
+            else:
+                self.settled = 0
+                self.interval = 1
+        self._previous_root = root
+        self.fusion_steps.append(step)
+
+        if self.converged:
+            if self.converged_at is None:
+                self.converged_at = step
+            if self.action == "stretch":
+                self.interval = min(self.interval * self.growth, self.max_interval)
+        return distance
+
+    @property
+    def converged(self):
+        return self.settled >= self.patience
+
+    @property
+    def stop(self):
+        return self.action == "stop" and self.converged
+
+    def fusion_due(self, step):
+        """
+        True if a fusion should run at step (always, until the interval is stretched).
+        """
+        return not self.fusion_steps or step - self.fusion_steps[-1] >= self.interval
+
+    def reset(self):
+        """
+        Forgets the settled state, e.g. when new information arrives; the next
+        fusion runs on time.
+        """
+        self.settled = 0
+        self.interval = 1
+
+    def to_dict(self):
+        return {
+            "converged_at": self.converged_at,
+            "fusions": len(self.fusion_steps),
+            "last_distance": self.distances[-1] if self.distances else None,
+            "interval": self.interval,
+        }
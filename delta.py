@@ -0,0 +1,268 @@
+import numpy as np
+from belief_core.belief import FleetBeliefStore, logodds_to_prob, prob_to_logodds
+from belief_core.precision import get_precision
+
+# Wire sizes in bytes: message header (sender, version, base version, run count)
+# and one run (int32 start, int32 length)
+HEADER_BYTES = 16
+RUN_BYTES = 8
+
+
+def encode_runs(cells, max_gap=0):
+    """
+    Groups sorted cell indices into runs of consecutive cells. Gaps of at most
+    max_gap cells are bridged, since resending a few unchanged values is
+    cheaper than the header of a new run.
+    :return: (starts, lengths) int32 arrays
+    """
+    cells = np.asarray(cells, dtype=np.intp)
+    if len(cells) == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+    breaks = np.flatnonzero(np.diff(cells) > max_gap + 1) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks - 1, [len(cells) - 1]))
+    starts = cells[first]
+    return starts.astype(np.int32), (cells[last] - starts + 1).astype(np.int32)
+
+
+def expand_runs(starts, lengths):
+    """
+    Cell indices covered by the runs, in order.
+    """
+    lengths = np.asarray(lengths, dtype=np.intp)
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(int(lengths.sum()), dtype=np.intp) - np.repeat(offsets - starts, lengths)
+
+
+class BeliefDelta:
+    __slots__ = ("sender", "time", "version", "base_version", "starts", "lengths", "values")
+
+    def __init__(self, sender, time, version, base_version, starts, lengths, values):
+        """
+        Belief upload on the wire: the cells changed since the sender's
+        previous message, as runs of cells plus their values in the wire
+        precision (quantized log-odds by default).
+
+        :param sender: robot id
+        :param time: simulation step at which the belief was read
+        :param version: sequence number of this message
+        :param base_version: message this delta applies on top of; -1 for a full snapshot
+        :param starts: (num_runs,) first cell of each run
+        :param lengths: (num_runs,) cells in each run
+        :param values: wire values of every cell of every run, run after run
+        """
+        self.sender = sender
+        self.time = time
+        self.version = version
+        self.base_version = base_version
+        self.starts = starts
+        self.lengths = lengths
+        self.values = values
+
+    @property
+    def snapshot(self):
+        return self.base_version < 0
+
+    @property
+    def nbytes(self):
+        return HEADER_BYTES + len(self.starts) * RUN_BYTES + self.values.nbytes
+
+    def cells(self):
+        return expand_runs(self.starts, self.lengths)
+
+
+def _logodds(belief, lo, hi):
+    if belief.representation == "logodds":
+        return belief.decoded(slice(lo, hi))
+    return prob_to_logodds(belief.vector[lo:hi])
+
+
+class DeltaEncoder:
+    def __init__(self, sender, size, precision="int16"):
+        """
+        Robot side of the delta uplink. Keeps the wire values of the last
+        message sent and, on every upload, sends only the cells whose wire
+        value changed since then. Candidate cells come from the belief's dirty
+        range, which the encoder consumes.
+
+        A full snapshot is sent first, after request_snapshot() (the receiver
+        saw a gap: a lost or reordered message) and whenever the delta would
+        not be smaller than a snapshot.
+
+        :param sender: robot id written into every message
+        :param size: number of cells of the belief
+        :param precision: wire precision of the values (see precision.PRECISIONS); log-odds are sent
+        """
+        self.sender = sender
+        self.size = size
+        self.precision = get_precision(precision)
+        self.max_gap = (RUN_BYTES - 1) // self.precision.bytes_per_cell
+        self.shadow = None           # wire values as of the last message sent
+        self.version = 0             # sequence number of the last message sent
+        self.source_version = None   # belief version read by the last message
+        self.needs_snapshot = True
+
+    def request_snapshot(self):
+        self.needs_snapshot = True
+
+    @property
+    def snapshot_nbytes(self):
+        return HEADER_BYTES + RUN_BYTES + self.size * self.precision.bytes_per_cell
+
+    def encode(self, belief, time=None):
+        """
+        Builds the next message for belief. With nothing changed it is an
+        empty delta (header only), which still tells the receiver the belief
+        is current as of time.
+        :param belief: the robot's Belief (prob or logodds)
+        :param time: simulation step, carried in the message
+        :return: BeliefDelta
+        """
+        lo, hi = belief.dirty_range() if belief.version != self.source_version else (self.size, 0)
+        belief.clear_dirty()
+        self.source_version = belief.version
+
+        if self.needs_snapshot:
+            return self._snapshot(self.precision.encode(_logodds(belief, 0, self.size)), time)
+        if lo >= hi:
+            return self._message(time, np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32),
+                                 np.empty(0, dtype=self.precision.dtype))
+
+        wire = self.precision.encode(_logodds(belief, lo, hi))
+        changed = np.flatnonzero(wire != self.shadow[lo:hi])
+        starts, lengths = encode_runs(changed, self.max_gap)
+        values = wire[expand_runs(starts, lengths)]
+        self.shadow[lo:hi] = wire
+        if HEADER_BYTES + len(starts) * RUN_BYTES + values.nbytes >= self.snapshot_nbytes:
+            return self._snapshot(self.shadow, time)
+        return self._message(time, starts + np.int32(lo), lengths, values)
+
+    def _message(self, time, starts, lengths, values):
+        self.version += 1
+        return BeliefDelta(self.sender, time, self.version, self.version - 1, starts, lengths, values)
+
+    def _snapshot(self, wire, time):
+        self.shadow = np.array(wire)  # wire may alias the belief when no conversion was needed
+        self.needs_snapshot = False
+        self.version += 1
+        return BeliefDelta(self.sender, time, self.version, -1, np.zeros(1, dtype=np.int32),
+                           np.full(1, self.size, dtype=np.int32), wire.copy())
+
+
+class MirrorStore:
+    def __init__(self, senders, grid_size, representation="prob", precision=None, wire_precision="int16"):
+        """
+        Receiver side of the delta uplink: one mirror row per sender in a
+        FleetBeliefStore, updated in place by applying BeliefDeltas. Every
+        applied delta marks the written cells dirty in the store, so the
+        incremental fusion refuses only what arrived.
+
+        :param senders: robot ids, one row each
+        :param grid_size: number of cells per belief
+        :param representation: "prob" or "logodds", how the mirrors are stored
+        :param precision: storage precision of the mirrors
+        :param wire_precision: precision of the incoming values
+        """
+        self.rows = {sender: row for row, sender in enumerate(senders)}
+        self.store = FleetBeliefStore(len(self.rows), grid_size, 0.5, representation, precision=precision)
+        self.wire = get_precision(wire_precision)
+        self.versions = np.full(len(self.rows), -1, dtype=np.int64)  # last message applied, -1 = none
+        self.times = np.zeros(len(self.rows))                          # time carried by that message
+        self.bytes_received = 0
+
+    def has(self, sender):
+        return self.versions[self.rows[sender]] >= 0
+
+    def view(self, sender):
+        return self.store.view(self.rows[sender])
+
+    def apply(self, delta):
+        """
+        Applies a delta to its sender's mirror. Messages older than the mirror
+        are ignored.
+        :return: False if the delta does not follow the mirror's version (a
+                 message was lost); the sender must then send a snapshot
+        """
+        row = self.rows[delta.sender]
+        current = self.versions[row]
+        if delta.version <= current:
+            return True
+        if not delta.snapshot and delta.base_version != current:
+            return False
+        self.bytes_received += delta.nbytes
+        self.versions[row] = delta.version
+        self.times[row] = delta.time if delta.time is not None else 0.0
+        if len(delta.starts) == 0:
+            return True
+
+        logodds = self.wire.decode(delta.values)
+        values = logodds if self.store.representation == "logodds" else logodds_to_prob(logodds)
+        cells = slice(None) if delta.snapshot else delta.cells()
+        self.store.data[row, cells] = self.store.precision.encode(values)
+        lo, hi = int(delta.starts[0]), int(delta.starts[-1] + delta.lengths[-1])
+        self.store.mark_dirty(row, lo, hi)
+        return True
+
+
+class MirroredRobot:
+    def __init__(self, robot, mirror):
+        """
+        Stand-in for a robot inside the centralizer's fusion: the belief is the
+        centralizer's mirror of it, every other attribute is the robot's own.
+        """
+        self.robot = robot
+        self.belief = mirror.view(robot.id)
+        self.belief_store = mirror.store
+        self.store_index = mirror.rows[robot.id]
+
+    def __getattr__(self, name):
+        return getattr(self.robot, name)
+
+
+class DeltaUplink:
+    def __init__(self, robots, precision="int16"):
+        """
+        Delta uploads between robots and the centralizer within one process:
+        an encoder per robot and a mirror per robot on the receiving side.
+        The centralizer fuses the mirrors instead of the robots' beliefs.
+
+        :param robots: robots with dense beliefs
+        :param precision: wire precision of the uploaded values
+        """
+        first = robots[0].belief
+        if first.representation == "sparse":
+            raise ValueError("Delta uploads require dense beliefs")
+        self.encoders = {r.id: DeltaEncoder(r.id, len(r.belief), precision) for r in robots}
+        self.mirror = MirrorStore([r.id for r in robots], len(first), first.representation,
+                                  first.precision, precision)
+        self.sources = {r.id: MirroredRobot(r, self.mirror) for r in robots}
+        self.bytes_sent = 0
+        self.full_bytes = 0   # what uploading every robot's whole stored belief would have cost
+        self.snapshots = 0
+        self.deltas = 0
+
+    def sync(self, robots, time=None):
+        """
+        Uploads every robot's changes and applies them to the mirrors.
+        :return: bytes sent
+        """
+        sent = 0
+        for r in robots:
+            encoder = self.encoders[r.id]
+            delta = encoder.encode(r.belief, time)
+            sent += delta.nbytes
+            self.full_bytes += r.belief.vector.nbytes
+            if delta.snapshot:
+                self.snapshots += 1
+            else:
+                self.deltas += 1
+            if not self.mirror.apply(delta):
+                encoder.request_snapshot()
+        self.bytes_sent += sent
+        return sent
+
+    def mirrored(self, robots):
+        """
+        The MirroredRobot stand-ins of robots.
+        """
+        return [self.sources[r.id] for r in robots]
@@ -0,0 +1,336 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from belief_core.bayes import BayesUpdate
+from belief_core.fusion_engine import FusionEngine
+from main import DEFAULT_CONFIG, Simulation
+
+METRICS = ("accuracy", "precision", "recall", "convergence_time", "allocation_efficiency")
+BACKENDS = ("auto", "batched", "simulation")
+
+
+def expand_sweep(base, sweep):
+    """
+    One config per point of the cartesian product of the sweep values.
+    :param base: dict of DEFAULT_CONFIG overrides shared by every point
+    :param sweep: dict {config key: list of values}
+    :return: list of (params, config), params holding only the swept values
+    """
+    unknown = (set(base) | set(sweep)) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown config keys: {sorted(unknown)}")
+    keys = sorted(sweep)
+    points = []
+    for values in itertools.product(*(sweep[k] for k in keys)):
+        params = dict(zip(keys, values))
+        points.append((params, dict(DEFAULT_CONFIG, **base, **params)))
+    return points
+
+
+def simulation_config(config, seed):
+    """
+    config for one in-process trial: no worker pool, history or instrumentation.
+    """
+    return dict(config, seed=int(seed), parallel_workers=0, history_dir=None,
+                instrument=False, instrument_dir=None, profile_steps=None)
+
+
+def victim_schedule(config, seed):
+    """
+    The victim schedule Simulation draws for this seed, as {step: (cells, intensities)}.
+    """
+    grid_size = config["grid_height"] * config["grid_width"]
+    rng = np.random.RandomState(int(seed))
+    schedule = {}
+    for t in config["victim_steps"]:
+        cells = rng.choice(grid_size, config["victims_per_step"], replace=False)
+        schedule[t] = (cells, np.array([rng.uniform(0.2, 0.9) for _ in cells]))
+    return schedule
+
+
+def convergence_time(changes, tol):
+    """
+    First step (1-based) whose max belief change is below tol, NaN if none.
+    :param changes: (..., steps) array of per-step max absolute changes
+    """
+    below = changes < tol
+    return np.where(below.any(axis=-1), np.argmax(below, axis=-1) + 1.0, np.nan)
+
+
+def detection_metrics(global_belief, victims, threshold=0.5):
+    """
+    Accuracy, precision and recall of (belief > threshold) against cells holding a victim.
+    Arrays may carry a leading trial axis.
+    """
+    detected, truth = global_belief > threshold, victims > 0
+    tp = np.sum(detected & truth, axis=-1)
+    accuracy = np.mean(detected == truth, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = tp / np.sum(detected, axis=-1)
+        recall = tp / np.sum(truth, axis=-1)
+    return accuracy, precision, recall
+
+
+def allocation_efficiency(robot_counts, victims, regions):
+    """
+    1 - total variation distance between the share of robots and the share of
+    victim mass in each region (1 = robots placed exactly where the victims are).
+    :param robot_counts: (num_regions,) robots assigned to each region
+    :param victims: (..., grid_size) victim intensities
+    :param regions: list of region index slices/arrays
+    """
+    robot_share = np.asarray(robot_counts, dtype=np.float64) / max(np.sum(robot_counts), 1)
+    mass = np.stack([np.sum(victims[..., r], axis=-1) for r in regions], axis=-1)
+    victim_share = mass / (np.sum(mass, axis=-1, keepdims=True) + 1e-10)
+    return 1.0 - 0.5 * np.sum(np.abs(victim_share - robot_share), axis=-1)
+
+
+class TrialLayout:
+    def __init__(self, config):
+        """
+        Robot observation windows and region membership of one configuration,
+        taken from a template Simulation. Robots are assigned before any victim
+        appears and never reassigned, so the layout is the same for every seed.
+        """
+        sim = Simulation(simulation_config(config, config["seed"]))
+        centralizer = sim.centralizer
+        self.grid_size = sim.grid.size
+        self.num_robots = len(sim.robots)
+        self.regions = centralizer.divide_grid()
+        cells = np.arange(self.grid_size)
+        windows = [cells[r.get_observation_indices()] for r in sim.robots]
+        self.window_lengths = np.array([len(w) for w in windows], dtype=np.intp)
+        self.window_starts = np.cumsum(self.window_lengths) - self.window_lengths
+        self.row_idx = np.repeat(np.arange(self.num_robots), self.window_lengths)
+        self.col_idx = np.concatenate(windows)
+        region_ids = [k for k in centralizer.region_centralizers if centralizer.region_assignments[k]]
+        self.members = [np.array([r.store_index for r in centralizer.region_assignments[k]]) for k in region_ids]
+        self.robot_counts = np.zeros(len(self.regions))
+        for k, m in zip(region_ids, self.members):
+            self.robot_counts[k] = len(m)
+
+
+class BatchedTrials:
+    def __init__(self, config, layout=None):
+        """
+        Runs many trials of one configuration at once, with a leading trial axis
+        on every belief array. Reproduces Simulation with dense beliefs and
+        uniform fusion weights in the probability representation.
+        """
+        if not supports_batched(config):
+            raise ValueError("BatchedTrials needs uniform weighting and the prob representation")
+        self.config = config
+        self.layout = layout if layout is not None else TrialLayout(config)
+        self.sensor_model = BayesUpdate(config["p_z_given_h"], config["p_z_given_not_h"])
+        self.membership = FusionEngine.membership_matrix(self.layout.members, self.layout.num_robots)
+
+    def run(self, seeds, tol=1e-3, threshold=0.5):
+        """
+        :param seeds: one seed per trial (victim schedule as Simulation would draw it)
+        :return: dict {metric: (num_trials,) array}
+        """
+        c, layout = self.config, self.layout
+        num_trials, grid_size = len(seeds), layout.grid_size
+        trials = np.arange(num_trials)[:, None]
+        beliefs = np.full((num_trials, layout.num_robots, grid_size), 0.5)
+        victims = np.zeros((num_trials, grid_size))
+        schedules = [victim_schedule(c, s) for s in seeds]
+        changes = np.empty((num_trials, c["steps"]))
+        previous = np.full((num_trials, grid_size), 0.5)
+
+        for t in range(1, c["steps"] + 1):
+            changed = np.zeros((num_trials, grid_size), dtype=bool)
+            if t in c["victim_steps"]:
+                cells = np.stack([s[t][0] for s in schedules])
+                victims[trials, cells] += np.stack([s[t][1] for s in schedules])
+                changed[trials, cells] = True
+
+            # Bayes update of every robot's window in every trial
+            window = beliefs[:, layout.row_idx, layout.col_idx]
+            posterior = self.sensor_model.posterior(window)
+            if c["update_on_change_only"] and t > 1:
+                touched = np.logical_or.reduceat(changed[:, layout.col_idx], layout.window_starts, axis=1)
+                posterior = np.where(np.repeat(touched, layout.window_lengths, axis=1), posterior, window)
+            beliefs[:, layout.row_idx, layout.col_idx] = posterior
+
+            # Regional then global uniform Chernoff fusion: (regions, robots) @ (trials, robots, cells)
+            region_logs = self.membership @ np.log(beliefs + 1e-10)
+            global_belief = np.clip(np.exp(np.mean(region_logs, axis=1)), 0.0, 1.0)
+            changes[:, t - 1] = np.max(np.abs(global_belief - previous), axis=1)
+            previous = global_belief
+
+        accuracy, precision, recall = detection_metrics(global_belief, victims, threshold)
+        return {
+            "accuracy": accuracy,
+            "precision": precision,
+            "recall": recall,
+            "convergence_time": convergence_time(changes, tol),
+            "allocation_efficiency": allocation_efficiency(layout.robot_counts, victims, layout.regions),
+        }
+
+
+def supports_batched(config):
+    """
+    True if the batched kernel reproduces a Simulation run of config: uniform
+    hierarchical geometric fusion of float64 probabilities every step, fixed
+    regions and whole-belief uploads.
+    """
+    return (config["fusion_mode"] == "hierarchical" and config["fusion_weighting"] == "uniform"
+            and config["fusion_rule"] == "geometric"
+            and config["belief_representation"] == "prob" and config["precision"] == "float64"
+            and not config["reassign_interval"] and config["convergence_tol"] is None
+            and not config["delta_uploads"])
+
+
+def run_simulation_trials(config, seeds, tol=1e-3, threshold=0.5):
+    """
+    Same metrics as BatchedTrials.run, one full Simulation per seed. Used for
+    configurations the batched kernel does not cover (omega weighting, the Bernoulli rule, log-odds or
+    sparse beliefs, periodic reassignment, gossip, convergence monitoring, delta uploads).
+    """
+    results = {name: np.empty(len(seeds)) for name in METRICS}
+    for i, seed in enumerate(seeds):
+        sim = Simulation(simulation_config(config, seed))
+        history = np.asarray(sim.run())
+        changes = np.max(np.abs(np.diff(history, axis=0, prepend=0.5)), axis=1)
+        victims = sim.victim_grid.grid
+        accuracy, precision, recall = detection_metrics(history[-1], victims, threshold)
+        robot_counts = [len(sim.centralizer.region_assignments.get(k, [])) for k in range(sim.grid.num_tiles)]
+        results["accuracy"][i], results["precision"][i], results["recall"][i] = accuracy, precision, recall
+        results["convergence_time"][i] = convergence_time(changes, tol)
+        results["allocation_efficiency"][i] = allocation_efficiency(
+            robot_counts, victims, sim.centralizer.divide_grid())
+    return results
+
+
+def _run_task(config, seeds, backend, tol, threshold):
+    """
+    Worker entry point: one batch of trials of one configuration.
+    """
+    if backend == "auto":
+        backend = "batched" if supports_batched(config) else "simulation"
+    if backend == "batched":
+        return BatchedTrials(config).run(seeds, tol, threshold)
+    return run_simulation_trials(config, seeds, tol, threshold)
+
+
+def summarize(values):
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return {"mean": None, "std": None, "p05": None, "p50": None, "p95": None, "finite": 0}
+    p05, p50, p95 = np.percentile(finite, [5, 50, 95])
+    return {"mean": float(np.mean(finite)), "std": float(np.std(finite)), "p05": float(p05),
+            "p50": float(p50), "p95": float(p95), "finite": int(len(finite))}
+
+
+class ExperimentRunner:
+    def __init__(self, base=None, sweep=None, trials=100, seed=0, batch_size=64, num_workers=None,
+                 backend="auto", tol=1e-3, threshold=0.5):
+        """
+        Monte Carlo sweep over configurations, trials fanned out over a process pool.
+        :param base: DEFAULT_CONFIG overrides shared by every configuration
+        :param sweep: dict {config key: list of values}; one configuration per combination
+        :param trials: trials per configuration (seeds seed, seed+1, ...)
+        :param batch_size: trials per worker task (the batched trial axis)
+        :param num_workers: worker processes (None = os.cpu_count(), 0 = run in this process)
+        :param backend: "batched", "simulation" or "auto" (batched where supported)
+        :param tol: max belief change per step below which a trial counts as converged
+        :param threshold: belief above which a cell counts as a detected victim
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+        self.points = expand_sweep(base or {}, sweep or {})
+        self.trials = trials
+        self.seeds = np.arange(seed, seed + trials)
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.backend = backend
+        self.tol = tol
+        self.threshold = threshold
+
+    def tasks(self):
+        for point, (_, config) in enumerate(self.points):
+            for start in range(0, self.trials, self.batch_size):
+                yield point, (config, self.seeds[start:start + self.batch_size],
+                              self.backend, self.tol, self.threshold)
+
+    def run(self):
+        """
+        :return: list of {"params", "trials", "metrics": {metric: summary}, "raw": {metric: array}}
+        """
+        raw = [{name: [] for name in METRICS} for _ in self.points]
+        tasks = list(self.tasks())
+        if self.num_workers == 0:
+            outputs = [_run_task(*args) for _, args in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+                futures = [pool.submit(_run_task, *args) for _, args in tasks]
+                outputs = [f.result() for f in futures]
+        for (point, _), output in zip(tasks, outputs):
+            for name in METRICS:
+                raw[point][name].append(output[name])
+
+        results = []
+        for (params, _), metrics in zip(self.points, raw):
+            metrics = {name: np.concatenate(v) for name, v in metrics.items()}
+            results.append({
+                "params": params,
+                "trials": self.trials,
+                "metrics": {name: summarize(v) for name, v in metrics.items()},
+                "converged_fraction": float(np.mean(np.isfinite(metrics["convergence_time"]))),
+                "raw": metrics,
+            })
+        return results
+
+    def write(self, results, out_dir):
+        """
+        Writes summary.json (aggregates per configuration) and trials.npz (every trial's metrics).
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        summary = [{k: v for k, v in r.items() if k != "raw"} for r in results]
+        with open(os.path.join(out_dir, "summary.json"), "w") as f:
+            json.dump({"seeds": [int(self.seeds[0]), int(self.seeds[-1])] if self.trials else [],
+                       "tol": self.tol, "threshold": self.threshold, "configs": summary}, f, indent=2)
+        np.savez(os.path.join(out_dir, "trials.npz"),
+                 **{f"{i}_{name}": r["raw"][name] for i, r in enumerate(results) for name in METRICS})
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo parameter sweeps of the belief merging simulation")
+    parser.add_argument("--spec", help='JSON file {"base": {...}, "sweep": {key: [values]}}')
+    parser.add_argument("--trials", type=int, default=100, help="trials per configuration")
+    parser.add_argument("--seed", type=int, default=0, help="first trial seed")
+    parser.add_argument("--batch-size", type=int, default=64, help="trials vectorized per worker task")
+    parser.add_argument("--workers", type=int, help="worker processes (0 = run in this process)")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto")
+    parser.add_argument("--tol", type=float, default=1e-3, help="convergence tolerance on the global belief")
+    parser.add_argument("--out-dir", default="experiments_output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    spec = {}
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+    runner = ExperimentRunner(spec.get("base"), spec.get("sweep"), trials=args.trials, seed=args.seed,
+                              batch_size=args.batch_size, num_workers=args.workers,
+                              backend=args.backend, tol=args.tol)
+    results = runner.run()
+    runner.write(results, args.out_dir)
+    for r in results:
+        means = ", ".join(f"{name}={r['metrics'][name]['mean']:.4g}" if r["metrics"][name]["mean"] is not None
+                          else f"{name}=n/a" for name in METRICS)
+        print(f"{r['params']}: {means}")
+    print(f"Results written to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+"""Re-export of belief_core.fusion_engine, kept so existing imports keep working."""
+from belief_core.fusion_engine import *
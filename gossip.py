@@ -0,0 +1,366 @@
+import argparse
+import time
+import numpy as np
+from belief_core.belief import stack_beliefs, stack_logodds
+from belief_core.fusion import FusionRule
+
+GRAPHS = ("range", "knn")
+
+
+class CSRMatrix:
+    def __init__(self, indptr, indices, data, shape):
+        """
+        Compressed sparse row matrix with just what consensus rounds need:
+        products with dense (num_cols, grid_size) matrices.
+
+        :param indptr: (num_rows + 1,) start of each row in indices/data
+        :param indices: (nnz,) column of every stored entry, sorted within each row
+        :param data: (nnz,) value of every stored entry
+        :param shape: (num_rows, num_cols)
+        """
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.data = np.asarray(data, dtype=np.float64)
+        self.shape = tuple(shape)
+
+    @classmethod
+    def from_coo(cls, rows, cols, data, shape):
+        """
+        Builds the matrix from (row, col, value) triplets; duplicates are summed.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        cols = np.asarray(cols, dtype=np.intp)
+        data = np.asarray(data, dtype=np.float64)
+        keys, inverse = np.unique(rows * shape[1] + cols, return_inverse=True)
+        summed = np.bincount(inverse.ravel(), weights=data, minlength=len(keys))
+        rows, cols = np.divmod(keys, shape[1])
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=shape[0]))))
+        return cls(indptr, cols, summed, shape)
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def dot(self, dense, max_block_elements=1 << 16):
+        """
+        self @ dense. Rows are processed in blocks whose gathered neighbor rows
+        hold at most max_block_elements values, so memory stays bounded.
+        :param dense: (num_cols, k) array
+        :return: (num_rows, k) array in dense's float dtype
+        """
+        dense = np.asarray(dense)
+        num_rows = self.shape[0]
+        data = self.data.astype(dense.dtype, copy=False)
+        out = np.zeros((num_rows, dense.shape[1]), dtype=dense.dtype)
+        per_block = max(1, max_block_elements // max(dense.shape[1], 1))
+        row = 0
+        while row < num_rows:
+            start = self.indptr[row]
+            end_row = int(np.searchsorted(self.indptr, start + per_block, side="right")) - 1
+            end_row = min(max(end_row, row + 1), num_rows)
+            end = self.indptr[end_row]
+            if end > start:
+                products = data[start:end, None] * dense[self.indices[start:end]]
+                # Segments start at the non-empty rows only, so each one ends where the
+                # next non-empty row begins; empty rows stay zero
+                nonempty = np.flatnonzero(np.diff(self.indptr[row:end_row + 1]) > 0)
+                out[row + nonempty] = np.add.reduceat(products, self.indptr[row + nonempty] - start, axis=0)
+            row = end_row
+        return out
+
+    def __matmul__(self, dense):
+        return self.dot(dense)
+
+
+def _edge_pairs(i, j, n):
+    """
+    Unique undirected (i < j) edges from candidate pairs, self-loops dropped.
+    """
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    keys = np.unique(i[i != j] * n + j[i != j])
+    return np.divmod(keys, n)
+
+
+def range_edges(positions, radius, chunk=1024):
+    """
+    Edges between every pair of robots at most `radius` apart.
+    Distances are computed a block of rows at a time.
+    :param positions: (num_robots, dim) positions
+    :return: (src, dst) arrays of undirected edges with src < dst
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    n = len(positions)
+    src, dst = [np.empty(0, dtype=np.intp)], [np.empty(0, dtype=np.intp)]
+    for start in range(0, n, chunk):
+        block = positions[start:start + chunk]
+        d2 = np.sum((block[:, None, :] - positions[None, :, :]) ** 2, axis=2)
+        i, j = np.nonzero(d2 <= radius * radius)
+        keep = i + start < j
+        src.append(i[keep] + start)
+        dst.append(j[keep])
+    return np.concatenate(src), np.concatenate(dst)
+
+
+def knn_edges(positions, k, chunk=1024):
+    """
+    Edges from every robot to its k nearest robots, made undirected.
+    :return: (src, dst) arrays of undirected edges with src < dst
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    n = len(positions)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    src, dst = [], []
+    for start in range(0, n, chunk):
+        block = positions[start:start + chunk]
+        d2 = np.sum((block[:, None, :] - positions[None, :, :]) ** 2, axis=2)
+        rows = np.arange(len(block))
+        d2[rows, rows + start] = np.inf
+        nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        src.append(np.repeat(rows + start, k))
+        dst.append(nearest.ravel())
+    return _edge_pairs(np.concatenate(src), np.concatenate(dst), n)
+
+
+def networkx_edges(graph, ids=None):
+    """
+    Edges of a networkx graph (or anything with edges()). Nodes are robot
+    indices, or robot ids when ids (the robot id of every index) is given.
+    :return: (src, dst) arrays of undirected edges with src < dst
+    """
+    edges = list(graph.edges())
+    n = len(ids) if ids is not None else graph.number_of_nodes()
+    if not edges:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    if ids is not None:
+        index = {node: i for i, node in enumerate(ids)}
+        edges = [(index[a], index[b]) for a, b in edges]
+    pairs = np.asarray(edges, dtype=np.intp)
+    return _edge_pairs(pairs[:, 0], pairs[:, 1], n)
+
+
+def metropolis_weights(src, dst, n):
+    """
+    Metropolis-Hastings consensus weights of an undirected graph:
+    W_ij = 1 / (1 + max(deg_i, deg_j)) on every edge and W_ii = 1 - sum_j W_ij.
+    W is symmetric and doubly stochastic, so repeated averaging converges to
+    the fleet-wide mean on every connected component.
+    :return: (n, n) CSRMatrix
+    """
+    degree = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+    w = 1.0 / (1.0 + np.maximum(degree[src], degree[dst]))
+    self_weight = 1.0 - np.bincount(src, weights=w, minlength=n) - np.bincount(dst, weights=w, minlength=n)
+    diagonal = np.arange(n)
+    rows = np.concatenate([src, dst, diagonal])
+    cols = np.concatenate([dst, src, diagonal])
+    return CSRMatrix.from_coo(rows, cols, np.concatenate([w, w, self_weight]), (n, n))
+
+
+def connected_components(src, dst, n):
+    """
+    Connected component of every node, by min-label propagation with pointer jumping.
+    :return: (n,) label of every node: the smallest node index in its component
+    """
+    labels = np.arange(n)
+    while True:
+        new = labels.copy()
+        np.minimum.at(new, src, labels[dst])
+        np.minimum.at(new, dst, labels[src])
+        new = new[new]
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+class GossipConsensus:
+    def __init__(self, graph="range", radius=2.0, k=4, tol=1e-3, max_rounds=100, fusion=None):
+        """
+        Decentralized fusion baseline: robots repeatedly average their
+        log-beliefs (in the fusion rule's log domain) with their neighbors
+        on a communication graph, using
+        Metropolis-Hastings weights. One round is one sparse product
+        W @ L over the fleet's (num_robots, grid_size) log-belief matrix.
+        On a connected graph every robot converges to the uniform Chernoff
+        fusion of the whole fleet.
+
+        :param graph: "range" (robots within radius) or "knn" (k nearest, made undirected);
+                      set_graph() installs any other edge set, e.g. networkx_edges(g)
+        :param radius: communication range for "range", in grid cells
+        :param k: neighbors per robot for "knn"
+        :param tol: consensus once, in every connected component, the robots'
+                    log-beliefs differ by less than tol (components cannot agree with each other)
+        :param max_rounds: round limit per step
+        :param fusion: FusionRule whose log domain is averaged (a default one is created if None)
+        """
+        if graph not in GRAPHS:
+            raise ValueError(f"graph must be one of {GRAPHS}, got {graph!r}")
+        self.graph = graph
+        self.radius = radius
+        self.k = k
+        self.tol = tol
+        self.max_rounds = max_rounds
+        self.fusion = fusion if fusion is not None else FusionRule()
+        self.weights = None
+        self.edges = None
+        self.labels = None           # connected component of every robot
+        self.num_components = None
+        self.fixed_graph = False
+        self.rounds_history = []     # rounds to per-component consensus at every step
+        self.converged_history = []  # whether every component reached consensus at every step
+        self._component_order = None   # robots sorted by component ...
+        self._component_starts = None  # ... and where each component starts in that order
+        self.global_belief = None    # mean of the robots' beliefs after the last step (probabilities)
+        self._positions = None
+
+    def set_graph(self, src, dst, n, fixed=True):
+        """
+        Installs a communication graph given as undirected edges.
+        :param fixed: keep it instead of rebuilding from positions each step
+        """
+        src, dst = np.asarray(src, dtype=np.intp), np.asarray(dst, dtype=np.intp)
+        self.edges = (src, dst)
+        self.weights = metropolis_weights(src, dst, n)
+        self.labels = connected_components(src, dst, n)
+        self._component_order = np.argsort(self.labels, kind="stable")
+        sorted_labels = self.labels[self._component_order]
+        self._component_starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+        self.num_components = len(self._component_starts)
+        self.fixed_graph = fixed
+
+    def update_graph(self, positions):
+        """
+        Rebuilds the graph from robot positions when they changed.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        if self.fixed_graph or (self._positions is not None and np.array_equal(positions, self._positions)):
+            return
+        self._positions = positions.copy()
+        if self.graph == "range":
+            src, dst = range_edges(positions, self.radius)
+        else:
+            src, dst = knn_edges(positions, self.k)
+        self.set_graph(src, dst, len(positions), fixed=False)
+
+    def spread(self, logs):
+        """
+        Largest disagreement between robots of the same connected component,
+        over all cells (the whole fleet counts as one component before a graph is set).
+        """
+        if len(logs) == 0:
+            return 0.0
+        if self.labels is None or self.num_components == 1:
+            return float(np.max(np.max(logs, axis=0) - np.min(logs, axis=0)))
+        grouped = logs[self._component_order]
+        highest = np.maximum.reduceat(grouped, self._component_starts, axis=0)
+        lowest = np.minimum.reduceat(grouped, self._component_starts, axis=0)
+        return float(np.max(highest - lowest))
+
+    def run(self, logs):
+        """
+        Gossip rounds until every connected component reaches consensus
+        (spread below tol) or max_rounds.
+        :param logs: (num_robots, grid_size) log-beliefs (log p or log-odds)
+        :return: (logs after the rounds, rounds used, whether consensus was reached)
+        """
+        rounds = 0
+        converged = self.spread(logs) < self.tol
+        while not converged and rounds < self.max_rounds:
+            logs = self.weights @ logs
+            rounds += 1
+            converged = self.spread(logs) < self.tol
+        return logs, rounds, converged
+
+    def step(self, robots, positions=None):
+        """
+        One consensus phase: reads every robot's belief, runs the rounds and
+        writes the result back.
+        :param robots: robots with dense beliefs, in graph index order
+        :param positions: (num_robots, dim) positions, to rebuild a range/knn graph
+        :return: rounds used
+        """
+        if positions is not None:
+            self.update_graph(positions)
+        representation = robots[0].belief.representation
+        if representation == "sparse":
+            raise ValueError("Gossip consensus requires dense beliefs")
+        stacked = stack_logodds(robots) if representation == "logodds" else stack_beliefs(robots)
+        logs = self.fusion.to_log(stacked, representation)
+        logs, rounds, converged = self.run(logs)
+        self.rounds_history.append(rounds)
+        self.converged_history.append(converged)
+
+        beliefs = self.fusion.to_prob(logs)
+        logodds = self.fusion.from_log(logs, "logodds") if representation == "logodds" else None
+        self._write_back(robots, logodds, beliefs, representation)
+        self.global_belief = self.fusion.to_prob(np.mean(logs, axis=0))
+        return rounds
+
+    @staticmethod
+    def _write_back(robots, logodds, beliefs, representation):
+        store = robots[0].belief_store
+        rows = [r.store_index for r in robots]
+        if store is not None and all(r.belief_store is store for r in robots[1:]):
+            store.data[rows] = store.encode(beliefs) if representation == "prob" else store.precision.encode(logodds)
+            store.mark_dirty(np.asarray(rows), 0, store.grid_size)
+        else:
+            for k, (r, row) in enumerate(zip(robots, beliefs)):
+                if representation == "logodds":
+                    r.belief.update_logodds(logodds[k])
+                else:
+                    r.belief.update(row)
+
+
+def compare(config, verbose=True):
+    """
+    Runs config once with hierarchical fusion and once with gossip consensus.
+    :return: {mode: {"seconds_per_step", "rounds" (gossip), "final_belief"}}
+    """
+    from main import Simulation
+
+    results = {}
+    for mode in ("hierarchical", "gossip"):
+        simulation = Simulation(dict(config, fusion_mode=mode))
+        start = time.perf_counter()
+        try:
+            for t in range(1, config["steps"] + 1):
+                simulation.step(t)
+        finally:
+            if simulation.parallel is not None:
+                simulation.parallel.close()
+        elapsed = time.perf_counter() - start
+        results[mode] = {
+            "seconds_per_step": elapsed / max(config["steps"], 1),
+            "final_belief": np.asarray(simulation.centralizer.global_belief, dtype=np.float64),
+        }
+        if simulation.gossip is not None:
+            results[mode]["rounds"] = list(simulation.gossip.rounds_history)
+            results[mode]["converged"] = all(simulation.gossip.converged_history)
+            results[mode]["components"] = simulation.gossip.num_components
+    if verbose:
+        gossip = results["gossip"]
+        difference = np.max(np.abs(gossip["final_belief"] - results["hierarchical"]["final_belief"]))
+        print(f"hierarchical: {results['hierarchical']['seconds_per_step'] * 1e3:.2f} ms/step")
+        print(f"gossip:       {gossip['seconds_per_step'] * 1e3:.2f} ms/step, rounds per step {gossip['rounds']}, "
+              f"consensus {'reached' if gossip['converged'] else 'NOT reached'}, "
+              f"{gossip['components']} component(s)")
+        print(f"max |global belief difference|: {difference:.3e}")
+    return results
+
+
+def main(argv=None):
+    from main import load_config
+
+    parser = argparse.ArgumentParser(description="Gossip consensus vs hierarchical fusion")
+    parser.add_argument("--config", help="JSON file overriding DEFAULT_CONFIG entries")
+    parser.add_argument("--steps", type=int, help="override the number of steps")
+    parser.add_argument("--robots", type=int, dest="num_robots", help="override the number of robots")
+    parser.add_argument("--graph", choices=GRAPHS, dest="gossip_graph", help="communication graph")
+    args = parser.parse_args(argv)
+    config = load_config(args.config, {"steps": args.steps, "num_robots": args.num_robots,
+                                       "gossip_graph": args.gossip_graph})
+    return compare(config)
+
+
+if __name__ == "__main__":
+    main()
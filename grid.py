@@ -0,0 +1,2 @@
+"""Re-export of belief_core.grid, kept so existing imports keep working."""
+from belief_core.grid import *
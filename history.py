@@ -0,0 +1,207 @@
+import json
+import os
+import numpy as np
+
+
+class HistoryWriter:
+    def __init__(self, path, row_shape, chunk_steps=256, compress=False, dtype=np.float64, chunk_bytes=None):
+        """
+        Append-only per-step history stored as fixed-size chunk files on disk.
+
+        Each chunk is a (chunk_steps, *row_shape) .npy file written through a
+        memory map, so memory use stays flat however long the run is. Full
+        chunks can be compressed (zlib, .npz) when they are closed; the last,
+        partial chunk is trimmed to the steps written when the writer closes.
+
+        :param path: directory of this stream (created if missing)
+        :param row_shape: shape of one step's entry, e.g. (grid_size,) or (num_robots, grid_size)
+        :param chunk_steps: steps per chunk file
+        :param compress: compress every completed chunk
+        :param dtype: stored dtype
+        :param chunk_bytes: optional size limit of a chunk file; chunk_steps is
+                            lowered to fit it (one step per chunk at least)
+        """
+        self.path = path
+        self.row_shape = tuple(np.atleast_1d(row_shape).tolist())
+        self.dtype = np.dtype(dtype)
+        if chunk_bytes is not None:
+            row_bytes = max(int(np.prod(self.row_shape)) * self.dtype.itemsize, 1)
+            chunk_steps = min(chunk_steps, max(1, chunk_bytes // row_bytes))
+        self.chunk_steps = chunk_steps
+        self.compress = compress
+        self.num_steps = 0
+        self.chunks = []  # file names, in order
+        self._chunk = None
+        os.makedirs(path, exist_ok=True)
+        self._write_meta()
+
+    def _chunk_name(self, index, compressed):
+        return f"chunk_{index:06d}.npz" if compressed else f"chunk_{index:06d}.npy"
+
+    def append(self, row):
+        """
+        Appends one step. A SparseBelief row is written straight into the chunk.
+        """
+        offset = self.num_steps % self.chunk_steps
+        if offset == 0:
+            name = self._chunk_name(len(self.chunks), False)
+            self._chunk = np.lib.format.open_memmap(os.path.join(self.path, name), mode="w+", dtype=self.dtype,
+                                                    shape=(self.chunk_steps,) + self.row_shape)
+            self.chunks.append(name)
+        if hasattr(row, "to_dense"):
+            row.to_dense(out=self._chunk[offset])
+        else:
+            self._chunk[offset] = row
+        self.num_steps += 1
+        if self.num_steps % self.chunk_steps == 0:
+            self._close_chunk()
+
+    def _close_chunk(self):
+        if self._chunk is None:
+            return
+        self._chunk.flush()
+        name = self.chunks[-1]
+        used = self.num_steps - (len(self.chunks) - 1) * self.chunk_steps
+        if self.compress or used < self.chunk_steps:
+            data = np.array(self._chunk[:used])
+            self._chunk = None
+            os.remove(os.path.join(self.path, name))
+            if self.compress:
+                name = self._chunk_name(len(self.chunks) - 1, True)
+                np.savez_compressed(os.path.join(self.path, name), data=data)
+            else:
+                # Only the last chunk can be partial: keep just the steps written
+                np.save(os.path.join(self.path, name), data)
+            self.chunks[-1] = name
+        self._chunk = None
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = {
+            "row_shape": list(self.row_shape),
+            "dtype": self.dtype.str,
+            "chunk_steps": self.chunk_steps,
+            "num_steps": self.num_steps,
+            "chunks": self.chunks,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    def __len__(self):
+        return self.num_steps
+
+    def close(self):
+        self._close_chunk()
+        self._write_meta()
+
+
+class HistoryReader:
+    def __init__(self, path, cache_chunks=2):
+        """
+        Lazy reader of a HistoryWriter stream. Indexing loads only the chunks
+        covering the requested steps; uncompressed chunks are memory-mapped.
+
+            reader[t]               one step
+            reader[t0:t1]           steps t0..t1-1
+            reader[t0:t1, c0:c1]    a cell range of those steps
+
+        :param path: stream directory
+        :param cache_chunks: number of decompressed chunks kept in memory
+        """
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.row_shape = tuple(meta["row_shape"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.chunk_steps = meta["chunk_steps"]
+        self.num_steps = meta["num_steps"]
+        self.chunks = meta["chunks"]
+        self.cache_chunks = cache_chunks
+        self._cache = {}
+
+    def __len__(self):
+        return self.num_steps
+
+    @property
+    def shape(self):
+        return (self.num_steps,) + self.row_shape
+
+    def _load_chunk(self, index):
+        if index in self._cache:
+            return self._cache[index]
+        name = self.chunks[index]
+        full = os.path.join(self.path, name)
+        if name.endswith(".npz"):
+            with np.load(full) as archive:
+                chunk = archive["data"]
+        else:
+            chunk = np.load(full, mmap_mode="r")
+        if len(self._cache) >= self.cache_chunks:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[index] = chunk
+        return chunk
+
+    def __getitem__(self, key):
+        rest = ()
+        if isinstance(key, tuple):
+            key, rest = key[0], key[1:]
+        if isinstance(key, (int, np.integer)):
+            t = key + self.num_steps if key < 0 else key
+            if not 0 <= t < self.num_steps:
+                raise IndexError(f"step {key} out of range for {self.num_steps} steps")
+            return np.array(self._load_chunk(t // self.chunk_steps)[(t % self.chunk_steps,) + rest])
+
+        start, stop, step = key.indices(self.num_steps)
+        steps = np.arange(start, stop, step)
+        parts = []
+        for chunk_index in np.unique(steps // self.chunk_steps):
+            in_chunk = steps[steps // self.chunk_steps == chunk_index] % self.chunk_steps
+            chunk = self._load_chunk(int(chunk_index))
+            parts.append(np.asarray(chunk[(in_chunk,) + rest]))
+        if not parts:
+            probe = np.empty((0,) + self.row_shape, dtype=self.dtype)
+            return probe[(slice(None),) + rest]
+        return np.concatenate(parts)
+
+    def replay(self, start=0, stop=None, cells=None):
+        """
+        Yields (step, row) for every stored step without recomputing the run.
+        :param cells: optional index/slice applied to every row
+        """
+        stop = self.num_steps if stop is None else min(stop, self.num_steps)
+        for t in range(start, stop):
+            row = self._load_chunk(t // self.chunk_steps)[t % self.chunk_steps]
+            yield t, np.array(row if cells is None else row[cells])
+
+
+class HistoryStore:
+    def __init__(self, root, chunk_steps=256, compress=False, chunk_bytes=None):
+        """
+        Directory of named history streams (e.g. "global", "regions", "robots").
+        Every stream's chunks hold at most chunk_steps steps and chunk_bytes bytes.
+        """
+        self.root = root
+        self.chunk_steps = chunk_steps
+        self.compress = compress
+        self.chunk_bytes = chunk_bytes
+        self.writers = {}
+        os.makedirs(root, exist_ok=True)
+
+    def writer(self, name, row_shape, dtype=np.float64):
+        if name not in self.writers:
+            self.writers[name] = HistoryWriter(os.path.join(self.root, name), row_shape, self.chunk_steps,
+                                               self.compress, dtype, self.chunk_bytes)
+        return self.writers[name]
+
+    def reader(self, name):
+        writer = self.writers.get(name)
+        if writer is not None:
+            writer._write_meta()
+        return HistoryReader(os.path.join(self.root, name))
+
+    def streams(self):
+        return sorted(d for d in os.listdir(self.root) if os.path.exists(os.path.join(self.root, d, "meta.json")))
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
@@ -0,0 +1,242 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+PROFILERS = ("cprofile", "sampling")
+
+_NULL_PHASE = nullcontext()
+
+
+class NullInstrumentation:
+    """
+    Instrumentation that records nothing. Every hook is a no-op returning
+    shared objects, so leaving the hooks in the hot loop costs a method call.
+    """
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def count(self, name, value=1):
+        pass
+
+    def begin_step(self, step):
+        pass
+
+    def end_step(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Phase:
+    __slots__ = ("timers", "calls", "name", "start")
+
+    def __init__(self, timers, calls, name):
+        self.timers, self.calls, self.name = timers, calls, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timers[self.name] += time.perf_counter() - self.start
+        self.calls[self.name] += 1
+        return False
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005, thread_id=None):
+        """
+        Samples the stack of one thread from a background thread.
+        :param interval: seconds between samples
+        :param thread_id: thread to sample (default: the one calling start())
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = defaultdict(int)  # "file:func;file:func;..." (outermost first) -> samples
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        """
+        Samples in the collapsed-stack format read by flame graph tools.
+        """
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(self.stacks.items(), key=lambda x: -x[1]))
+
+
+class Instrumentation:
+    enabled = True
+
+    def __init__(self, profile_steps=None, profiler="cprofile", sampling_interval=0.005):
+        """
+        Per-phase wall-clock timers and counters, with optional profiling.
+        :param profile_steps: (start, stop) step range to profile, stop inclusive (None = no profiling)
+        :param profiler: "cprofile" or "sampling"
+        :param sampling_interval: seconds between samples for the sampling profiler
+        """
+        if profiler not in PROFILERS:
+            raise ValueError(f"profiler must be one of {PROFILERS}, got {profiler!r}")
+        self.timers = defaultdict(float)  # phase -> total seconds
+        self.calls = defaultdict(int)     # phase -> number of times entered
+        self.counters = defaultdict(int)  # e.g. cells_updated, fusions, belief_bytes
+        self.step_times = []
+        self.profile_steps = profile_steps
+        self.profiler = profiler
+        self.sampling_interval = sampling_interval
+        self.profile = None   # finished profiler, for profile_report()
+        self._profile = None  # profiler currently running
+        self._step_start = None
+        self.current_step = None
+
+    def phase(self, name):
+        """
+        Context manager adding the wall-clock time of its block to timers[name].
+        Phases may nest; each is timed on its own.
+        """
+        return _Phase(self.timers, self.calls, name)
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+
+    def _profiling(self, step):
+        if self.profile_steps is None:
+            return False
+        start, stop = self.profile_steps
+        return start <= step <= stop
+
+    def begin_step(self, step):
+        self.current_step = step
+        if self._profiling(step) and self._profile is None:
+            if self.profiler == "cprofile":
+                self._profile = cProfile.Profile()
+                self._profile.enable()
+            else:
+                self._profile = SamplingProfiler(self.sampling_interval)
+                self._profile.start()
+        self._step_start = time.perf_counter()
+
+    def end_step(self):
+        if self._step_start is not None:
+            self.step_times.append(time.perf_counter() - self._step_start)
+            self._step_start = None
+        self.count("steps")
+        if self._profile is not None and not self._profiling(self.current_step + 1):
+            self._stop_profile()
+
+    def _stop_profile(self):
+        if self.profiler == "cprofile":
+            self._profile.disable()
+        else:
+            self._profile.stop()
+        self.profile = self._profile
+        self._profile = None
+
+    def close(self):
+        if self._profile is not None:
+            self._stop_profile()
+
+    def profile_report(self, limit=30):
+        """
+        cProfile: pstats table sorted by cumulative time. Sampling: collapsed stacks.
+        """
+        if self.profile is None:
+            return ""
+        if isinstance(self.profile, SamplingProfiler):
+            return self.profile.collapsed()
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def to_dict(self):
+        steps = self.step_times
+        return {
+            "phases": {name: {"seconds": self.timers[name], "calls": self.calls[name]} for name in self.timers},
+            "counters": dict(self.counters),
+            "steps": {
+                "count": len(steps),
+                "total_seconds": sum(steps),
+                "mean_seconds": sum(steps) / len(steps) if steps else 0.0,
+                "max_seconds": max(steps) if steps else 0.0,
+            },
+        }
+
+    def to_prometheus(self, prefix="belief_merging"):
+        """
+        Metrics in the Prometheus text exposition format. Every metric family
+        gets one HELP/TYPE header; phases and counters are told apart by labels.
+        """
+        lines = [
+            f"# HELP {prefix}_phase_seconds_total Wall-clock seconds spent in each phase.",
+            f"# TYPE {prefix}_phase_seconds_total counter",
+        ]
+        lines += [f'{prefix}_phase_seconds_total{{phase="{name}"}} {self.timers[name]:.9g}' for name in self.timers]
+        lines += [
+            f"# HELP {prefix}_phase_calls_total Times each phase was entered.",
+            f"# TYPE {prefix}_phase_calls_total counter",
+        ]
+        lines += [f'{prefix}_phase_calls_total{{phase="{name}"}} {self.calls[name]}' for name in self.calls]
+        lines += [
+            f"# HELP {prefix}_events_total Events counted during the run (cells updated, fusions, bytes, ...).",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        lines += [f'{prefix}_events_total{{counter="{name}"}} {value}' for name, value in self.counters.items()]
+        stats = self.to_dict()["steps"]
+        lines += [
+            f"# HELP {prefix}_step_seconds Wall-clock seconds per simulation step.",
+            f"# TYPE {prefix}_step_seconds summary",
+            f"{prefix}_step_seconds_sum {stats['total_seconds']:.9g}",
+            f"{prefix}_step_seconds_count {stats['count']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_prometheus(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_prometheus())
+
+    def write_profile(self, path):
+        with open(path, "w") as f:
+            f.write(self.profile_report())
+
+    def summary(self):
+        total = sum(self.step_times) or 1e-12
+        rows = [f"{'phase':24s} {'seconds':>10s} {'calls':>8s} {'% step':>7s}"]
+        for name, seconds in sorted(self.timers.items(), key=lambda x: -x[1]):
+            rows.append(f"{name:24s} {seconds:10.4f} {self.calls[name]:8d} {100 * seconds / total:6.1f}%")
+        rows += [f"{name}: {value}" for name, value in self.counters.items()]
+        return "\n".join(rows)
@@ -1,151 +1,450 @@
-from robot import Robot
-from VictimGrid import VictimGrid
-from centralizer import MainCentralizer
-from fusion import FusionRule
+import argparse
+import json
+import os
 import numpy as np
-import matplotlib.pyplot as plt
-import networkx as nx
-import matplotlib.colors as mcolors
+from belief_core.robot import FleetComponents, Robot
+from belief_core.belief import FleetBeliefStore
+from belief_core.VictimGrid import VictimGrid
+from centralizer import MainCentralizer
+from belief_core.fusion import FUSION_RULES, FusionRule
+from belief_core.bayes import BayesUpdate
+from belief_core.grid import TiledGrid
+from parallel import ParallelRegionFusion
+from rendering import THRESHOLDS
+from belief_core.belief import stack_beliefs
+from history import HistoryStore
+from assignment import AssignmentSolver
+from instrumentation import Instrumentation, NullInstrumentation
+from belief_core.precision import PRECISIONS, Precision
+from delta import DeltaUplink
+from convergence import CONVERGENCE_ACTIONS, ConvergenceMonitor
+from gossip import GRAPHS, GossipConsensus
 
 # --- Simulation Parameters ---
-T = 5
-GRID_SIZE = 100
-NUM_REGIONS = 5
-NUM_ROBOTS = 10
-l_bar = 0.95
-OBSERVATION_RANGE = 2
-
-# --- Initial Beliefs and Nominal PMF ---
-np.random.seed(42)
-initial_beliefs = [np.full(GRID_SIZE, 0.5) for _ in range(NUM_ROBOTS)]
-nominal_pmf = np.full(GRID_SIZE, 0.5)
-
-# --- Victim Grid ---
-victim_grid = VictimGrid(size=GRID_SIZE)
-victim_grid.grid[:] = 0
-
-# --- Victim Schedule (Many Victims) ---
-victim_schedule = {
-    1: [(i, np.random.uniform(0.2, 0.9)) for i in np.random.choice(GRID_SIZE, 10, replace=False)],
-    2: [(i, np.random.uniform(0.2, 0.9)) for i in np.random.choice(GRID_SIZE, 10, replace=False)],
-    3: [(i, np.random.uniform(0.2, 0.9)) for i in np.random.choice(GRID_SIZE, 10, replace=False)],
-    4: [(i, np.random.uniform(0.2, 0.9)) for i in np.random.choice(GRID_SIZE, 10, replace=False)],
-    5: [(i, np.random.uniform(0.2, 0.9)) for i in np.random.choice(GRID_SIZE, 10, replace=False)],
+DEFAULT_CONFIG = {
+    "steps": 5,
+    "grid_height": 10,
+    "grid_width": 10,
+    "tile_height": 2,                  # one rectangular tile per region
+    "tile_width": 10,
+    "num_robots": 10,
+    "l_bar": 0.95,
+    "observation_range": 2,
+    "p_z_given_h": 0.8,                # sensor likelihood if victim present
+    "p_z_given_not_h": 0.1,            # sensor likelihood if no victim
+    "belief_representation": "prob",   # "prob", "logodds" or "sparse"
+    "precision": "float64",            # "float64", "float32", or quantized log-odds "int16" / "int8"
+    "precision_logodds_limit": None,   # saturation of the quantized formats (None = precision default)
+    "fusion_rule": "geometric",        # Chernoff rule, independent of storage: "geometric" or "bernoulli"
+    "fusion_weighting": "uniform",     # "uniform", "dynamic" or "optimal"
+    "incremental_fusion": True,        # refuse only regions/cells that changed (uniform weighting)
+    "update_on_change_only": False,    # robots skip observing windows with no new victim events
+    "parallel_workers": 0,             # >0: fuse regions in worker processes over shared memory
+    "delta_uploads": False,            # robots upload changed cells; the centralizer fuses its mirrors
+    "uplink_precision": "int16",       # wire precision of uploaded log-odds
+    "reassign_interval": 0,            # >0: reassign robots to regions every N steps
+    "assignment_switch_cost": 0.1,     # cost of leaving the current region (grid diameter = 1)
+    "assignment_demand_smoothing": 0.5,
+    "assignment_capacity_deadband": 0.25,  # keep capacities while fair shares stay within 0.5 + this
+    "assignment_belief_weight": 0.0,   # weight of fused belief mass next to victim mass in region demand
+    "convergence_tol": None,           # Hellinger distance between consecutive global beliefs (None = off)
+    "convergence_patience": 3,         # fusions below the tolerance before acting
+    "convergence_action": "stop",      # "stop" the run, or "stretch" the fusion interval
+    "max_fusion_interval": 8,          # largest fusion interval in steps for "stretch"
+    "fusion_mode": "hierarchical",     # "hierarchical" (robots -> regions -> global) or decentralized "gossip"
+    "gossip_graph": "range",           # communication graph: "range" or "knn" over robot positions
+    "gossip_radius": 2.0,              # communication range in cells for "range"
+    "gossip_k": 4,                     # neighbors per robot for "knn"
+    "gossip_tol": 1e-3,                # consensus once robots' log-beliefs differ by less than this
+    "gossip_max_rounds": 100,          # round limit per step
+    "seed": 42,
+    "victim_steps": [1, 2, 3, 4, 5],   # steps at which victims appear
+    "victims_per_step": 10,
+    "history_dir": None,               # directory for the on-disk belief history (None = keep in memory)
+    "history_chunk_steps": 256,
+    "history_chunk_bytes": 1 << 26,    # chunk file size limit; wide rows (e.g. every robot) get fewer steps per chunk
+    "history_compress": False,
+    "history_regions": False,          # also record every regional belief
+    "history_robots": False,           # also record every robot belief
+    "instrument": False,               # per-phase timers and counters
+    "instrument_dir": None,            # write metrics.json / metrics.prom (and profile.txt) here; implies instrument
+    "profile_steps": None,             # [start, stop] steps to profile, stop inclusive
+    "profiler": "cprofile",            # "cprofile" or "sampling"
 }
 
-# --- Color Map for Belief Ranges ---
-thresholds = [0.0, 0.2, 0.4, 0.6, 0.8, 1.01]
-colors = ['blue', 'green', 'yellow', 'orange', 'red']
-cmap = mcolors.ListedColormap(colors)
-norm = mcolors.BoundaryNorm(thresholds, cmap.N)
-
-# To store histogram of belief bins at each time step
-belief_bins_history = []
-
-# --- Instantiate Robots ---
-robots = [
-    Robot(
-        robot_id=chr(ord('A') + i),
-        initial_belief=initial_beliefs[i],
-        nominal_belief=nominal_pmf,
-        l_bar=l_bar,
-        victim_grid=victim_grid,
-        region_indices=slice(0, 1),
-        observation_range=OBSERVATION_RANGE
-    )
-    for i in range(NUM_ROBOTS)
-]
-
-# --- Centralizer Setup ---
-fusion_rule = FusionRule()
-centralizer = MainCentralizer(
-    grid_size=GRID_SIZE,
-    num_regions=NUM_REGIONS,
-    num_robots=NUM_ROBOTS,
-    fusion=fusion_rule
-)
-centralizer.assign_robots_to_regions(robots, victim_grid)
-assignments = centralizer.region_assignments
-leaders = centralizer.region_centralizers
-regions = centralizer.divide_grid()
-
-for region_idx, assigned_robots in assignments.items():
-    for robot in assigned_robots:
-        robot.region_indices = regions[region_idx]
-
-# --- Visualize Assignments ---
-G = nx.Graph()
-for region_idx, robots_in_region in assignments.items():
-    leader = leaders[region_idx]
-    for r in robots_in_region:
-        G.add_edge(f"Region {region_idx}", r.id, color='red' if r.id == leader.id else 'blue')
-
-colors = [G[u][v]['color'] for u, v in G.edges()]
-pos = nx.spring_layout(G)
-nx.draw(G, pos, with_labels=True, edge_color=colors, node_size=700)
-plt.title("Robot Assignments to Regions with Leaders")
-plt.show()
-
-# === Simulation Loop ===
-print("\n=== Simulation Loop ===")
-for t in range(1, T + 1):
-    print(f"\n--- Time Step {t} ---")
-
-    if t in victim_schedule:
-        print(f"[{len(victim_schedule[t])} Victims added at t = {t}]")
-        for idx, intensity in victim_schedule[t]:
-            victim_grid.add_victim(index=idx, intensity=intensity)
-            print(f"  → Victim at index {idx} with intensity {round(intensity, 2)}")
-
-    # Intra-robot update
-    for robot in robots:
-        robot.observe_and_bayes_update()
-
-    # Regional fusion
-    region_fused = {}
-    for region_idx, leader in leaders.items():
-        fused = leader.fuse_region_beliefs(assignments[region_idx])
-        region_fused[region_idx] = fused
-
-    # Global fusion
-    global_belief = centralizer.global_fuse(region_fused)
-    centralizer.global_belief_history.append(global_belief)
-
-    # Print full grid
-    belief_reshaped = global_belief.reshape(10, 10)
-    print("\nGlobal Belief Grid (10x10):")
-    print(np.round(belief_reshaped, 3))
-
-    # Belief distribution histogram
-    bin_counts = np.histogram(global_belief, bins=thresholds)[0]
-    belief_bins_history.append(bin_counts)
-
-    # Heatmap
-    plt.figure(figsize=(5, 5))
-    plt.imshow(belief_reshaped, cmap=cmap, norm=norm)
-    plt.colorbar(ticks=[0.1, 0.3, 0.5, 0.7, 0.9], label="Belief")
-    plt.title(f"Global Belief Map at Time {t}")
-    plt.tight_layout()
-    plt.show()
-
-print("\n=== Simulation Complete ===")
-
-# === Plot Stacked Histogram Over Time ===
-belief_bins_history = np.array(belief_bins_history)
-time_steps = np.arange(1, len(belief_bins_history) + 1)
-
-plt.figure(figsize=(10, 6))
-bottom = np.zeros(len(time_steps))
-
-for i, color in enumerate(cmap.colors):
-    plt.bar(time_steps, belief_bins_history[:, i], bottom=bottom, color=color,
-            label=f"{thresholds[i]}–{thresholds[i+1]}")
-    bottom += belief_bins_history[:, i]
-
-plt.xlabel("Time Step")
-plt.ylabel("Number of Grid Cells")
-plt.title("Distribution of Global Belief Values Across Grid Cells")
-plt.legend(title="Belief Range")
-plt.grid(axis='y')
-plt.tight_layout()
-plt.show()
+
+def load_config(path=None, overrides=None):
+    """
+    DEFAULT_CONFIG updated with a JSON config file and then with overrides.
+    """
+    config = dict(DEFAULT_CONFIG)
+    if path is not None:
+        with open(path) as f:
+            loaded = json.load(f)
+        unknown = set(loaded) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown config keys: {sorted(unknown)}")
+        config.update(loaded)
+    config.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    return config
+
+
+def robot_name(i):
+    return chr(ord('A') + i) if i < 26 else f"R{i}"
+
+
+class Simulation:
+    def __init__(self, config):
+        """
+        Builds the grid, victims, robots and centralizer described by config.
+        """
+        self.config = config
+        c = config
+        if c["instrument"] or c["instrument_dir"] or c["profile_steps"]:
+            self.instrumentation = Instrumentation(c["profile_steps"], c["profiler"])
+        else:
+            self.instrumentation = NullInstrumentation()
+        self.grid = TiledGrid(c["grid_height"], c["grid_width"], c["tile_height"], c["tile_width"])
+        grid_size = self.grid.size
+        num_regions = self.grid.num_tiles
+
+        # --- Initial Beliefs and Nominal PMF ---
+        np.random.seed(c["seed"])
+        self.nominal_pmf = np.full(grid_size, 0.5)
+        self.nominal_pmf.setflags(write=False)  # one read-only prior shared by every robot
+
+        # --- Storage Precision (beliefs, victim grid and every fused array) ---
+        self.precision = Precision(c["precision"], c["precision_logodds_limit"])
+        if self.precision.quantized and c["belief_representation"] != "logodds":
+            raise ValueError(f"precision {c['precision']!r} requires belief_representation 'logodds'")
+
+        # --- Victim Grid ---
+        self.victim_grid = VictimGrid(size=grid_size, layout=self.grid, precision=self.precision)
+
+        # --- Victim Schedule (Many Victims) ---
+        self.victim_schedule = {
+            t: [(i, np.random.uniform(0.2, 0.9))
+                for i in np.random.choice(grid_size, c["victims_per_step"], replace=False)]
+            for t in c["victim_steps"]
+        }
+
+        # --- Fusion Rule (the same rule whatever the belief representation) ---
+        fusion = FusionRule(precision=self.precision, rule=c["fusion_rule"])
+
+        # --- Fleet Belief Store (one contiguous block for all robot beliefs) ---
+        # Sparse robots store only their observed cells, so they do not use the dense store
+        representation = c["belief_representation"]
+        belief_store = None
+        self.parallel = None
+        if c["parallel_workers"] > 0 and representation != "sparse":
+            self.parallel = ParallelRegionFusion(c["num_robots"], grid_size, num_regions,
+                                                 num_workers=c["parallel_workers"],
+                                                 representation=representation, initial_value=0.5,
+                                                 precision=self.precision, fusion_rule=fusion.rule)
+            belief_store = self.parallel.store
+        elif representation != "sparse":
+            belief_store = FleetBeliefStore(c["num_robots"], grid_size, initial_value=0.5,
+                                            representation=representation, precision=self.precision)
+
+        # --- Sensor Model (shared, batched Bayes update kernel) ---
+        self.sensor_model = BayesUpdate(c["p_z_given_h"], c["p_z_given_not_h"])
+
+        # --- Instantiate Robots (sharing the components owned by this simulation) ---
+        self.components = FleetComponents()
+        self.robots = [
+            Robot(
+                robot_id=robot_name(i),
+                initial_belief=None,
+                nominal_belief=self.nominal_pmf,
+                l_bar=c["l_bar"],
+                victim_grid=self.victim_grid,
+                region_indices=slice(0, 1),
+                observation_range=c["observation_range"],
+                belief_store=belief_store,
+                store_index=i,
+                sensor_model=self.sensor_model,
+                representation=representation,
+                grid=self.grid,
+                update_on_change_only=c["update_on_change_only"],
+                precision=self.precision,
+                fusion_rule=fusion.rule,
+                components=self.components
+            )
+            for i in range(c["num_robots"])
+        ]
+
+        # --- Belief History (memory-mapped chunks on disk when history_dir is set) ---
+        self.history = None
+        global_history, self.region_history, self.robot_history = None, None, None
+        self.belief_bins_history = []  # To store histogram of belief bins at each time step
+        self._default_histogram = {}   # SparseBelief.histogram cache of the nominal's bin counts
+        if c["history_dir"]:
+            self.history = HistoryStore(c["history_dir"], c["history_chunk_steps"], c["history_compress"],
+                                        c["history_chunk_bytes"])
+            dtype = self.precision.float_dtype
+            global_history = self.history.writer("global", (grid_size,), dtype=dtype)
+            self.belief_bins_history = self.history.writer("belief_bins", (len(THRESHOLDS) - 1,), dtype=np.int64)
+            if c["history_regions"]:
+                self.region_history = self.history.writer("regions", (num_regions, grid_size), dtype=dtype)
+            if c["history_robots"]:
+                self.robot_history = self.history.writer("robots", (c["num_robots"], grid_size), dtype=dtype)
+
+        # --- Centralizer Setup ---
+        self.centralizer = MainCentralizer(
+            grid_size=grid_size,
+            num_regions=num_regions,
+            num_robots=c["num_robots"],
+            fusion=fusion,
+            weighting=c["fusion_weighting"],
+            grid=self.grid,
+            incremental=c["incremental_fusion"],
+            parallel=self.parallel,
+            history=global_history,
+            instrumentation=self.instrumentation,
+            assignment=AssignmentSolver(self.grid.tile_slices, self.grid,
+                                        switch_cost=c["assignment_switch_cost"],
+                                        demand_smoothing=c["assignment_demand_smoothing"],
+                                        belief_weight=c["assignment_belief_weight"],
+                                        capacity_deadband=c["assignment_capacity_deadband"]),
+            reassign_interval=c["reassign_interval"],
+            uplink=self.make_uplink()
+        )
+        self.centralizer.assign_robots_to_regions(self.robots, self.victim_grid)
+
+        # --- Convergence Monitor (stops the run or stretches the fusion interval once settled) ---
+        self.convergence = None
+        if c["convergence_tol"] is not None:
+            self.convergence = ConvergenceMonitor(c["convergence_tol"], c["convergence_patience"],
+                                                  action=c["convergence_action"],
+                                                  max_interval=c["max_fusion_interval"])
+        self._last_fusion = ({}, self.centralizer.global_belief)
+
+        # --- Gossip Consensus (decentralized baseline replacing the centralizer's fusion) ---
+        self.gossip = None
+        if c["fusion_mode"] == "gossip":
+            if representation == "sparse":
+                raise ValueError("fusion_mode 'gossip' requires dense beliefs")
+            self.gossip = GossipConsensus(c["gossip_graph"], c["gossip_radius"], c["gossip_k"],
+                                          c["gossip_tol"], c["gossip_max_rounds"], fusion=fusion)
+        elif c["fusion_mode"] != "hierarchical":
+            raise ValueError(f"Unknown fusion_mode: {c['fusion_mode']}")
+
+    def make_uplink(self):
+        """
+        DeltaUplink for the robots when config["delta_uploads"] is set, else None.
+        """
+        c = self.config
+        if not c["delta_uploads"]:
+            return None
+        if c["belief_representation"] == "sparse" or self.parallel is not None:
+            raise ValueError("delta_uploads requires dense beliefs and parallel_workers = 0")
+        return DeltaUplink(self.robots, c["uplink_precision"])
+
+    def robot_positions(self):
+        """
+        (num_robots, 2) center of every robot's current region.
+        """
+        return np.array([self.centralizer.assignment.position_of(r.region_indices) for r in self.robots])
+
+    def step(self, t, verbose=False):
+        instrumentation = self.instrumentation
+        if t in self.victim_schedule:
+            if verbose:
+                print(f"[{len(self.victim_schedule[t])} Victims added at t = {t}]")
+                for idx, intensity in self.victim_schedule[t]:
+                    print(f"  → Victim at index {idx} with intensity {round(intensity, 2)}")
+            indices, intensities = zip(*self.victim_schedule[t])
+            self.victim_grid.add_victims(indices, intensities)
+            if self.convergence is not None:
+                self.convergence.reset()  # new information: fuse on time again
+
+        # Robots move between regions when a reassignment is due
+        self.centralizer.time = t
+        self.centralizer.reassign_if_due(self.victim_grid)
+
+        # Intra-robot update (all observation windows in one batched call)
+        with instrumentation.phase("observe"):
+            cells_updated = self.sensor_model.update_robots(self.robots, current_time=t)
+        instrumentation.count("cells_updated", cells_updated)
+
+        # Gossip mode: robots average beliefs with their neighbors until consensus
+        if self.gossip is not None:
+            with instrumentation.phase("gossip"):
+                rounds = self.gossip.step(self.robots, self.robot_positions())
+            instrumentation.count("gossip_rounds", rounds)
+            if verbose:
+                state = "consensus" if self.gossip.converged_history[-1] else "no consensus"
+                print(f"[Gossip: {rounds} rounds, {state}, {self.gossip.num_components} component(s)]")
+            region_beliefs, global_belief = {}, self.gossip.global_belief
+            self.centralizer.global_belief = global_belief
+        # Regional and global fusion (robots -> regions -> global, one pass per level),
+        # skipped while the convergence monitor has stretched the fusion interval
+        elif self.convergence is None or self.convergence.fusion_due(t):
+            region_beliefs, global_belief = self.centralizer.fuse_all()
+            if self.convergence is not None:
+                self.convergence.update(t, global_belief)
+            self._last_fusion = (region_beliefs, global_belief)
+        else:
+            region_beliefs, global_belief = self._last_fusion
+            instrumentation.count("fusions_skipped")
+        with instrumentation.phase("history"):
+            history = self.centralizer.global_belief_history
+            # Incremental fusion updates the global belief in place; the in-memory history keeps copies
+            history.append(global_belief.copy() if isinstance(history, list) and isinstance(global_belief, np.ndarray)
+                           and self.centralizer.incremental else global_belief)
+            if self.region_history is not None:
+                regional = np.full((self.grid.num_tiles, self.grid.size), np.nan)
+                for region_idx, belief in region_beliefs.items():
+                    regional[region_idx] = belief.to_dense() if hasattr(belief, "to_dense") else belief
+                self.region_history.append(regional)
+            if self.robot_history is not None:
+                self.robot_history.append(stack_beliefs(self.robots))
+
+            # Belief distribution histogram
+            if hasattr(global_belief, "histogram"):
+                self.belief_bins_history.append(global_belief.histogram(THRESHOLDS, self._default_histogram))
+            else:
+                self.belief_bins_history.append(np.histogram(global_belief, bins=THRESHOLDS)[0])
+        return global_belief
+
+    def run(self, interactive=False, renderer=None, verbose=False):
+        """
+        Runs config["steps"] steps.
+        :param interactive: show every plot in a blocking GUI window (original behaviour)
+        :param renderer: optional BackgroundRenderer writing frames to files instead
+        :param verbose: print the victims and the global belief grid every step
+        """
+        import rendering
+
+        if interactive:
+            rendering.render_assignments(self.centralizer.region_assignments, self.centralizer.region_centralizers)
+        elif renderer is not None:
+            renderer.assignments(self.centralizer.region_assignments, self.centralizer.region_centralizers)
+
+        # === Simulation Loop ===
+        if verbose:
+            print("\n=== Simulation Loop ===")
+        try:
+            for t in range(1, self.config["steps"] + 1):
+                if verbose:
+                    print(f"\n--- Time Step {t} ---")
+                self.instrumentation.begin_step(t)
+                global_belief = self.step(t, verbose)
+
+                # A sparse global belief is densified only here, for display
+                if verbose or interactive or renderer is not None:
+                    if hasattr(global_belief, "to_dense"):
+                        global_belief = global_belief.to_dense()
+                    belief_image = self.grid.to_image(global_belief)
+                if verbose:
+                    print(f"\nGlobal Belief Grid ({self.grid.height}x{self.grid.width}):")
+                    print(np.round(belief_image, 3))
+
+                # Heatmap
+                with self.instrumentation.phase("render"):
+                    if interactive:
+                        rendering.render_heatmap(belief_image, t)
+                    elif renderer is not None:
+                        renderer.frame(t, belief_image)
+                self.instrumentation.end_step()
+                if self.convergence is not None and self.convergence.stop:
+                    if verbose:
+                        print(f"\nGlobal belief converged at step {self.convergence.converged_at}; stopping")
+                    break
+        finally:
+            self.instrumentation.close()
+            self.write_metrics(verbose)
+            if self.parallel is not None:
+                self.parallel.close()
+            if self.history is not None:
+                self.history.close()
+
+        if verbose:
+            print("\n=== Simulation Complete ===")
+
+        # === Plot Stacked Histogram Over Time ===
+        bins = self.belief_bins_history
+        if self.history is not None and (interactive or renderer is not None):
+            bins = self.history.reader("belief_bins")[:]
+        if interactive:
+            rendering.render_histogram(bins)
+        elif renderer is not None:
+            renderer.histogram(bins)
+        return self.centralizer.global_belief_history
+
+    def write_metrics(self, verbose=False):
+        """
+        Writes metrics.json, metrics.prom and (when profiled) profile.txt to
+        config["instrument_dir"]; prints the phase summary when verbose.
+        """
+        if not self.instrumentation.enabled:
+            return
+        if verbose:
+            print("\n=== Instrumentation ===")
+            print(self.instrumentation.summary())
+        out_dir = self.config["instrument_dir"]
+        if not out_dir:
+            return
+        os.makedirs(out_dir, exist_ok=True)
+        self.instrumentation.write_json(os.path.join(out_dir, "metrics.json"))
+        self.instrumentation.write_prometheus(os.path.join(out_dir, "metrics.prom"))
+        if self.instrumentation.profile is not None:
+            self.instrumentation.write_profile(os.path.join(out_dir, "profile.txt"))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Semi-decentralized multi-robot belief merging simulation")
+    parser.add_argument("--config", help="JSON file overriding DEFAULT_CONFIG entries")
+    parser.add_argument("--headless", action="store_true",
+                        help="never open GUI windows; plots are skipped unless --render-dir is given")
+    parser.add_argument("--render-dir", help="headless: write heatmaps and the belief-bin histogram here")
+    parser.add_argument("--render-stride", type=int, default=1, help="headless: render every N-th step")
+    parser.add_argument("--steps", type=int, help="override the number of steps")
+    parser.add_argument("--robots", type=int, dest="num_robots", help="override the number of robots")
+    parser.add_argument("--seed", type=int, help="override the random seed")
+    parser.add_argument("--precision", choices=PRECISIONS, help="belief storage precision")
+    parser.add_argument("--convergence-tol", type=float,
+                        help="act once consecutive global beliefs are this close (Hellinger distance)")
+    parser.add_argument("--convergence-action", choices=CONVERGENCE_ACTIONS,
+                        help="stop the run, or stretch the fusion interval, once converged")
+    parser.add_argument("--fusion-rule", choices=FUSION_RULES, help="Chernoff fusion rule")
+    parser.add_argument("--fusion-mode", choices=["hierarchical", "gossip"],
+                        help="hierarchical fusion, or decentralized gossip consensus")
+    parser.add_argument("--gossip-graph", choices=GRAPHS, help="gossip communication graph")
+    parser.add_argument("--history-dir", help="record the belief history to memory-mapped chunks in this directory")
+    parser.add_argument("--instrument-dir", help="record per-phase timers and counters and write them here")
+    parser.add_argument("--profile-steps", type=int, nargs=2, metavar=("START", "STOP"),
+                        help="profile steps START..STOP (inclusive)")
+    parser.add_argument("--profiler", choices=["cprofile", "sampling"], help="profiler for --profile-steps")
+    parser.add_argument("--verbose", action="store_true", help="print the global grid every step (default unless headless)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = load_config(args.config, {"steps": args.steps, "num_robots": args.num_robots, "seed": args.seed,
+                                       "precision": args.precision, "convergence_tol": args.convergence_tol,
+                                       "convergence_action": args.convergence_action,
+                                       "fusion_rule": args.fusion_rule, "fusion_mode": args.fusion_mode, "gossip_graph": args.gossip_graph,
+                                       "history_dir": args.history_dir, "instrument_dir": args.instrument_dir,
+                                       "profile_steps": args.profile_steps, "profiler": args.profiler})
+    simulation = Simulation(config)
+
+    if not args.headless:
+        simulation.run(interactive=True, verbose=True)
+        return simulation
+
+    renderer = None
+    if args.render_dir:
+        from rendering import BackgroundRenderer
+        renderer = BackgroundRenderer(args.render_dir, args.render_stride)
+    try:
+        simulation.run(renderer=renderer, verbose=args.verbose)
+    finally:
+        if renderer is not None:
+            renderer.close()
+    return simulation
+
+
+if __name__ == "__main__":
+    main()
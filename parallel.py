@@ -0,0 +1,167 @@
+import os
+import numpy as np
+from belief_core.belief import FleetBeliefStore
+from belief_core.fusion import FusionRule
+from belief_core.precision import get_precision
+
+# Shared arrays attached once per worker process by _attach_worker
+_WORKER_ARRAYS = {}
+
+
+class SharedArray:
+    def __init__(self, shape, name=None, dtype=np.float64):
+        """
+        numpy array living in a multiprocessing.shared_memory block.
+
+        :param shape: array shape
+        :param name: name of an existing block to attach to; a new block is created if None
+        :param dtype: element dtype
+        """
+        from multiprocessing import shared_memory  # loaded on first use, keeps plain imports light
+
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=nbytes if self.owner else 0)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.array = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # views still exported (e.g. robot beliefs); the mapping goes away with them
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach_worker(specs):
+    for key, (name, shape, dtype) in specs.items():
+        shared = SharedArray(shape, name=name, dtype=dtype)
+        _WORKER_ARRAYS[key] = shared
+
+
+def _fuse_regions_task(tasks, representation, precision, rule):
+    """
+    Worker: fuse a batch of regions straight out of and into shared memory.
+    :param tasks: list of (region_row, robot_rows, weights or None)
+    :param precision: Precision of the belief block
+    :param rule: fusion rule name (see fusion.FUSION_RULES)
+    """
+    fusion = FusionRule(precision=precision, rule=rule)
+    beliefs = _WORKER_ARRAYS["beliefs"].array
+    region_logs = _WORKER_ARRAYS["region_logs"].array
+    regional = _WORKER_ARRAYS["regional"].array
+    for k, rows, weights in tasks:
+        native = precision.decode(beliefs[rows])
+        logs = fusion.to_log(native, representation)
+        if weights is None:
+            region_logs[k] = np.mean(logs, axis=0)
+        else:
+            region_logs[k] = (weights / (np.sum(weights) + 1e-10)).astype(logs.dtype) @ logs
+        regional[k] = fusion.to_prob(region_logs[k])
+    return len(tasks)
+
+
+class ParallelRegionFusion:
+    def __init__(self, num_robots, grid_size, num_regions, num_workers=None, representation="prob",
+                 initial_value=0.5, precision=None, fusion_rule="geometric"):
+        """
+        Runs regional centralizers in worker processes over shared-memory buffers.
+
+        Robot beliefs live in a shared (num_robots, grid_size) block exposed as
+        self.store (a FleetBeliefStore). Workers read it and write fused
+        regional beliefs into shared (num_regions, grid_size) buffers, so no
+        belief is ever pickled; only row indices and weights cross processes.
+        The main process does the global merge after all workers finish.
+
+        :param num_robots: number of robots (rows of the belief block)
+        :param grid_size: number of cells per belief
+        :param num_regions: maximum number of regions fused per step
+        :param num_workers: worker processes (os.cpu_count() if None)
+        :param representation: "prob" or "logodds"
+        :param initial_value: initial belief (probability) of every cell
+        :param precision: storage precision of the belief block; fused buffers use its float dtype
+        :param fusion_rule: fusion rule name (see fusion.FUSION_RULES)
+        """
+        self.representation = representation
+        self.num_workers = num_workers if num_workers is not None else (os.cpu_count() or 1)
+        self.precision = get_precision(precision)
+        self.fusion = FusionRule(precision=self.precision, rule=fusion_rule)
+        dtype = self.precision.float_dtype
+        self._beliefs = SharedArray((num_robots, grid_size), dtype=self.precision.dtype)
+        self._region_logs = SharedArray((num_regions, grid_size), dtype=dtype)
+        self._regional = SharedArray((num_regions, grid_size), dtype=dtype)
+        self.store = FleetBeliefStore(num_robots, grid_size, initial_value, representation,
+                                      buffer=self._beliefs.shm.buf, precision=self.precision)
+
+        specs = {key: (arr.name, arr.shape, arr.dtype.str) for key, arr in
+                 (("beliefs", self._beliefs), ("region_logs", self._region_logs), ("regional", self._regional))}
+        from concurrent.futures import ProcessPoolExecutor
+        self.pool = ProcessPoolExecutor(max_workers=self.num_workers, initializer=_attach_worker, initargs=(specs,))
+
+    def fuse(self, region_rows, weights=None, region_weights=None):
+        """
+        Fuse all regions in parallel, then merge them globally.
+        :param region_rows: list of store row-index arrays, one per region
+        :param weights: optional per-row weights of the whole store (normalized per region)
+        :param region_weights: optional weights of the regions in the global merge; uniform if None
+        :return: ((num_regions, grid_size) regional beliefs, global belief vector)
+        """
+        regional = self.fuse_regions(region_rows, weights)
+        return regional, self.fuse_global(len(region_rows), region_weights)
+
+    def fuse_regions(self, region_rows, weights=None):
+        """
+        Fuse all regions in the worker processes and wait for every one of them.
+        The result is copied out of the shared buffer, which the next call
+        overwrites, so it can be kept (e.g. by the history writer).
+        :param region_rows: list of store row-index arrays, one per region
+        :param weights: optional per-row weights of the whole store (normalized per region)
+        :return: (num_regions, grid_size) regional beliefs
+        """
+        num_regions = len(region_rows)
+        tasks = [(k, np.asarray(rows, dtype=np.intp), None if weights is None else np.asarray(weights)[rows])
+                 for k, rows in enumerate(region_rows)]
+        num_chunks = min(num_regions, self.num_workers)
+        futures = [self.pool.submit(_fuse_regions_task, tasks[i::num_chunks], self.representation, self.precision,
+                                   self.fusion.rule)
+                   for i in range(num_chunks)]
+        # Barrier: every regional centralizer must finish before the global merge
+        from concurrent.futures import wait
+        wait(futures)
+        for f in futures:
+            f.result()
+        return self._regional.array[:num_regions].copy()
+
+    def fuse_global(self, num_regions, region_weights=None):
+        """
+        Global merge, in the main process, of the regional log-beliefs the last
+        fuse_regions call left in shared memory.
+        :param num_regions: number of regions fused by that call
+        :param region_weights: optional weights of the regions; uniform if None
+        :return: global belief vector
+        """
+        region_logs = self._region_logs.array[:num_regions]
+        if region_weights is None:
+            global_logs = np.mean(region_logs, axis=0)
+        else:
+            global_logs = np.asarray(region_weights, dtype=region_logs.dtype) @ region_logs
+        return self.fusion.to_prob(global_logs)
+
+    def close(self):
+        self.pool.shutdown()
+        self.store = None
+        for shared in (self._beliefs, self._region_logs, self._regional):
+            shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,80 @@
+import argparse
+import json
+import numpy as np
+# The precision types live in belief_core; they are re-exported here next to the report
+from belief_core.precision import DEFAULT_LOGODDS_LIMITS, FLOAT64, PRECISIONS, Precision, get_precision
+
+
+def accuracy_report(config, modes=PRECISIONS, threshold=0.5):
+    """
+    Runs the same simulation once per precision and compares the final global
+    belief with the float64 run. Quantized modes store log-odds, so they run
+    with the "logodds" representation whatever the config says, and are
+    compared with a float64 run in that representation.
+    :param config: simulation config (see main.DEFAULT_CONFIG)
+    :param modes: precisions to compare
+    :param threshold: probability at which a cell counts as a detection
+    :return: {mode: dict of error metrics and belief bytes per robot}
+    """
+    from main import Simulation
+
+    def representation(mode):
+        return "logodds" if get_precision(mode).quantized else config["belief_representation"]
+
+    def final_belief(mode, belief_representation):
+        c = dict(config, precision=mode, belief_representation=belief_representation)
+        simulation = Simulation(c)
+        try:
+            for t in range(1, c["steps"] + 1):
+                simulation.step(t)
+        finally:
+            if simulation.parallel is not None:
+                simulation.parallel.close()
+            if simulation.history is not None:
+                simulation.history.close()
+        return np.asarray(simulation.centralizer.global_belief, dtype=np.float64)
+
+    references = {}  # representation -> final belief of the float64 run
+    report = {}
+    for mode in modes:
+        rep = representation(mode)
+        if rep not in references:
+            references[rep] = final_belief("float64", rep)
+        reference = references[rep]
+        belief = reference if mode == "float64" else final_belief(mode, rep)
+        error = np.abs(belief - reference)
+        report[mode] = {
+            "representation": rep,
+            "max_abs_error": float(np.max(error)),
+            "mean_abs_error": float(np.mean(error)),
+            "decision_flips": int(np.sum((belief > threshold) != (reference > threshold))),
+            "bytes_per_robot": len(reference) * get_precision(mode).bytes_per_cell,
+        }
+    return report
+
+
+def main(argv=None):
+    from main import load_config
+
+    parser = argparse.ArgumentParser(description="Accuracy of each belief precision against float64")
+    parser.add_argument("--config", help="JSON file overriding DEFAULT_CONFIG entries")
+    parser.add_argument("--steps", type=int, help="override the number of steps")
+    parser.add_argument("--robots", type=int, dest="num_robots", help="override the number of robots")
+    parser.add_argument("--modes", nargs="+", choices=PRECISIONS, default=list(PRECISIONS))
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config, {"steps": args.steps, "num_robots": args.num_robots})
+    report = accuracy_report(config, args.modes)
+    print(f"{'precision':10s} {'repr':8s} {'max |err|':>12s} {'mean |err|':>12s} {'flips':>7s} {'bytes/robot':>12s}")
+    for mode, row in report.items():
+        print(f"{mode:10s} {row['representation']:8s} {row['max_abs_error']:12.3e} {row['mean_abs_error']:12.3e} "
+              f"{row['decision_flips']:7d} {row['bytes_per_robot']:12d}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import os
+import numpy as np
+
+# --- Color Map for Belief Ranges ---
+THRESHOLDS = [0.0, 0.2, 0.4, 0.6, 0.8, 1.01]
+COLORS = ['blue', 'green', 'yellow', 'orange', 'red']
+
+
+def _colormap():
+    import matplotlib.colors as mcolors
+    cmap = mcolors.ListedColormap(COLORS)
+    norm = mcolors.BoundaryNorm(THRESHOLDS, cmap.N)
+    return cmap, norm
+
+
+def _new_figure(figsize, path):
+    """
+    pyplot figure for interactive display, or a standalone Agg figure when
+    writing to a file (no GUI backend, safe in a worker process).
+    """
+    if path is None:
+        import matplotlib.pyplot as plt
+        return plt.figure(figsize=figsize)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _finish(fig, path):
+    fig.tight_layout()
+    if path is None:
+        import matplotlib.pyplot as plt
+        plt.show()
+    else:
+        fig.savefig(path)
+
+
+def render_heatmap(image, t, path=None):
+    """
+    Global belief heatmap at time t; shown interactively, or saved to path.
+    """
+    cmap, norm = _colormap()
+    fig = _new_figure((5, 5), path)
+    ax = fig.add_subplot(1, 1, 1)
+    im = ax.imshow(image, cmap=cmap, norm=norm)
+    fig.colorbar(im, ax=ax, ticks=[0.1, 0.3, 0.5, 0.7, 0.9], label="Belief")
+    ax.set_title(f"Global Belief Map at Time {t}")
+    _finish(fig, path)
+
+
+def render_histogram(belief_bins_history, path=None, time_steps=None):
+    """
+    Stacked histogram of global belief bins over time.
+    """
+    cmap, _ = _colormap()
+    belief_bins_history = np.asarray(belief_bins_history)
+    if time_steps is None:
+        time_steps = np.arange(1, len(belief_bins_history) + 1)
+
+    fig = _new_figure((10, 6), path)
+    ax = fig.add_subplot(1, 1, 1)
+    bottom = np.zeros(len(time_steps))
+    for i, color in enumerate(cmap.colors):
+        ax.bar(time_steps, belief_bins_history[:, i], bottom=bottom, color=color,
+               label=f"{THRESHOLDS[i]}–{THRESHOLDS[i+1]}")
+        bottom += belief_bins_history[:, i]
+
+    ax.set_xlabel("Time Step")
+    ax.set_ylabel("Number of Grid Cells")
+    ax.set_title("Distribution of Global Belief Values Across Grid Cells")
+    ax.legend(title="Belief Range")
+    ax.grid(axis='y')
+    _finish(fig, path)
+
+
+def render_assignments(assignments, leaders, path=None):
+    """
+    Graph of robot-to-region assignments, leaders highlighted in red.
+    """
+    import networkx as nx
+
+    G = nx.Graph()
+    for region_idx, robots_in_region in assignments.items():
+        leader = leaders[region_idx]
+        for r in robots_in_region:
+            G.add_edge(f"Region {region_idx}", r.id, color='red' if r.id == leader.id else 'blue')
+
+    colors = [G[u][v]['color'] for u, v in G.edges()]
+    pos = nx.spring_layout(G)
+    fig = _new_figure((8, 6), path)
+    ax = fig.add_subplot(1, 1, 1)
+    nx.draw(G, pos, ax=ax, with_labels=True, edge_color=colors, node_size=700)
+    ax.set_title("Robot Assignments to Regions with Leaders")
+    _finish(fig, path)
+
+
+class _RobotRef:
+    def __init__(self, robot_id):
+        self.id = robot_id
+
+
+class BackgroundRenderer:
+    def __init__(self, out_dir, stride=1):
+        """
+        Renders frames to files in a background worker process so plotting never
+        blocks the simulation loop.
+
+        :param out_dir: directory receiving the PNG files
+        :param stride: render one heatmap every `stride` steps
+        """
+        self.out_dir = out_dir
+        self.stride = max(1, int(stride))
+        os.makedirs(out_dir, exist_ok=True)
+        from concurrent.futures import ProcessPoolExecutor
+        self.pool = ProcessPoolExecutor(max_workers=1)
+        self.futures = []
+
+    def _submit(self, fn, *args):
+        for f in self.futures:
+            if f.done():
+                f.result()  # surface rendering errors
+        self.futures = [f for f in self.futures if not f.done()]
+        self.futures.append(self.pool.submit(fn, *args))
+
+    def frame(self, t, image):
+        if t % self.stride == 0:
+            self._submit(render_heatmap, np.array(image), t, os.path.join(self.out_dir, f"belief_{t:06d}.png"))
+
+    def histogram(self, belief_bins_history, time_steps=None):
+        self._submit(render_histogram, np.array(belief_bins_history),
+                     os.path.join(self.out_dir, "belief_bins.png"), time_steps)
+
+    def assignments(self, assignments, leaders):
+        # Only ids are sent to the worker, not the robots themselves
+        ids = {k: [_RobotRef(r.id) for r in v] for k, v in assignments.items()}
+        heads = {k: _RobotRef(v.id) for k, v in leaders.items()}
+        self._submit(render_assignments, ids, heads, os.path.join(self.out_dir, "assignments.png"))
+
+    def close(self):
+        for f in self.futures:
+            f.result()
+        self.pool.shutdown()
@@ -0,0 +1,337 @@
+import asyncio
+import numpy as np
+from belief_core.belief import SparseBelief, logodds_to_prob
+from belief_core.fusion_engine import FusionEngine
+from delta import DeltaEncoder, MirrorStore
+
+
+class BeliefMessage:
+    __slots__ = ("sender", "time", "sent_at", "origin_sent_at", "belief")
+
+    def __init__(self, sender, time, sent_at, belief, origin_sent_at=None):
+        """
+        Belief sent up the hierarchy.
+
+        :param sender: robot id or region index
+        :param time: simulation step at which the belief was produced
+        :param sent_at: event-loop time at which it was sent
+        :param belief: the sender's belief in its representation, owned by the
+                       message: np.array of probabilities or log-odds, a
+                       SparseBelief, or a delta.BeliefDelta when robots upload deltas
+        :param origin_sent_at: earliest send time of the robot messages that arrived
+                               since the previous fused belief of the same sender
+        """
+        self.sender = sender
+        self.time = time
+        self.sent_at = sent_at
+        self.origin_sent_at = sent_at if origin_sent_at is None else origin_sent_at
+        self.belief = belief
+
+
+class Link:
+    def __init__(self, capacity=64, latency=0.0, jitter=0.0, drop_prob=0.0, rng=None, stats=None):
+        """
+        Bounded, lossy, delayed one-way channel between two agents.
+
+        At most `capacity` messages can be in flight or waiting to be read;
+        send() blocks beyond that (backpressure). self.in_flight counts the
+        messages handed to send() that are neither dropped nor read yet.
+
+        :param capacity: in-flight plus queued message limit
+        :param latency: base delivery delay in seconds
+        :param jitter: extra uniform random delay in [0, jitter] seconds
+        :param drop_prob: probability that a message is silently lost
+        :param rng: np.random.Generator used for drops and jitter
+        :param stats: RuntimeStats collecting counters
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_prob = drop_prob
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.stats = stats if stats is not None else RuntimeStats()
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(capacity)
+        self._pending = set()
+        self.in_flight = 0
+
+    async def send(self, message):
+        self.in_flight += 1
+        await self._slots.acquire()
+        self.stats.sent += 1
+        if self.drop_prob > 0 and self.rng.random() < self.drop_prob:
+            self.stats.dropped += 1
+            self.in_flight -= 1
+            self._slots.release()
+            return
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+        if delay <= 0:
+            self._queue.put_nowait(message)
+            return
+        task = asyncio.get_running_loop().create_task(self._deliver(message, delay))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _deliver(self, message, delay):
+        await asyncio.sleep(delay)
+        self._queue.put_nowait(message)
+
+    def drain(self):
+        """
+        Returns every message that has arrived so far, without waiting.
+        """
+        messages = []
+        while not self._queue.empty():
+            messages.append(self._queue.get_nowait())
+            self._slots.release()
+        self.in_flight -= len(messages)
+        self.stats.delivered += len(messages)
+        return messages
+
+
+class RuntimeStats:
+    def __init__(self):
+        self.sent = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.regional_fusions = 0
+        self.global_fusions = 0
+        self.beliefs_fused = 0
+        self.latencies = []  # robot send -> global fusion, seconds
+        self.wall_time = 0.0
+        self.uplink_bytes = 0         # robot -> region payload bytes sent
+        self.uplink_full_bytes = 0    # the same uploads as whole float64 beliefs
+        self.snapshot_requests = 0    # gaps seen by regional mirrors (lost or reordered deltas)
+
+    def summary(self):
+        latencies = np.asarray(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "delivered": self.delivered,
+            "regional_fusions": self.regional_fusions,
+            "global_fusions": self.global_fusions,
+            "beliefs_fused": self.beliefs_fused,
+            "fusion_throughput": self.beliefs_fused / self.wall_time if self.wall_time > 0 else 0.0,
+            "latency_mean": float(np.mean(latencies)),
+            "latency_p95": float(np.percentile(latencies, 95)),
+            "latency_max": float(np.max(latencies)),
+            "wall_time": self.wall_time,
+            "uplink_bytes": self.uplink_bytes,
+            "uplink_full_bytes": self.uplink_full_bytes,
+            "snapshot_requests": self.snapshot_requests,
+        }
+
+
+class HierarchyRuntime:
+    def __init__(self, centralizer, victim_grid, steps, step_interval=0.01, fusion_interval=None,
+                 latency=0.0, jitter=0.0, drop_prob=0.0, capacity=64, seed=None, victim_schedule=None,
+                 delta_uploads=False, uplink_precision="int16"):
+        """
+        Asyncio message-passing runtime: every robot, regional centralizer and the
+        main centralizer is a task, connected robot -> region -> main by Links.
+
+        Whenever new robot beliefs have arrived, a regional centralizer fuses the
+        latest belief of each of its robots. With the centralizer's "uniform"
+        weighting every robot counts the same; otherwise they are weighted with
+        FusionRule omega weights whose time term uses the step at which each
+        belief was produced, so stale beliefs count less. Fusion rounds with
+        nothing new send nothing, and latencies are measured from the newly
+        arrived messages only. Beliefs travel and are fused in the robots'
+        representation, as in the centralizer; the global belief is stored on
+        the centralizer the way its own fusion stores it.
+
+        :param centralizer: MainCentralizer with robots already assigned to regions
+        :param victim_grid: VictimGrid observed by the robots
+        :param steps: number of simulation steps each robot runs
+        :param step_interval: seconds of event-loop time per simulation step
+        :param fusion_interval: seconds between fusions (defaults to step_interval)
+        :param latency, jitter, drop_prob, capacity: Link parameters for every link
+        :param seed: seed for the links' drop/jitter random generator
+        :param victim_schedule: optional {step: [(index, intensity), ...]}
+        :param delta_uploads: robots send only the cells changed since their previous
+                              message (delta.BeliefDelta); each regional centralizer
+                              applies them to its mirrors of its robots' beliefs. A
+                              mirror that sees a gap asks the robot for a full snapshot;
+                              that request is not sent over a Link.
+        :param uplink_precision: wire precision of the uploaded log-odds
+        """
+        self.centralizer = centralizer
+        self.victim_grid = victim_grid
+        self.steps = steps
+        self.step_interval = step_interval
+        self.fusion_interval = fusion_interval if fusion_interval is not None else step_interval
+        self.link_args = dict(capacity=capacity, latency=latency, jitter=jitter, drop_prob=drop_prob)
+        self.rng = np.random.default_rng(seed)
+        self.victim_schedule = victim_schedule or {}
+        self.stats = RuntimeStats()
+        self.engine = FusionEngine(centralizer.fusion)
+        self.delta_uploads = delta_uploads
+        self.uplink_precision = uplink_precision
+        self.encoders = {}  # robot id -> DeltaEncoder
+        self._start = 0.0
+        self._done = None
+
+    def _link(self):
+        return Link(rng=self.rng, stats=self.stats, **self.link_args)
+
+    def now_step(self):
+        """
+        Current simulation time in steps, derived from the event-loop clock.
+        """
+        return (asyncio.get_running_loop().time() - self._start) / self.step_interval
+
+    async def _world(self):
+        for t in range(1, self.steps + 1):
+            if self.victim_schedule.get(t):
+                indices, intensities = zip(*self.victim_schedule[t])
+                self.victim_grid.add_victims(indices, intensities)
+            await asyncio.sleep(self.step_interval)
+
+    @staticmethod
+    def _snapshot(belief):
+        """
+        Copy of a robot's belief in its own representation, for a message.
+        """
+        if belief.representation == "sparse":
+            return SparseBelief(belief.size, belief.default, belief.indices.copy(), belief.values.copy())
+        return np.array(belief.decoded(), dtype=np.float64, copy=True)
+
+    @staticmethod
+    def _payload_bytes(belief):
+        if isinstance(belief, SparseBelief):
+            return belief.indices.nbytes + belief.values.nbytes
+        return belief.nbytes
+
+    def _probabilities(self, beliefs, representation):
+        """
+        Stacked probabilities of message beliefs, for the omega weights.
+        """
+        if representation == "sparse":
+            return np.stack([b.to_dense() for b in beliefs])
+        stacked = np.stack(beliefs)
+        return logodds_to_prob(stacked) if representation == "logodds" else stacked
+
+    def _fuse(self, beliefs, weights, representation):
+        """
+        One fusion of message beliefs, in their representation.
+        """
+        if representation == "sparse":
+            if weights is None:
+                weights = self.engine.uniform_weights(len(beliefs))
+            return self.centralizer.fusion.chernoff_fusion_n_sparse(list(beliefs), weights)
+        return self.engine.fuse(np.stack(beliefs), weights, representation)
+
+    async def _robot(self, robot, uplink):
+        loop = asyncio.get_running_loop()
+        encoder = self.encoders.get(robot.id)
+        for t in range(1, self.steps + 1):
+            robot.observe_and_bayes_update(current_time=t)
+            if encoder is not None:
+                belief = encoder.encode(robot.belief, t)
+            else:
+                belief = self._snapshot(robot.belief)
+            self.stats.uplink_bytes += self._payload_bytes(belief)
+            self.stats.uplink_full_bytes += len(robot.belief) * 8
+            await uplink.send(BeliefMessage(robot.id, t, loop.time(), belief))
+            await asyncio.sleep(self.step_interval)
+
+    async def _regional(self, region_idx, robots, downlink, uplink):
+        loop = asyncio.get_running_loop()
+        fusion = self.centralizer.fusion
+        representation = robots[0].belief.representation
+        nominal = robots[0].nominal_belief
+        occupancy = robots[0].occupancy
+        sensor_quality = {r.id: getattr(r, "sensor_quality", 0.7) for r in robots}
+        mirror = None
+        if self.delta_uploads:
+            mirror = MirrorStore([r.id for r in robots], len(robots[0].belief), representation,
+                                 robots[0].belief.precision, self.uplink_precision)
+        latest = {}
+        while not self._done.is_set():
+            # Only robot messages that arrived since the last fusion trigger one
+            fresh = []
+            for msg in downlink.drain():
+                if mirror is not None and not mirror.apply(msg.belief):
+                    self.encoders[msg.sender].request_snapshot()
+                    self.stats.snapshot_requests += 1
+                    continue
+                if msg.sender not in latest or msg.time >= latest[msg.sender].time:
+                    latest[msg.sender] = msg
+                    fresh.append(msg)
+            if fresh:
+                messages = list(latest.values())
+                if mirror is None:
+                    beliefs = [m.belief for m in messages]
+                else:
+                    beliefs = mirror.store.decoded_rows([mirror.rows[m.sender] for m in messages])
+                weights = None
+                if self.centralizer.weighting != "uniform":
+                    probs = self._probabilities(beliefs, representation)
+                    weights = fusion.omega_weights_from_arrays(
+                        probs, nominal, occupancy.compute(probs, nominal),
+                        np.array([m.time for m in messages], dtype=np.float64),
+                        np.array([sensor_quality[m.sender] for m in messages]), self.now_step())
+                fused = self._fuse(beliefs, weights, representation)
+                self.stats.regional_fusions += 1
+                self.stats.beliefs_fused += len(messages)
+                await uplink.send(BeliefMessage(region_idx, max(m.time for m in messages), loop.time(), fused,
+                                                origin_sent_at=min(m.sent_at for m in fresh)))
+            await asyncio.sleep(self.fusion_interval)
+
+    async def _main(self, downlink, representation):
+        loop = asyncio.get_running_loop()
+        latest = {}
+        while not self._done.is_set():
+            fresh = []
+            for msg in downlink.drain():
+                if msg.sender not in latest or msg.time >= latest[msg.sender].time:
+                    latest[msg.sender] = msg
+                    fresh.append(msg)
+            if fresh:
+                fused = self._fuse([m.belief for m in latest.values()], None, representation)
+                if representation == "sparse":
+                    self.centralizer.global_sparse = fused
+                elif representation == "logodds":
+                    fused = logodds_to_prob(fused)
+                self.centralizer.global_belief = fused
+                self.stats.global_fusions += 1
+                self.stats.beliefs_fused += len(latest)
+                now = loop.time()
+                self.stats.latencies.extend(now - m.origin_sent_at for m in fresh)
+            await asyncio.sleep(self.fusion_interval)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._start = loop.time()
+        self._done = asyncio.Event()
+        main_link = self._link()
+        assigned = [r for robots in self.centralizer.region_assignments.values() for r in robots]
+        representation = assigned[0].belief.representation
+        if self.delta_uploads:
+            if representation == "sparse":
+                raise ValueError("Delta uploads require dense beliefs")
+            self.encoders = {r.id: DeltaEncoder(r.id, len(r.belief), self.uplink_precision)
+                             for robots in self.centralizer.region_assignments.values() for r in robots}
+        services = [loop.create_task(self._main(main_link, representation))]
+        producers = [loop.create_task(self._world())]
+        links = [main_link]
+        for region_idx, robots in self.centralizer.region_assignments.items():
+            if not robots:
+                continue
+            region_link = self._link()
+            links.append(region_link)
+            services.append(loop.create_task(self._regional(region_idx, robots, region_link, main_link)))
+            producers.extend(loop.create_task(self._robot(r, region_link)) for r in robots)
+
+        await asyncio.gather(*producers)
+        # Wait until every message sent has been dropped or read; a reader fuses
+        # and forwards what it read before yielding, so the last global fusion is done
+        while any(link.in_flight for link in links):
+            await asyncio.sleep(self.fusion_interval)
+        self._done.set()
+        await asyncio.gather(*services)
+        self.stats.wall_time = loop.time() - self._start
+        return self.stats.summary()
+
+    def run_sync(self):
+        return asyncio.run(self.run())
@@ -0,0 +1,50 @@
+import itertools
+import numpy as np
+from assignment import AssignmentSolver, apportion, min_cost_transport
+
+
+def brute_force_cost(cost, supply, capacity):
+    units = np.repeat(np.arange(len(supply)), supply)
+    best = np.inf
+    for cols in itertools.product(range(len(capacity)), repeat=len(units)):
+        if np.all(np.bincount(cols, minlength=len(capacity)) <= capacity):
+            best = min(best, cost[units, cols].sum())
+    return best
+
+
+def test_transport_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(25):
+        num_classes, num_cols = rng.integers(1, 4), rng.integers(1, 4)
+        supply = rng.integers(0, 3, num_classes)
+        capacity = apportion(rng.uniform(0, 1, num_cols), supply.sum() + rng.integers(0, 2))
+        cost = rng.uniform(0, 1, (num_classes, num_cols))
+        flow = min_cost_transport(cost, supply, capacity)
+        assert np.all(flow >= 0)
+        np.testing.assert_array_equal(flow.sum(axis=1), supply)
+        assert np.all(flow.sum(axis=0) <= capacity)
+        assert abs(np.sum(flow * cost) - brute_force_cost(cost, supply, capacity)) < 1e-9
+
+
+def test_capacity_deadband_holds_against_small_demand_changes():
+    regions = [slice(0, 5), slice(5, 10), slice(10, 15)]
+    solver = AssignmentSolver(regions, demand_smoothing=1.0, min_per_region=0, capacity_deadband=0.25)
+    positions = np.column_stack([np.arange(6) * 2.0, np.zeros(6)])
+    current = np.full(6, -1)
+
+    owner = solver.solve(positions, current, [1.0, 1.0, 1.0])
+    np.testing.assert_array_equal(solver.capacity, [2, 2, 2])
+    np.testing.assert_array_equal(np.bincount(owner, minlength=3), [2, 2, 2])
+
+    # Fair shares move by less than 0.5 + deadband robots: nothing changes
+    # Robots now sit at the centers of their regions
+    again = solver.solve(solver.centers[owner], owner, [1.2, 1.0, 0.85])
+    np.testing.assert_array_equal(solver.capacity, [2, 2, 2])
+    np.testing.assert_array_equal(again, owner)
+    assert solver.last_moves == 0
+
+    # A large shift re-apportions, moving as few robots as the new capacities need
+    moved = solver.solve(solver.centers[owner], owner, [4.0, 1.0, 1.0])
+    np.testing.assert_array_equal(solver.capacity, [4, 1, 1])
+    np.testing.assert_array_equal(np.bincount(moved, minlength=3), [4, 1, 1])
+    assert solver.last_moves == 2
@@ -0,0 +1,58 @@
+import numpy as np
+from belief_core.bayes import BayesUpdate
+from belief_core.belief import logodds_to_prob, prob_to_logodds
+from main import DEFAULT_CONFIG, Simulation
+
+
+def scalar_posterior(prior, z, p_z_given_H, p_z_given_not_H):
+    # Per-cell Bayes rule, written out for one cell at a time
+    likelihood_h = p_z_given_H if z else 1 - p_z_given_H
+    likelihood_not_h = p_z_given_not_H if z else 1 - p_z_given_not_H
+    numerator = likelihood_h * prior
+    return numerator / (numerator + likelihood_not_h * (1 - prior) + 1e-10)
+
+
+def test_posterior_matches_scalar_reference():
+    rng = np.random.default_rng(0)
+    model = BayesUpdate(0.8, 0.1)
+    prior = rng.uniform(0, 1, 200)
+    z = rng.integers(0, 2, 200)
+    for observed in (np.zeros(200, dtype=int), np.ones(200, dtype=int), z):
+        expected = [scalar_posterior(p, zi, 0.8, 0.1) for p, zi in zip(prior, observed)]
+        np.testing.assert_allclose(model.posterior(prior, observed), expected, rtol=1e-12)
+    # Without observations every cell is updated as a detection
+    expected = [scalar_posterior(p, 1, 0.8, 0.1) for p in prior]
+    np.testing.assert_allclose(model.posterior(prior), expected, rtol=1e-12)
+
+
+def test_fleet_update_touches_only_windows():
+    rng = np.random.default_rng(1)
+    model = BayesUpdate(0.7, 0.2)
+    prior = rng.uniform(0.05, 0.95, (4, 30))
+    windows = [slice(0, 5), slice(10, 30), np.array([3, 7, 29]), slice(4, 4)]
+    for representation in ("prob", "logodds"):
+        beliefs = prior.copy() if representation == "prob" else prob_to_logodds(prior)
+        cells = model.update_fleet(beliefs, np.arange(4), windows, representation)
+        assert cells == 5 + 20 + 3
+        expected = prior.copy()
+        for row, window in enumerate(windows):
+            expected[row, window] = model.posterior(prior[row, window])
+        result = beliefs if representation == "prob" else logodds_to_prob(beliefs)
+        np.testing.assert_allclose(result, expected, rtol=1e-8)
+
+
+def test_update_on_change_only_skips_unchanged_windows():
+    config = dict(DEFAULT_CONFIG, steps=8, update_on_change_only=True, victims_per_step=2)
+    sim = Simulation(config)
+    store = sim.robots[0].belief_store
+    for t in range(1, config["steps"] + 1):
+        versions = [r.observed_victim_version for r in sim.robots]
+        before = store.data.copy()
+        sim.step(t)
+        for r, version in zip(sim.robots, versions):
+            window = r.get_observation_indices()
+            expected = version < 0 or sim.victim_grid.changed_since(version, window)
+            changed = not np.array_equal(store.data[r.store_index], before[r.store_index])
+            assert changed == expected, (t, r.id)
+        if t > max(config["victim_steps"]):
+            np.testing.assert_array_equal(store.data, before)
@@ -0,0 +1,69 @@
+import numpy as np
+from belief_core.belief import DirtyRanges, FleetBeliefStore, SparseBelief, merge_ranges
+
+
+def covered(ranges, size):
+    mask = np.zeros(size, dtype=bool)
+    for lo, hi in ranges:
+        mask[lo:hi] = True
+    return mask
+
+
+def test_merge_ranges():
+    np.testing.assert_array_equal(merge_ranges([(5, 8), (0, 2), (2, 3), (6, 7), (9, 9)]), [(0, 3), (5, 8)])
+    # Over the limit, the ranges separated by the smallest gaps are merged first
+    np.testing.assert_array_equal(merge_ranges([(0, 1), (3, 4), (20, 21), (22, 23)], limit=2), [(0, 4), (20, 23)])
+    np.testing.assert_array_equal(merge_ranges([(0, 1), (3, 4)], limit=1), [(0, 4)])
+
+
+def test_merge_ranges_covers_exactly_the_union():
+    rng = np.random.default_rng(1)
+    for count in (3, 50, 300):
+        lo = rng.integers(0, 1000, size=count)
+        ranges = np.stack([lo, lo + rng.integers(0, 15, size=count)], axis=1)
+        merged = merge_ranges(ranges)
+        np.testing.assert_array_equal(covered(merged, 1100), covered(ranges, 1100))
+        assert all(a[1] < b[0] for a, b in zip(merged[:-1], merged[1:]))
+
+
+def test_dirty_ranges_cover_every_write():
+    rng = np.random.default_rng(0)
+    size, num_rows = 500, 6
+    dirty = DirtyRanges(num_rows, size)
+    written = np.zeros((num_rows, size), dtype=bool)
+    for step in range(200):
+        rows = rng.choice(num_rows, size=rng.integers(1, num_rows + 1), replace=False)
+        lo = rng.integers(0, size, size=len(rows))
+        hi = np.minimum(lo + rng.integers(0, 20, size=len(rows)), size)
+        dirty.add(rows, lo, hi)
+        for r, a, b in zip(rows, lo, hi):
+            written[r, a:b] = True
+        if step % 50 == 49:
+            for r in range(num_rows):
+                ranges = dirty.get(r)
+                assert len(ranges) <= DirtyRanges.LIMIT
+                assert np.all(covered(ranges, size) >= written[r])
+            dirty.clear(np.arange(num_rows))
+            written[:] = False
+
+
+def test_store_keeps_distant_writes_apart():
+    store = FleetBeliefStore(2, 1000)
+    store.mark_dirty(np.array([0, 1]), np.array([0, 10]), np.array([10, 20]))
+    store.mark_dirty(0, 900, 950)
+    np.testing.assert_array_equal(store.view(0).dirty_ranges(), [(0, 10), (900, 950)])
+    assert store.view(0).dirty_range() == (0, 950)
+    np.testing.assert_array_equal(store.view(1).dirty_ranges(), [(10, 20)])
+    store.clear_dirty(0)
+    assert len(store.view(0).dirty_ranges()) == 0
+
+
+def test_sparse_histogram_matches_dense():
+    rng = np.random.default_rng(2)
+    bins = np.linspace(0, 1, 11)
+    for default in (0.3, rng.uniform(0, 1, 400)):
+        indices = np.sort(rng.choice(400, size=60, replace=False))
+        belief = SparseBelief(400, default, indices, rng.uniform(0, 1, 60))
+        dense = belief.to_dense()
+        np.testing.assert_array_equal(belief.histogram(bins), np.histogram(dense, bins)[0])
+        np.testing.assert_array_equal(np.asarray(belief), dense)
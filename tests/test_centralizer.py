@@ -0,0 +1,24 @@
+import numpy as np
+from main import DEFAULT_CONFIG, Simulation
+
+
+def test_incremental_fusion_matches_full_fusion():
+    for representation in ("prob", "logodds"):
+        config = dict(DEFAULT_CONFIG, steps=6, belief_representation=representation, update_on_change_only=True)
+        full = Simulation(dict(config, incremental_fusion=False))
+        incremental = Simulation(dict(config, incremental_fusion=True))
+        buffer = None
+        for t in range(1, config["steps"] + 1):
+            expected = full.step(t)
+            global_belief = incremental.step(t)
+            np.testing.assert_allclose(global_belief, expected, rtol=1e-12, atol=1e-15)
+            for region_idx, belief in incremental.centralizer.last_region_beliefs.items():
+                np.testing.assert_allclose(belief, full.centralizer.last_region_beliefs[region_idx],
+                                           rtol=1e-12, atol=1e-15)
+            # The global belief is one buffer, updated in place
+            assert buffer is None or global_belief is buffer
+            buffer = global_belief
+        # The in-memory history holds copies of it
+        history = incremental.centralizer.global_belief_history
+        assert all(h is not buffer for h in history)
+        np.testing.assert_allclose(history, full.centralizer.global_belief_history, rtol=1e-12, atol=1e-15)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from convergence import ConvergenceMonitor
+
+SIZE = 100
+
+
+def _belief(value):
+    return np.full(SIZE, value)
+
+
+def test_stop_after_patience_settled_fusions():
+    monitor = ConvergenceMonitor(tol=1e-3, patience=3, action="stop")
+    assert monitor.update(0, _belief(0.5)) is None
+    # A large move keeps the run going
+    assert monitor.update(1, _belief(0.8)) > monitor.tol
+    for step in (2, 3):
+        monitor.update(step, _belief(0.8))
+        assert not monitor.stop
+    monitor.update(4, _belief(0.8))
+    assert monitor.stop and monitor.converged_at == 4
+    assert len(monitor.distances) == 4 and monitor.distances[-1] == pytest.approx(0.0, abs=1e-7)
+
+
+def test_large_move_resets_patience():
+    monitor = ConvergenceMonitor(tol=1e-3, patience=2, action="stop")
+    monitor.update(0, _belief(0.5))
+    monitor.update(1, _belief(0.5))
+    assert monitor.settled == 1
+    monitor.update(2, _belief(0.2))
+    assert monitor.settled == 0 and not monitor.stop
+    monitor.update(3, _belief(0.2))
+    monitor.update(4, _belief(0.2))
+    assert monitor.stop and monitor.converged_at == 4
+
+
+def test_stretch_grows_the_interval_up_to_the_cap():
+    monitor = ConvergenceMonitor(tol=1e-3, patience=1, action="stretch", max_interval=8, growth=2)
+    step = 0
+    monitor.update(step, _belief(0.5))
+    intervals = []
+    for _ in range(5):
+        # No fusion is due before the interval has passed
+        assert monitor.interval == 1 or not monitor.fusion_due(step + monitor.interval - 1)
+        step += monitor.interval
+        assert monitor.fusion_due(step)
+        monitor.update(step, _belief(0.5))
+        intervals.append(monitor.interval)
+    assert intervals == [2, 4, 8, 8, 8]
+    assert not monitor.stop and monitor.converged_at == 1
+
+    # A fusion that moves the belief drops the interval back to every step
+    monitor.update(step + monitor.interval, _belief(0.9))
+    assert monitor.interval == 1 and not monitor.converged
+    monitor.update(step + 9, _belief(0.9))
+    assert monitor.interval == 2
+    monitor.reset()
+    assert monitor.interval == 1 and monitor.settled == 0
+
+
+def test_unknown_action_is_rejected():
+    with pytest.raises(ValueError):
+        ConvergenceMonitor(action="pause")
@@ -0,0 +1,74 @@
+import numpy as np
+from belief_core.belief import Belief
+from delta import DeltaEncoder, MirrorStore, encode_runs, expand_runs
+
+SIZE = 200
+
+
+def _robot_belief():
+    # Stored in the wire precision, so the mirror can match it bit for bit
+    return Belief(np.full(SIZE, 0.5), representation="logodds", precision="int16")
+
+
+def _write(belief, rng, lo, hi):
+    belief.update_window(slice(lo, hi), rng.uniform(0.05, 0.95, hi - lo))
+
+
+def test_runs_round_trip():
+    cells = np.array([3, 4, 5, 9, 11, 12, 40])
+    starts, lengths = encode_runs(cells)
+    np.testing.assert_array_equal(expand_runs(starts, lengths), cells)
+    starts, lengths = encode_runs(cells, max_gap=1)
+    np.testing.assert_array_equal(starts, [3, 9, 40])
+    np.testing.assert_array_equal(expand_runs(starts, lengths), [3, 4, 5, 9, 10, 11, 12, 40])
+
+
+def test_mirror_is_bit_identical_to_the_robot():
+    rng = np.random.default_rng(0)
+    belief = _robot_belief()
+    encoder = DeltaEncoder(7, SIZE, "int16")
+    mirror = MirrorStore([7], SIZE, "logodds", precision="int16", wire_precision="int16")
+
+    first = encoder.encode(belief, time=0)
+    assert first.snapshot and mirror.apply(first)
+    for t in range(1, 20):
+        lo = int(rng.integers(0, SIZE - 10))
+        _write(belief, rng, lo, lo + int(rng.integers(1, 10)))
+        delta = encoder.encode(belief, time=t)
+        assert not delta.snapshot
+        assert delta.nbytes < encoder.snapshot_nbytes
+        assert mirror.apply(delta)
+        np.testing.assert_array_equal(mirror.view(7).vector, belief.vector)
+    assert mirror.versions[0] == encoder.version
+
+    # Nothing written: a header-only delta that still advances the version
+    empty = encoder.encode(belief, time=20)
+    assert len(empty.starts) == 0 and mirror.apply(empty)
+    assert mirror.times[0] == 20
+
+
+def test_snapshot_recovers_a_dropped_delta():
+    rng = np.random.default_rng(1)
+    belief = _robot_belief()
+    encoder = DeltaEncoder(0, SIZE, "int16")
+    mirror = MirrorStore([0], SIZE, "logodds", precision="int16", wire_precision="int16")
+    assert mirror.apply(encoder.encode(belief, time=0))
+
+    _write(belief, rng, 10, 30)
+    encoder.encode(belief, time=1)           # lost on the way
+    _write(belief, rng, 100, 120)
+    late = encoder.encode(belief, time=2)
+    assert not mirror.apply(late)            # gap: the mirror refuses the delta
+    assert not np.array_equal(mirror.view(0).vector, belief.vector)
+
+    encoder.request_snapshot()
+    snapshot = encoder.encode(belief, time=3)
+    assert snapshot.snapshot
+    assert mirror.apply(snapshot)
+    np.testing.assert_array_equal(mirror.view(0).vector, belief.vector)
+
+    # Deltas resume on top of the snapshot; a replayed old message is ignored
+    _write(belief, rng, 50, 60)
+    assert mirror.apply(encoder.encode(belief, time=4))
+    assert mirror.apply(late)
+    np.testing.assert_array_equal(mirror.view(0).vector, belief.vector)
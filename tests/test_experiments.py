@@ -0,0 +1,28 @@
+import numpy as np
+from experiments import METRICS, BatchedTrials, run_simulation_trials, supports_batched
+from main import DEFAULT_CONFIG
+
+
+def test_batched_trials_match_simulation():
+    config = dict(DEFAULT_CONFIG, steps=8)
+    seeds = [0, 1, 2]
+    batched = BatchedTrials(config).run(seeds)
+    simulated = run_simulation_trials(config, seeds)
+    for name in METRICS:
+        np.testing.assert_allclose(batched[name], simulated[name], rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_supports_batched_excludes_other_modes():
+    assert supports_batched(DEFAULT_CONFIG)
+    excluded = [
+        {"fusion_mode": "gossip"},
+        {"convergence_tol": 1e-4},
+        {"delta_uploads": True},
+        {"fusion_weighting": "dynamic"},
+        {"fusion_rule": "bernoulli"},
+        {"belief_representation": "logodds"},
+        {"precision": "float32"},
+        {"reassign_interval": 5},
+    ]
+    for override in excluded:
+        assert not supports_batched(dict(DEFAULT_CONFIG, **override)), override
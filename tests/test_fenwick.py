@@ -0,0 +1,40 @@
+import numpy as np
+from belief_core.fenwick import FenwickTree, FenwickTree2D
+
+
+def test_fenwick_prefix_and_range_sums():
+    rng = np.random.default_rng(0)
+    values = np.zeros(37)
+    tree = FenwickTree(37)
+    for _ in range(5):
+        # Repeated indices must accumulate like np.add.at
+        indices = rng.integers(0, 37, 20)
+        amounts = rng.uniform(0, 1, 20)
+        np.add.at(values, indices, amounts)
+        tree.add(indices, amounts)
+        prefix = np.concatenate(([0.0], np.cumsum(values)))
+        np.testing.assert_allclose(tree.prefix(np.arange(38)), prefix, atol=1e-12)
+        lo = rng.integers(0, 37, 10)
+        hi = lo + rng.integers(0, 37 - lo + 1)
+        np.testing.assert_allclose(tree.range_sum(lo, hi), [values[a:b].sum() for a, b in zip(lo, hi)], atol=1e-12)
+    np.testing.assert_allclose(FenwickTree(37, values).tree, tree.tree, atol=1e-12)
+
+
+def test_fenwick_2d_prefix_and_rect_sums():
+    rng = np.random.default_rng(1)
+    values = np.zeros((9, 13))
+    tree = FenwickTree2D(9, 13)
+    for _ in range(5):
+        rows, cols = rng.integers(0, 9, 30), rng.integers(0, 13, 30)
+        amounts = rng.uniform(0, 1, 30)
+        np.add.at(values, (rows, cols), amounts)
+        tree.add(rows, cols, amounts)
+        prefix = np.zeros((10, 14))
+        prefix[1:, 1:] = np.cumsum(np.cumsum(values, axis=0), axis=1)
+        r, c = np.indices((10, 14))
+        np.testing.assert_allclose(tree.prefix(r, c), prefix, atol=1e-12)
+        r0, c0 = rng.integers(0, 9, 10), rng.integers(0, 13, 10)
+        r1, c1 = r0 + rng.integers(0, 5, 10), c0 + rng.integers(0, 5, 10)  # may run past the border
+        expected = [values[a:b, c:d].sum() for a, b, c, d in zip(r0, r1, c0, c1)]
+        np.testing.assert_allclose(tree.rect_sum(r0, r1, c0, c1), expected, atol=1e-12)
+    np.testing.assert_allclose(FenwickTree2D(9, 13, values).tree, tree.tree, atol=1e-12)
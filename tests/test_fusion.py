@@ -0,0 +1,47 @@
+import numpy as np
+from belief_core.belief import logodds_to_prob, prob_to_logodds
+from belief_core.fusion import FUSION_RULES, FusionRule
+from main import DEFAULT_CONFIG, Simulation
+
+
+def test_rule_does_not_depend_on_representation():
+    rng = np.random.default_rng(0)
+    beliefs = rng.uniform(0.01, 0.99, (5, 40))
+    weights = rng.dirichlet(np.ones(5))
+    for rule in FUSION_RULES:
+        fusion = FusionRule(rule=rule)
+        fused = fusion.chernoff_fusion_n(beliefs, weights)
+        fused_logodds = fusion.chernoff_fusion_n_logodds(prob_to_logodds(beliefs), weights)
+        np.testing.assert_allclose(logodds_to_prob(fused_logodds), fused, rtol=1e-8, atol=1e-9)
+
+    # Bernoulli: normalized per cell; geometric: the unnormalized product
+    num = np.exp(weights @ np.log(beliefs))
+    np.testing.assert_allclose(FusionRule(rule="bernoulli").chernoff_fusion_n(beliefs, weights),
+                               num / (num + np.exp(weights @ np.log1p(-beliefs))), rtol=1e-8)
+    np.testing.assert_allclose(FusionRule().chernoff_fusion_n(beliefs, weights), num, rtol=1e-8)
+
+
+def test_prob_and_logodds_fleets_agree():
+    for rule in FUSION_RULES:
+        results = {}
+        for representation in ("prob", "logodds"):
+            sim = Simulation(dict(DEFAULT_CONFIG, belief_representation=representation, fusion_rule=rule))
+            for t in range(1, DEFAULT_CONFIG["steps"] + 1):
+                sim.step(t)
+            results[representation] = np.asarray(sim.centralizer.global_belief)
+        np.testing.assert_allclose(results["logodds"], results["prob"], rtol=1e-6, atol=1e-7)
+
+
+def test_optimal_omega_matches_grid_search():
+    rng = np.random.default_rng(2)
+    grid = np.linspace(0.0, 1.0, 2001)
+    for rule in FUSION_RULES:
+        fusion = FusionRule(rule=rule)
+        a = fusion.to_log(rng.uniform(0.02, 0.98, (16, 25)))
+        b = fusion.to_log(rng.uniform(0.02, 0.98, (16, 25)))
+        omegas = fusion.optimal_omega_batch(a, b, fusion.log_domain, tol=1e-6)
+        for k in range(len(a)):
+            entropies = fusion.fused_entropy(b[k] + grid[:, None] * (a[k] - b[k]), fusion.log_domain)
+            found = fusion.fused_entropy(b[k] + omegas[k] * (a[k] - b[k]), fusion.log_domain)
+            assert found <= entropies.min() + 1e-6, (rule, k)
+            assert abs(omegas[k] - grid[np.argmin(entropies)]) < 1e-3, (rule, k)
@@ -0,0 +1,44 @@
+import numpy as np
+from belief_core.belief import logodds_to_prob, prob_to_logodds
+from belief_core.fusion import FUSION_RULES, FusionRule
+from belief_core.fusion_engine import FusionEngine
+
+
+def test_fuse_matches_pairwise_fusion():
+    rng = np.random.default_rng(0)
+    beliefs = rng.uniform(0.05, 0.95, (6, 30))
+    fusion = FusionRule()
+    # Folding pairwise with omega = k / (k + 1) gives the uniform N-ary fusion
+    folded = beliefs[0]
+    for k in range(1, len(beliefs)):
+        folded = fusion.chernoff_fusion(folded, beliefs[k], k / (k + 1))
+    np.testing.assert_allclose(FusionEngine(fusion).fuse(beliefs), folded, rtol=1e-8)
+
+
+def test_regions_match_per_region_fusion():
+    rng = np.random.default_rng(1)
+    beliefs = rng.uniform(0.05, 0.95, (9, 40))
+    weights = rng.uniform(0.1, 1.0, 9)
+    members = [np.array([0, 4, 5]), np.array([], dtype=int), np.array([1, 2, 3, 6]), np.array([8])]
+    region_weights = np.array([0.5, 0.0, 0.3, 0.2])
+    for rule in FUSION_RULES:
+        fusion = FusionRule(rule=rule)
+        for representation in ("prob", "logodds"):
+            stored = beliefs if representation == "prob" else prob_to_logodds(beliefs)
+            engine = FusionEngine(fusion)
+            engine.BLOCK_ELEMENTS = 50  # several column blocks
+            regional, fused_global = engine.fuse_hierarchical(stored, members, weights, region_weights, representation)
+            if representation == "logodds":
+                regional, fused_global = logodds_to_prob(regional), logodds_to_prob(fused_global)
+
+            expected = []
+            for rows in members:
+                if len(rows) == 0:
+                    # Empty regions contribute a zero log-belief
+                    expected.append(fusion.to_prob(np.zeros(40)))
+                    continue
+                expected.append(fusion.chernoff_fusion_n(beliefs[rows], weights[rows] / weights[rows].sum()))
+            np.testing.assert_allclose(regional, expected, rtol=1e-7, atol=1e-9)
+            filled = [k for k, rows in enumerate(members) if len(rows)]
+            np.testing.assert_allclose(fused_global, fusion.chernoff_fusion_n(
+                np.array(expected)[filled], region_weights[filled]), rtol=1e-7, atol=1e-9)
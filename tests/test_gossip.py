@@ -0,0 +1,35 @@
+import numpy as np
+from gossip import CSRMatrix, connected_components, metropolis_weights, range_edges
+
+
+def random_csr(rng, num_rows, num_cols, density):
+    dense = np.where(rng.random((num_rows, num_cols)) < density, rng.normal(size=(num_rows, num_cols)), 0.0)
+    dense[rng.integers(num_rows)] = 0.0  # at least one empty row
+    rows, cols = np.nonzero(dense)
+    return CSRMatrix.from_coo(rows, cols, dense[rows, cols], dense.shape), dense
+
+
+def test_dot_matches_dense_product():
+    rng = np.random.default_rng(0)
+    for trial in range(300):
+        num_rows, num_cols = rng.integers(1, 30, size=2)
+        matrix, dense = random_csr(rng, num_rows, num_cols, rng.uniform(0.05, 0.6))
+        x = rng.normal(size=(num_cols, int(rng.integers(1, 9))))
+        # Small blocks put block boundaries next to empty rows
+        for max_block_elements in (1, 7, 64, 1 << 16):
+            np.testing.assert_allclose(matrix.dot(x, max_block_elements), dense @ x, atol=1e-12)
+
+
+def test_metropolis_weights_are_doubly_stochastic():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, 10, size=(60, 2))
+    src, dst = range_edges(positions, 2.0)
+    weights = metropolis_weights(src, dst, len(positions))
+    dense = weights.dot(np.eye(len(positions)))
+    np.testing.assert_allclose(dense, dense.T)
+    np.testing.assert_allclose(dense.sum(axis=1), 1.0)
+
+
+def test_connected_components_labels():
+    labels = connected_components(np.array([0, 1, 4]), np.array([1, 2, 5]), 7)
+    np.testing.assert_array_equal(labels, [0, 0, 0, 3, 4, 4, 6])
@@ -0,0 +1,34 @@
+import numpy as np
+from belief_core.grid import TiledGrid
+
+
+def test_tile_major_layout_round_trips():
+    grid = TiledGrid(13, 7, 4, 3)
+    assert (grid.tile_rows, grid.tile_cols, grid.num_tiles) == (4, 3, 12)
+    # Every cell has exactly one storage index, and the maps invert each other
+    np.testing.assert_array_equal(np.sort(grid.index_of, axis=None), np.arange(13 * 7))
+    rows, cols = np.indices((13, 7))
+    np.testing.assert_array_equal(grid.row_of[grid.index_of], rows)
+    np.testing.assert_array_equal(grid.col_of[grid.index_of], cols)
+    np.testing.assert_array_equal(grid.storage_index(grid.row_of, grid.col_of), np.arange(13 * 7))
+
+    image = np.arange(13 * 7, dtype=float).reshape(13, 7)
+    np.testing.assert_array_equal(grid.to_image(grid.from_image(image)), image)
+
+    # Each tile (smaller on the bottom and right border) is one contiguous slice, row-major inside
+    for tile, ((r0, r1, c0, c1), cells) in enumerate(zip(grid.tile_bounds, grid.tile_slices)):
+        np.testing.assert_array_equal(grid.from_image(image)[cells], image[r0:r1, c0:c1].ravel())
+        assert np.all(grid.tile_of(rows[r0:r1, c0:c1], cols[r0:r1, c0:c1]) == tile)
+        assert grid.bounds_of(cells) == (r0, r1, c0, c1)
+    assert grid.tile_bounds[-1] == (12, 13, 6, 7)
+
+
+def test_windows_are_clipped_rectangles():
+    grid = TiledGrid(13, 7, 4, 3)
+    for r0, r1, c0, c1 in [(-2, 3, 5, 9), (3, 9, 1, 5), (11, 20, -1, 2)]:
+        window = grid.window_indices(r0, r1, c0, c1)
+        expected = grid.index_of[max(r0, 0):min(r1, 13), max(c0, 0):min(c1, 7)]
+        np.testing.assert_array_equal(window, np.sort(expected, axis=None))
+    window = grid.observation_window(grid.tile_slices[4], 1)
+    np.testing.assert_array_equal(window, grid.window_indices(3, 9, 2, 7))
+    assert grid.observation_window(grid.tile_slices[4], 1) is window
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+from belief_core.belief import SparseBelief
+from history import HistoryReader, HistoryStore, HistoryWriter
+
+
+def test_round_trip_with_partial_last_chunk(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = rng.uniform(0, 1, (11, 3, 5))
+    for compress in (False, True):
+        path = os.path.join(tmp_path, f"stream_{compress}")
+        writer = HistoryWriter(path, (3, 5), chunk_steps=4, compress=compress)
+        for row in rows:
+            writer.append(row)
+        writer.close()
+
+        reader = HistoryReader(path)
+        assert reader.shape == rows.shape and len(reader.chunks) == 3
+        np.testing.assert_array_equal(reader[:], rows)
+        np.testing.assert_array_equal(reader[-1], rows[-1])
+        np.testing.assert_array_equal(reader[2:10:3, 1], rows[2:10:3, 1])
+        np.testing.assert_array_equal(np.stack([row for _, row in reader.replay(3)]), rows[3:])
+        # The last chunk holds only the 3 steps written to it
+        last = os.path.join(path, reader.chunks[-1])
+        if compress:
+            with np.load(last) as archive:
+                assert archive["data"].shape == (3, 3, 5)
+        else:
+            assert np.load(last, mmap_mode="r").shape == (3, 3, 5)
+
+
+def test_chunk_byte_budget_and_sparse_rows(tmp_path):
+    store = HistoryStore(str(tmp_path), chunk_steps=256, chunk_bytes=10 * 8 * 8)
+    wide = store.writer("wide", (8,))
+    assert wide.chunk_steps == 10
+    assert store.writer("huge", (1000,)).chunk_steps == 1
+
+    nominal = np.full(8, 0.5)
+    beliefs = [SparseBelief(8, nominal, [k % 8], [0.1 * k]) for k in range(1, 24)]
+    for belief in beliefs:
+        wide.append(belief)
+    np.testing.assert_array_equal(store.reader("wide")[:], np.stack([b.to_dense() for b in beliefs]))
+    store.close()
+    reader = HistoryReader(os.path.join(str(tmp_path), "wide"))
+    assert len(reader.chunks) == 3 and len(reader) == 23
+    np.testing.assert_array_equal(reader[20:], np.stack([b.to_dense() for b in beliefs[20:]]))
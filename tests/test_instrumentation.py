@@ -0,0 +1,31 @@
+from collections import Counter
+from instrumentation import Instrumentation
+
+
+def test_prometheus_has_one_help_and_type_per_family():
+    inst = Instrumentation()
+    for step in range(3):
+        inst.begin_step(step)
+        with inst.phase("fusion"):
+            with inst.phase("regional_fusion"):
+                pass
+            with inst.phase("global_fusion"):
+                pass
+        inst.count("cells_updated", 10)
+        inst.count("fusions", 2)
+        inst.count("belief_bytes", 800)
+        inst.end_step()
+
+    lines = inst.to_prometheus().splitlines()
+    helps = Counter(line.split()[2] for line in lines if line.startswith("# HELP "))
+    types = Counter(line.split()[2] for line in lines if line.startswith("# TYPE "))
+    assert set(helps) == set(types)
+    assert all(n == 1 for n in helps.values()) and all(n == 1 for n in types.values())
+
+    # Every sample belongs to a declared family (summaries add _sum/_count)
+    for line in lines:
+        if line.startswith("#"):
+            continue
+        name = line.split("{")[0].split()[0]
+        assert name in types or name.rsplit("_", 1)[0] in types, name
+    assert 'counter="fusions"} 6' in "\n".join(lines)
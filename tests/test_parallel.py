@@ -0,0 +1,36 @@
+import numpy as np
+from belief_core.belief import logodds_to_prob
+from belief_core.fusion_engine import FusionEngine
+from parallel import ParallelRegionFusion
+
+
+def serial(store, region_rows, weights, region_weights):
+    engine = FusionEngine()
+    beliefs = store.decoded_rows(slice(None))
+    members = [np.asarray(rows) for rows in region_rows]
+    regional, fused_global = engine.fuse_hierarchical(beliefs, members, weights=weights, region_weights=region_weights,
+                                                      representation=store.representation)
+    if store.representation == "logodds":
+        return logodds_to_prob(regional), logodds_to_prob(fused_global)
+    return regional, fused_global
+
+
+def test_parallel_matches_serial_engine_across_calls():
+    rng = np.random.default_rng(0)
+    for representation in ("prob", "logodds"):
+        with ParallelRegionFusion(12, 50, 4, num_workers=2, representation=representation) as parallel:
+            store = parallel.store
+            kept = []
+            for call, region_rows in enumerate([[np.arange(0, 5), np.arange(5, 9), np.arange(9, 12)],
+                                                [np.arange(0, 3), np.arange(3, 12)]]):
+                store.data[:] = store.encode(rng.uniform(0.05, 0.95, (12, 50)))
+                weights = None if call == 0 else rng.uniform(0.1, 1.0, 12)
+                region_weights = None if call == 0 else np.full(len(region_rows), 1.0 / len(region_rows))
+                regional, fused_global = parallel.fuse(region_rows, weights, region_weights)
+                expected_regional, expected_global = serial(store, region_rows, weights, region_weights)
+                np.testing.assert_allclose(regional, expected_regional, rtol=1e-9, atol=1e-12)
+                np.testing.assert_allclose(fused_global, expected_global, rtol=1e-9, atol=1e-12)
+                kept.append((regional, expected_regional))
+
+            # Results of the first call survive the reuse of the shared buffers
+            np.testing.assert_allclose(kept[0][0], kept[0][1], rtol=1e-9, atol=1e-12)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from belief_core.belief import FleetBeliefStore, logodds_to_prob
+from belief_core.precision import Precision
+
+
+@pytest.mark.parametrize("name", ["int16", "int8"])
+def test_quantization_error_is_half_a_step(name):
+    precision = Precision(name, logodds_limit=16.0)
+    assert precision.scale == pytest.approx(16.0 / np.iinfo(name).max)
+    logodds = np.random.default_rng(0).uniform(-16.0, 16.0, 10000)
+    decoded = precision.decode(precision.encode(logodds)).astype(np.float64)
+    # Rounding to the nearest step, plus float32 arithmetic on decode
+    bound = precision.scale / 2 * (1 + 1e-5) + 16.0 * np.finfo(np.float32).eps
+    assert np.max(np.abs(decoded - logodds)) <= bound
+    # dp/dl <= 1/4, so the probability error is at most a quarter of that
+    assert np.max(np.abs(logodds_to_prob(decoded) - logodds_to_prob(logodds))) <= bound / 4
+    # Values beyond the limit saturate
+    np.testing.assert_allclose(precision.decode(precision.encode([-100.0, 100.0])), [-16.0, 16.0], rtol=1e-6)
+
+
+def test_quantized_store_round_trip():
+    probabilities = np.random.default_rng(1).uniform(0.01, 0.99, (3, 50))
+    for name in ("int16", "int8"):
+        store = FleetBeliefStore(3, 50, representation="logodds", precision=name)
+        store.data[:] = store.encode(probabilities)
+        assert store.data.dtype == np.dtype(name)
+        bound = store.precision.scale / 8 * (1 + 1e-5) + 1e-6
+        assert np.max(np.abs(store.rows([0, 1, 2]) - probabilities)) <= bound
+
+
+def test_float32_keeps_relative_precision():
+    precision = Precision("float32")
+    values = np.random.default_rng(2).uniform(0.0, 1.0, 1000)
+    stored = precision.encode(values)
+    assert stored.dtype == np.float32 and precision.decode(stored) is stored
+    np.testing.assert_allclose(stored, values, rtol=np.finfo(np.float32).eps)
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from belief_core.belief import Belief, FleetBeliefStore
+from belief_core.HellingerDistance import HellingerDistance
+from belief_core.robot import FleetComponents, Robot, WindowedCache, bernoulli_entropy
+from belief_core.VictimGrid import VictimGrid
+from main import DEFAULT_CONFIG, Simulation
+
+
+def make_robots(store, prior, components, victims=None):
+    victims = victims if victims is not None else VictimGrid(store.grid_size)
+    return [Robot(i, slice(0, 1), None, prior, victims, belief_store=store, store_index=i, components=components)
+            for i in range(len(store))]
+
+
+def test_components_belong_to_their_fleet():
+    first, second = Simulation(dict(DEFAULT_CONFIG)), Simulation(dict(DEFAULT_CONFIG))
+    for sim in (first, second):
+        assert all(r.fusion is sim.robots[0].fusion and r.hellinger is sim.robots[0].hellinger for r in sim.robots)
+    assert first.robots[0].fusion is not second.robots[0].fusion
+    assert first.robots[0].hellinger is not second.robots[0].hellinger
+
+
+def test_prior_copy_follows_in_place_changes():
+    components = FleetComponents()
+    prior = np.full(6, 0.5)
+    a, b = make_robots(FleetBeliefStore(2, 6), prior, components)
+    assert a.nominal_belief is b.nominal_belief and not a.nominal_belief.flags.writeable
+
+    prior[2] = 0.9  # mutated in place: robots built afterwards see the new values
+    (c,) = make_robots(FleetBeliefStore(1, 6), prior, components)
+    assert c.nominal_belief[2] == 0.9 and a.nominal_belief[2] == 0.5
+
+    frozen = np.full(6, 0.3)
+    frozen.setflags(write=False)
+    (d,) = make_robots(FleetBeliefStore(1, 6), frozen, components)
+    assert d.nominal_belief is frozen
+
+
+def test_hellinger_roots_are_keyed_by_store_row():
+    hellinger = HellingerDistance()
+    prior = np.full(8, 0.5)
+    rng = np.random.default_rng(0)
+    fleets = []
+    for _ in range(2):
+        # Same robot ids and belief versions in both fleets, different beliefs
+        store = FleetBeliefStore.from_beliefs(rng.uniform(0.1, 0.9, (3, 8)))
+        fleets.append(make_robots(store, prior, FleetComponents()))
+    for robots in fleets + fleets:
+        expected = hellinger.roots(np.stack([r.belief.get() for r in robots]), "bernoulli")
+        np.testing.assert_array_equal(hellinger.robot_roots(robots, "bernoulli"), expected)
+
+    robots = fleets[0]
+    robots[1].belief.update(np.full(8, 0.7))
+    np.testing.assert_allclose(hellinger.robot_roots(robots, "bernoulli")[1],
+                               hellinger.roots(np.full(8, 0.7), "bernoulli"))
+
+
+def test_windowed_cache_follows_the_belief_version():
+    belief = Belief(np.full(20, 0.5))
+    computed = []
+
+    def compute(indices):
+        computed.append(indices)
+        return belief.vector[indices] * 2
+
+    cache = WindowedCache(belief, compute)
+    np.testing.assert_array_equal(cache.get(), np.full(20, 1.0))
+    cache.get()
+    assert len(computed) == 1  # unchanged version: memoized
+
+    # A reported write recomputes only its window
+    before = belief.version
+    belief.update_window(slice(4, 7), [0.1, 0.2, 0.3])
+    cache.written(slice(4, 7), before, belief.version)
+    np.testing.assert_allclose(cache.get(), belief.vector * 2)
+    assert computed[-1] == slice(4, 7)
+    assert cache.sum() == pytest.approx(np.sum(belief.vector * 2))
+
+    # An unreported write (or one reported on top of it) recomputes every cell
+    belief.update_window(slice(10, 12), [0.9, 0.9])
+    before = belief.version
+    belief.update_window(slice(0, 2), [0.7, 0.7])
+    cache.written(slice(0, 2), before, belief.version)
+    np.testing.assert_allclose(cache.get(), belief.vector * 2)
+    assert computed[-1] == slice(None)
+    assert cache.sum() == pytest.approx(np.sum(belief.vector * 2))
+
+
+def test_robot_entropy_follows_store_writes():
+    store = FleetBeliefStore(2, 12, representation="logodds")
+    robot, other = make_robots(store, np.full(12, 0.5), FleetComponents())
+    rng = np.random.default_rng(3)
+    for _ in range(3):
+        before = robot.belief.version
+        robot.belief.update_window(slice(2, 5), rng.uniform(0.1, 0.9, 3))
+        robot.belief_written(slice(2, 5), before)
+        # A write to another row of the store leaves this robot's caches valid
+        other.belief.update(rng.uniform(0.1, 0.9, 12))
+        assert robot.entropy() == pytest.approx(np.sum(bernoulli_entropy(robot.belief.get())))
+    store.data[0] = store.encode(np.full(12, 0.2))
+    store.mark_dirty(0, 0, 12)
+    assert robot.entropy() == pytest.approx(12 * float(bernoulli_entropy(0.2)))
+    np.testing.assert_allclose(robot.current_occupancy,
+                               robot.occupancy.compute(robot.belief.get(), robot.nominal_belief))
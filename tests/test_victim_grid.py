@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from belief_core.VictimGrid import VictimGrid
+from belief_core.grid import TiledGrid
+
+
+def test_masses_follow_add_victims():
+    rng = np.random.default_rng(0)
+    layout = TiledGrid(7, 13, 3, 4)
+    victims = VictimGrid(layout.size, layout=layout)
+    for _ in range(4):
+        victims.add_victims(rng.integers(0, layout.size, 15), rng.uniform(0.2, 0.9, 15))
+    grid, image = victims.grid, layout.to_image(victims.grid)
+    assert victims.mass() == pytest.approx(grid.sum())
+    np.testing.assert_allclose(victims.region_masses(layout.tile_slices),
+                               [grid[s].sum() for s in layout.tile_slices], atol=1e-12)
+    np.testing.assert_allclose(victims.window_mass([0, 2, 5], [3, 7, 9], [1, 0, 10], [4, 13, 20]),
+                               [image[0:3, 1:4].sum(), image[2:7, 0:13].sum(), image[5:7, 10:13].sum()], atol=1e-12)
+
+
+def test_get_region_is_read_only():
+    victims = VictimGrid(10)
+    victims.add_victims([3, 3, 4], [0.5, 0.25, 1.0])
+    assert victims.get_region(3) == 0.75
+    for region in (victims.get_region(3), victims.get_region(slice(2, 5)), victims.get_region(np.array([3, 4]))):
+        with pytest.raises(ValueError):
+            region[...] = 0